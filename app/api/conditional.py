@@ -0,0 +1,168 @@
+# ==================== Conditional Requests ====================
+# File: app/api/conditional.py
+
+"""
+ETag / Last-Modified validators for read endpoints.
+
+Validators come from cheap aggregate queries (row count, the latest
+``updated_at``/``created_at`` and the owner's latest change-log id), so
+a ``304 Not Modified`` is answered without loading or serializing the
+rows themselves.
+
+Example:
+    total_items, validator = collection_validator(query, Workout, current_user.id, request.url.query)
+    not_modified = check_conditional(request, validator)
+    if not_modified:
+        return not_modified
+    ...  # build the normal response; PrevalidatedRoute adds the headers
+
+Timestamps come from CURRENT_TIMESTAMP and only change once a second;
+the change-log id (app/db/change_tracking.py) changes on every create,
+update and delete of the user's synced entities, so it is what tells
+two writes within one second apart in the ETag. Last-Modified keeps
+one-second resolution, which is why If-None-Match is evaluated first.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Query, Session
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.models import ChangeLog
+
+# Revalidate on every use, and keep per-user bodies out of shared caches
+CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass(frozen=True)
+class Validator:
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    @classmethod
+    def build(cls, parts: Sequence[Any], last_modified: Optional[datetime]) -> "Validator":
+        digest = hashlib.blake2b(repr(tuple(parts)).encode(), digest_size=12).hexdigest()
+        if last_modified is not None and last_modified.tzinfo is None:
+            # SQLite's CURRENT_TIMESTAMP is UTC without an offset
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return cls(etag=f'W/"{digest}"', last_modified=last_modified)
+
+    def headers(self) -> dict:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+def _stamp(model: Any):
+    """
+    Last change time of a row: updated_at when the model has it, else created_at
+    """
+    if hasattr(model, "updated_at"):
+        return func.coalesce(model.updated_at, model.created_at)
+    return model.created_at
+
+
+def _last_change(user_id: Any):
+    """
+    The user's latest change-log id; bumped by every write to their entities
+    """
+    return select(func.max(ChangeLog.id)).where(ChangeLog.user_id == user_id).scalar_subquery()
+
+
+def collection_validator(query: Query, model: Any, user_id: int, *scope: Any) -> Tuple[int, Validator]:
+    """
+    (row count, Validator) for a filtered, not yet paged, list query of
+    ``user_id``'s rows.
+
+    The count doubles as the page's ``total_items``. ``scope`` should identify
+    the request's query string, since the aggregate alone doesn't
+    distinguish pages.
+    """
+    count, last, change = query.with_entities(
+        func.count(), func.max(_stamp(model)), _last_change(user_id)
+    ).one()
+    return count, Validator.build((model.__tablename__, count, last, change, user_id, *scope), last)
+
+
+def entity_validator(
+    db: Session,
+    model: Any,
+    entity_id: int,
+    children: Sequence[Any] = (),
+) -> Optional[Tuple[int, Validator]]:
+    """
+    (owner user_id, Validator) for one row, or None if it doesn't exist.
+
+    ``children`` are one-to-many relationship attributes embedded in the
+    response (e.g. ``Workout.strength_exercises``); their counts and latest
+    timestamps are folded into the validator.
+    """
+    columns = [model.user_id, _last_change(model.user_id), _stamp(model)]
+    for relationship in children:
+        prop = relationship.property
+        child = prop.mapper.class_
+        (_, foreign_key), = prop.local_remote_pairs
+        condition = foreign_key == entity_id
+        columns.append(select(func.count()).select_from(child).where(condition).scalar_subquery())
+        columns.append(select(func.max(_stamp(child))).where(condition).scalar_subquery())
+
+    row = db.execute(select(*columns).where(model.id == entity_id)).first()
+    if row is None:
+        return None
+
+    owner_id, _, stamp, *child_state = row
+    timestamps = [value for value in [stamp, *child_state[1::2]] if value is not None]
+    last = max(timestamps) if timestamps else None
+    return owner_id, Validator.build((model.__tablename__, entity_id, owner_id, *row[1:]), last)
+
+
+def is_not_modified(request: Request, etag: Optional[str], last_modified: Optional[str]) -> bool:
+    """
+    Evaluate If-None-Match (preferred) or If-Modified-Since against a validator
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Weak comparison: W/"x" matches "x"
+        bare = etag.removeprefix("W/")
+        return "*" in tags or any(tag.removeprefix("W/") == bare for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def check_conditional(request: Request, validator: Validator) -> Optional[Response]:
+    """
+    Return a 304 response if the client's copy is current; otherwise remember
+    the validator so the route class adds it to the 200 response.
+    """
+    headers = validator.headers()
+    if is_not_modified(request, headers["ETag"], headers.get("Last-Modified")):
+        return not_modified_response(headers)
+    request.state.validator = validator
+    return None
+
+
+def apply_validator(request: Request, response: Response) -> Response:
+    validator = getattr(request.state, "validator", None)
+    if validator is not None and response.status_code == 200:
+        response.headers.update(validator.headers())
+    return response
@@ -9,6 +9,7 @@ from typing import Optional
 from app.db.session import get_db
 from app.models import User
 from app.core.config import settings
+from app.core.tenant_config import tenant_configs
 from pydantic import BaseModel, Field
 
 security = HTTPBearer()
@@ -57,6 +58,21 @@ def get_current_admin_user(current_user: User = Depends(get_current_user)) -> Us
     return current_user
 
 
+def require_feature(flag: str):
+    """
+    Dependency factory: 403 unless the current user's tenant has ``flag``
+    enabled in its feature flags (served from the tenant config cache)
+    """
+    def dependency(current_user: User = Depends(get_current_user)) -> User:
+        if not tenant_configs.feature_enabled(current_user.tenant_id, flag):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Feature '{flag}' is not enabled for this tenant"
+            )
+        return current_user
+    return dependency
+
+
 # class PaginationParams:
 #     """
 #     Reusable pagination parameters
@@ -0,0 +1,140 @@
+# ==================== Export Endpoints Helpers ====================
+# File: app/api/exports.py
+
+"""
+Request handling shared by the user and admin export routes: start an
+export (inline for small accounts, as a job otherwise) and serve the
+finished archive with HTTP Range support, so large downloads can resume.
+"""
+
+import hashlib
+import os
+from typing import Callable, Iterator, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+from app.core.jobs import SUCCEEDED, jobs
+from app.db.export import ExportError, create_export, find_export, is_large_export
+from app.models import User
+
+CHUNK_SIZE = 256 * 1024
+
+
+async def start_export(user: User, requested_by: User, download_url: Callable[[str], str]) -> Response:
+    """
+    200 with the finished export, or 202 with the job exporting it;
+    ``download_url`` maps an export id to the route serving it
+    """
+    if await run_in_threadpool(is_large_export, user.id, user.tenant_id):
+        job = jobs.submit(
+            "data_export",
+            lambda job: create_export(user.id, user.tenant_id, requested_by.id, export_id=job.id, job=job),
+            user_id=user.id, requested_by=requested_by.id,
+        )
+        return JSONResponse(status_code=202, content={
+            "success": True,
+            "data": {**job.snapshot(), "download_url": download_url(job.id)},
+            "message": "Export started; download it from download_url once it is ready"
+        })
+
+    try:
+        result = await run_in_threadpool(create_export, user.id, user.tenant_id, requested_by.id)
+    except ExportError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return JSONResponse(content={
+        "success": True,
+        "data": {**result, "download_url": download_url(result["export_id"])},
+        "message": "Export created successfully"
+    })
+
+
+def serve_export(request: Request, user_id: int, export_id: str) -> Response:
+    """
+    The archive (206 for a Range request), 202 while its job still runs
+    """
+    path = find_export(user_id, export_id)
+    if path is not None:
+        return ranged_file_response(request, path, f"export-{user_id}-{export_id[:8]}.zip")
+
+    status = jobs.status(export_id)
+    if status is None or status["kind"] != "data_export" or status["meta"].get("user_id") != user_id:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if status["status"] == SUCCEEDED:
+        raise HTTPException(status_code=410, detail="Export has expired")
+    if status["error"]:
+        raise HTTPException(status_code=500, detail=f"Export failed: {status['error']}")
+    return JSONResponse(status_code=202, content={
+        "success": True,
+        "data": status,
+        "message": "Export is still being prepared"
+    })
+
+
+# ==================== Range Responses ====================
+
+def _read_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple]:
+    """
+    (start, end) of a single ``bytes=`` range; None to send the whole file;
+    raises ValueError when the range cannot be satisfied
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None  # other units and multipart ranges: whole file
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start, end = int(first), min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def ranged_file_response(request: Request, path: str, filename: str, media_type: str = "application/zip") -> Response:
+    stat = os.stat(path)
+    etag = '"' + hashlib.md5(f"{stat.st_mtime}-{stat.st_size}".encode()).hexdigest() + '"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if not range_header or (if_range is not None and if_range != etag):
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+    try:
+        byte_range = _parse_range(range_header, stat.st_size)
+    except ValueError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+    if byte_range is None:
+        return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+    start, end = byte_range
+    return StreamingResponse(
+        _read_range(path, start, end),
+        status_code=206,
+        media_type=media_type,
+        headers={
+            **headers,
+            "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+            "Content-Length": str(end - start + 1),
+        },
+    )
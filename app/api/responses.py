@@ -1,8 +1,20 @@
 # ==================== Response Models ====================
 # File: app/api/responses.py
 
-from pydantic import BaseModel
-from typing import Generic, TypeVar, Optional, List
+import functools
+import inspect
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import Any, Callable, Generic, TypeVar, Optional, List
+from fastapi.exceptions import ResponseValidationError
+from fastapi.routing import APIRoute
+from fastapi.datastructures import DefaultPlaceholder
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from app.api.conditional import apply_validator, is_not_modified, not_modified_response
+from app.core.cache import CACHED_HEADERS, CachedResponse, response_cache
+from app.core.config import settings
 
 T = TypeVar('T')
 
@@ -19,3 +31,138 @@ class PaginatedResponse(BaseModel, Generic[T]):
     page_size: int
     total_items: int
     total_pages: int
+
+
+# ==================== Fast Serialization Path ====================
+
+class PrevalidatedJSONResponse(Response):
+    """
+    JSON response whose body is already-serialized bytes
+    """
+    media_type = "application/json"
+
+
+@functools.lru_cache(maxsize=None)
+def response_adapter(schema: Any) -> TypeAdapter:
+    """
+    Compiled TypeAdapter per response schema (built once, reused for every request)
+    """
+    return TypeAdapter(schema)
+
+
+def render_response(schema: Any, content: Any, status_code: int = 200) -> Response:
+    """
+    Validate ``content`` against ``schema`` once (reading ORM attributes
+    directly) and write the JSON bytes with pydantic-core.
+    """
+    adapter = response_adapter(schema)
+    try:
+        value = adapter.validate_python(content, from_attributes=True)
+    except ValidationError as exc:
+        raise ResponseValidationError(errors=exc.errors(), body=content)
+    return PrevalidatedJSONResponse(adapter.dump_json(value), status_code=status_code)
+
+
+class PrevalidatedRoute(APIRoute):
+    """
+    Route class that serializes the endpoint's return value itself.
+
+    FastAPI would otherwise validate the returned ``ResponseModel``/
+    ``PaginatedResponse`` against ``response_model``, dump it to Python
+    objects and run it through ``json.dumps``. Here the result is validated
+    once with a cached TypeAdapter and written straight to bytes; the
+    ``response_model`` is still used for the OpenAPI schema.
+
+    Enable per router with ``APIRouter(..., route_class=PrevalidatedRoute)``.
+    Endpoints that return a ``Response`` are passed through untouched.
+    GET endpoints marked with ``@cache_per_user`` are also served from the
+    per-user response cache (app/core/cache.py), and validators recorded by
+    ``check_conditional`` (app/api/conditional.py) become response headers.
+    """
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        response_model = kwargs.get("response_model")
+        if settings.FAST_JSON_RESPONSES and response_model is not None \
+                and not isinstance(response_model, DefaultPlaceholder):
+            endpoint = _prevalidating(endpoint, response_model, kwargs.get("status_code") or 200)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = _with_validators(super().get_route_handler())
+        if settings.RESPONSE_CACHE_ENABLED and "GET" in self.methods \
+                and getattr(self.endpoint, "__cache_per_user__", False):
+            return _caching(handler)
+        return handler
+
+
+def _prevalidating(endpoint: Callable[..., Any], schema: Any, status_code: int):
+    is_coroutine = inspect.iscoroutinefunction(endpoint)
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        if is_coroutine:
+            result = await endpoint(*args, **kwargs)
+        else:
+            result = await run_in_threadpool(endpoint, *args, **kwargs)
+        if isinstance(result, Response):
+            return result
+        return render_response(schema, result, status_code)
+
+    return wrapper
+
+
+def _with_validators(handler: Callable[[Request], Any]):
+    async def validated_handler(request: Request) -> Response:
+        return apply_validator(request, await handler(request))
+
+    return validated_handler
+
+
+def _token_user_id(request: Request) -> Optional[int]:
+    """
+    User id from a valid bearer token, or None (the handler then decides)
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        return int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _caching(handler: Callable[[Request], Any]):
+    async def cached_handler(request: Request) -> Response:
+        # Off unless generations are process-wide (see app/core/cache.py);
+        # a hit then also implies the user is still active, since
+        # deactivation bumps the generation in every worker.
+        if not response_cache.enabled:
+            return await handler(request)
+        user_id = _token_user_id(request)
+        if user_id is None:
+            return await handler(request)
+
+        generation = response_cache.generation(user_id)
+        key = response_cache.make_key(
+            user_id, generation, request.url.path, request.query_params.multi_items()
+        )
+        entry = response_cache.get(key)
+        if entry is not None:
+            headers = dict(entry.headers)
+            if is_not_modified(request, headers.get("etag"), headers.get("last-modified")):
+                headers.pop("content-type", None)
+                return not_modified_response(headers)
+            return Response(entry.body, status_code=entry.status_code, headers=headers)
+
+        response = await handler(request)
+        # Skip storing if a write for this user landed while we were rendering
+        body = getattr(response, "body", None)
+        if response.status_code == 200 and isinstance(body, bytes) \
+                and response_cache.generation(user_id) == generation:
+            headers = tuple(
+                (name, value) for name, value in response.headers.items() if name in CACHED_HEADERS
+            )
+            response_cache.put(key, CachedResponse(body, response.status_code, headers))
+        return response
+
+    return cached_handler
@@ -12,6 +12,8 @@ from . import workouts
 from . import goals
 from . import measurements
 from . import tenants
+from . import system
+from . import sync
 
 __all__ = [
     "admin",
@@ -20,5 +22,7 @@ __all__ = [
     "workouts",
     "goals",
     "measurements",
-    "tenants"
+    "tenants",
+    "system",
+    "sync"
 ]
@@ -1,15 +1,30 @@
 # File: app/api/v1/routes/admin.py
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
 from typing import Optional
-from app.db.session import get_db
+from app.db.session import get_db, get_snapshot_db
+from app.db.writer import writer
 from app.api.deps import get_current_admin_user, PaginationParams
-from app.schemas import UserResponse, UserDetailResponse
-from app.models import User, Tenant, UserProfile
-from app.api.responses import ResponseModel, PaginatedResponse
+from app.schemas import (
+    UserResponse, UserDetailResponse, UserProfileResponse, NotificationPreferenceResponse, UserBulkFilter
+)
+from app.models import User, Tenant, UserProfile, NotificationPreference
+from app.schemas.audit import AuditLogPage
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.api.responses import ResponseModel, PaginatedResponse, PrevalidatedRoute
+from app.db.projection import Projection
 
-router = APIRouter(prefix="/admin", tags=["Admin - User Management"])
+router = APIRouter(prefix="/admin", tags=["Admin - User Management"], route_class=PrevalidatedRoute)
+
+USER_DETAIL_LIST = Projection(User, UserDetailResponse, nested={
+    "profile": Projection(UserProfile, UserProfileResponse),
+    "notification_preference": Projection(NotificationPreference, NotificationPreferenceResponse),
+})
 
 
 # ==================== User Management (Admin) ====================
@@ -55,11 +70,12 @@ async def list_all_users(
     # Get total count
     total_items = query.count()
     
-    # Apply pagination and ordering
-    users = query.order_by(User.created_at.desc())\
-        .offset(pagination.skip)\
-        .limit(pagination.page_size)\
-        .all()
+    # Apply pagination and ordering (columns only, no ORM entities)
+    users = USER_DETAIL_LIST.fetch(
+        query.order_by(User.created_at.desc())
+        .offset(pagination.skip)
+        .limit(pagination.page_size)
+    )
     
     total_pages = (total_items + pagination.page_size - 1) // pagination.page_size
     
@@ -95,23 +111,29 @@ async def get_user_by_id(
     )
 
 
+def _set_active(session: Session, user_id: int, active: bool) -> User:
+    """
+    Write unit: set a user's is_active flag
+    """
+    user = session.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    user.is_active = active
+    session.flush()
+    session.refresh(user)
+    return user
+
+
 @router.patch("/users/{user_id}/activate", response_model=ResponseModel[UserResponse])
 async def activate_user(
     user_id: int,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_admin_user)
 ):
     """
     Activate a user account (Admin only)
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    user.is_active = True
-    db.commit()
-    db.refresh(user)
+    user = await writer.run(lambda session: _set_active(session, user_id, True))
+    response_cache.bump_generation(user_id)
     
     return ResponseModel(
         success=True,
@@ -123,24 +145,17 @@ async def activate_user(
 @router.patch("/users/{user_id}/deactivate", response_model=ResponseModel[UserResponse])
 async def deactivate_user(
     user_id: int,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_admin_user)
 ):
     """
     Deactivate a user account (Admin only)
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Prevent admin from deactivating themselves
-    if user.id == current_user.id:
+    if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot deactivate your own account")
     
-    user.is_active = False
-    db.commit()
-    db.refresh(user)
+    user = await writer.run(lambda session: _set_active(session, user_id, False))
+    response_cache.bump_generation(user_id)
     
     return ResponseModel(
         success=True,
@@ -152,25 +167,31 @@ async def deactivate_user(
 @router.delete("/users/{user_id}", response_model=ResponseModel[None])
 async def delete_user(
     user_id: int,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_admin_user)
 ):
     """
     Permanently delete a user (Admin only)
     
     WARNING: This will cascade delete all user data (workouts, goals, etc.)
+    Large accounts are purged by a background job (202 with the job).
     """
-    user = db.query(User).filter(User.id == user_id).first()
-    
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Prevent admin from deleting themselves
-    if user.id == current_user.id:
+    if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
-    db.delete(user)
-    db.commit()
+    from app.db.bulk_users import UserFilter
+    
+    user_filter = UserFilter(user_ids=[user_id])
+    purge = await _start_purge(user_filter, current_user)
+    if purge is not None:
+        return purge
+    
+    from app.db.bulk_users import bulk_update_users
+    
+    # Set-based delete of the user; the database cascades to their data
+    result = await run_in_threadpool(bulk_update_users, user_filter, "delete", current_user.id)
+    if not result["affected"]:
+        raise HTTPException(status_code=404, detail="User not found")
     
     return ResponseModel(
         success=True,
@@ -179,10 +200,189 @@ async def delete_user(
     )
 
 
+# ==================== Data Export (Admin) ====================
+
+@router.post("/users/{user_id}/export")
+async def export_user_data(
+    user_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Export everything held about a user, e.g. for a data subject request (Admin only)
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    from app.api.exports import start_export
+    
+    return await start_export(
+        user, current_user,
+        lambda export_id: str(request.url_for("download_user_export", user_id=user_id, export_id=export_id))
+    )
+
+
+@router.get("/users/{user_id}/exports/{export_id}")
+async def download_user_export(
+    user_id: int,
+    export_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Download an export of a user's data (Admin only, Range requests supported)
+    """
+    from app.api.exports import serve_export
+    
+    return serve_export(request, user_id, export_id)
+
+
+# ==================== Bulk Operations (Admin) ====================
+
+async def _start_purge(user_filter, current_user: User) -> Optional[JSONResponse]:
+    """
+    202 with a background job when the users own too much to delete inline
+    """
+    from app.db.bulk_users import bulk_update_users, is_large_delete
+    
+    if not await run_in_threadpool(is_large_delete, user_filter, current_user.id):
+        return None
+    
+    from app.core.jobs import jobs
+    
+    job = jobs.submit(
+        "user_purge",
+        lambda job: bulk_update_users(user_filter, "delete", current_user.id, job=job),
+        filter=user_filter.as_dict(), created_by=current_user.id,
+    )
+    return JSONResponse(status_code=202, content={
+        "success": True,
+        "data": job.snapshot(),
+        "message": "Users are being deactivated and their data purged in the background"
+    })
+
+
+@router.post("/users/bulk/{operation}", response_model=ResponseModel[dict])
+async def bulk_user_operation(
+    user_filter: UserBulkFilter,
+    operation: str = Path(..., pattern="^(activate|deactivate|delete)$"),
+    dry_run: bool = Query(False, description="Only count the matching users"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Activate, deactivate or delete every user matching a filter (Admin only)
+    
+    Filters (combined with AND, at least one required):
+    - tenant_id: users of a tenant
+    - user_ids: explicit list of ids
+    - last_login_before: not signed in since (or never, and created before)
+    
+    The calling admin is never included. Deletes remove all user data;
+    when the users own more than PURGE_INLINE_MAX_ROWS rows the delete runs
+    as a background job (202, poll /admin/system/jobs/{job_id}).
+    """
+    from app.db.bulk_users import UserFilter, bulk_update_users
+    
+    user_filter = UserFilter(**user_filter.model_dump())
+    if user_filter.is_empty():
+        raise HTTPException(status_code=400, detail="At least one filter is required")
+    
+    if operation == "delete" and not dry_run:
+        purge = await _start_purge(user_filter, current_user)
+        if purge is not None:
+            return purge
+    
+    result = await run_in_threadpool(bulk_update_users, user_filter, operation, current_user.id, dry_run)
+    
+    return ResponseModel(
+        success=True,
+        data=result,
+        message=f"{result['affected']} of {result['matched']} users updated" if not dry_run
+        else f"{result['matched']} users match"
+    )
+
+
+# ==================== Bulk Provisioning (Admin) ====================
+
+@router.post("/users/bulk", status_code=202)
+async def bulk_provision_users(
+    request: Request,
+    tenant_id: int = Query(..., description="Tenant the users join"),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults from Content-Type"),
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create users in bulk from a CSV or NDJSON request body (Admin only)
+    
+    Columns/keys: email, password (optional), full_name (optional). Users
+    without a password get an invite token, downloadable once the job is
+    done. Returns a job to poll at /admin/system/jobs/{job_id}.
+    """
+    if not db.query(Tenant.id).filter(Tenant.id == tenant_id).first():
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    
+    limit = settings.PROVISION_MAX_MB * 1024 * 1024
+    if int(request.headers.get("content-length") or 0) > limit:
+        raise HTTPException(status_code=413, detail=f"File larger than {settings.PROVISION_MAX_MB} MB")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > limit:
+            raise HTTPException(status_code=413, detail=f"File larger than {settings.PROVISION_MAX_MB} MB")
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    
+    from app.core.jobs import jobs
+    from app.db.provisioning import detect_format, provision_users
+    
+    fmt = format or detect_format(request.headers.get("content-type"))
+    job = jobs.submit(
+        "user_provisioning",
+        lambda job: provision_users(text, fmt, tenant_id, job),
+        tenant_id=tenant_id, format=fmt, bytes=len(body), created_by=current_user.id,
+    )
+    
+    return {
+        "success": True,
+        "data": job.snapshot(),
+        "message": "Provisioning job started"
+    }
+
+
+@router.get("/users/bulk/{job_id}/invites", response_model=ResponseModel[list])
+async def get_bulk_provision_invites(
+    job_id: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Invite tokens of a finished provisioning job (Admin only)
+    
+    Tokens are only kept in memory by the worker that ran the job.
+    """
+    from app.core.jobs import jobs
+    
+    job = jobs.get(job_id)
+    if job is None or job.kind != "user_provisioning":
+        raise HTTPException(status_code=404, detail="Job not found on this worker")
+    if "invites" not in job.private:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    
+    return ResponseModel(
+        success=True,
+        data=job.private["invites"],
+        message="Invite tokens retrieved successfully"
+    )
+
+
 @router.get("/users/stats/summary", response_model=ResponseModel[dict])
 async def get_users_stats(
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_snapshot_db)
 ):
     """
     Get user statistics summary (Admin only)
@@ -224,3 +424,83 @@ async def get_users_stats(
         data=stats,
         message="User statistics retrieved successfully"
     )
+
+
+# ==================== Audit Log (Admin) ====================
+
+@router.get("/audit-logs", response_model=ResponseModel[AuditLogPage])
+async def search_audit_logs(
+    user_id: Optional[int] = Query(None),
+    action_type: Optional[str] = Query(None),
+    entity_type: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None, description="Entries created at or after"),
+    until: Optional[datetime] = Query(None, description="Entries created before"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(settings.AUDIT_QUERY_DEFAULT_LIMIT, ge=1, le=settings.AUDIT_QUERY_MAX_LIMIT),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Audit entries matching the filters, newest first (Admin only)
+    
+    Keep calling with the returned cursor while ``has_more`` is true.
+    Entries moved to the monthly archives are included: older pages read
+    them transparently.
+    """
+    from app.db.audit_archive import AuditQuery, query_audit_logs
+    
+    query = AuditQuery(
+        user_id=user_id, action_type=action_type, entity_type=entity_type, since=since, until=until
+    )
+    try:
+        page = await run_in_threadpool(query_audit_logs, query, cursor, limit)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    
+    return ResponseModel(
+        success=True,
+        data=page,
+        message="Audit log retrieved successfully"
+    )
+
+
+@router.get("/audit-logs/archive", response_model=ResponseModel[list])
+async def list_audit_archive(current_user: User = Depends(get_current_admin_user)):
+    """
+    Segments of the audit-log archive, oldest month first (Admin only)
+    """
+    from app.db.audit_archive import list_segments
+    
+    return ResponseModel(
+        success=True,
+        data=list_segments(),
+        message="Audit archive retrieved successfully"
+    )
+
+
+@router.post("/audit-logs/archive", status_code=202)
+async def archive_audit_log(
+    days: Optional[int] = Query(None, ge=1, description="Retention in days (default AUDIT_RETENTION_DAYS)"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Move audit entries older than the retention to the archives (Admin only)
+    
+    Runs as a job; poll /admin/system/jobs/{job_id}.
+    """
+    if days is None and not settings.AUDIT_RETENTION_DAYS:
+        raise HTTPException(status_code=400, detail="Pass days, or set AUDIT_RETENTION_DAYS")
+    
+    from app.core.jobs import jobs
+    from app.db.audit_archive import archive_audit_logs
+    
+    job = jobs.submit(
+        "audit_archive",
+        lambda job: archive_audit_logs(days, job=job),
+        days=days or settings.AUDIT_RETENTION_DAYS, created_by=current_user.id,
+    )
+    
+    return {
+        "success": True,
+        "data": job.snapshot(),
+        "message": "Audit log archive started"
+    }
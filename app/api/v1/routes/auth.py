@@ -5,9 +5,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from datetime import timedelta
 from app.db.session import get_db
+from app.db.writer import writer
 from app.schemas import UserCreate, UserLogin, UserResponse
 from app.models import User, Tenant, UserProfile, NotificationPreference
 from app.core.security import hash_password, verify_password, create_access_token
+from app.core.cache import response_cache
 from app.api.responses import ResponseModel
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -30,26 +32,26 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
     
-    # Create user
-    new_user = User(
-        email=user_data.email,
-        hashed_password=hash_password(user_data.password),
-        tenant_id=user_data.tenant_id,
-        is_admin=user_data.is_admin
-    )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    hashed_password = hash_password(user_data.password)
     
-    # Create default user profile
-    profile = UserProfile(user_id=new_user.id)
-    db.add(profile)
-    
-    # Create default notification preferences
-    notif_pref = NotificationPreference(user_id=new_user.id)
-    db.add(notif_pref)
+    def unit(session: Session) -> User:
+        new_user = User(
+            email=user_data.email,
+            hashed_password=hashed_password,
+            tenant_id=user_data.tenant_id,
+            is_admin=user_data.is_admin
+        )
+        session.add(new_user)
+        session.flush()
+        # Create default user profile and notification preferences
+        session.add(UserProfile(user_id=new_user.id))
+        session.add(NotificationPreference(user_id=new_user.id))
+        session.flush()
+        session.refresh(new_user)
+        return new_user
     
-    db.commit()
+    # Create user
+    new_user = await writer.run(unit)
     
     return ResponseModel(
         success=True,
@@ -80,8 +82,17 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     
     # Update last login
     from datetime import datetime
-    user.last_login = datetime.utcnow()
-    db.commit()
+    last_login = datetime.utcnow()
+    
+    def unit(session: Session) -> User:
+        logged_in = session.get(User, user.id)
+        logged_in.last_login = last_login
+        session.flush()
+        session.refresh(logged_in)
+        return logged_in
+    
+    user = await writer.run(unit)
+    response_cache.bump_generation(user.id)
     
     return ResponseModel(
         success=True,
@@ -1,27 +1,41 @@
 # ==================== Goal Routes ====================
 # File: app/api/v1/routes/goals.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from fastapi import Query
 from typing import Optional
 from app.db.session import get_db
+from app.db.writer import writer_for
 from app.api.deps import get_current_user, PaginationParams
 from app.schemas import (
     GoalCreate, GoalUpdate, GoalResponse, GoalWithMilestonesResponse,
     GoalMilestoneCreate, GoalMilestoneResponse
 )
 from app.models import User, Goal, GoalMilestone
-from app.api.responses import ResponseModel, PaginatedResponse
+from app.api.conditional import check_conditional, collection_validator, entity_validator
+from app.core.cache import cache_per_user, response_cache
+from app.api.responses import ResponseModel, PaginatedResponse, PrevalidatedRoute
 
-router = APIRouter(prefix="/goals", tags=["Goals"])
+router = APIRouter(prefix="/goals", tags=["Goals"], route_class=PrevalidatedRoute)
+
+
+def _owned_goal(session: Session, goal_id: int, user_id: int) -> Goal:
+    """
+    Look up a goal inside a write unit; 404/403 roll the unit back
+    """
+    goal = session.get(Goal, goal_id)
+    if not goal:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    if goal.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return goal
 
 
 @router.post("", response_model=ResponseModel[GoalResponse])
 async def create_goal(
     goal_data: GoalCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Create a new goal
@@ -29,10 +43,8 @@ async def create_goal(
     if goal_data.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Cannot create goal for other users")
     
-    goal = Goal(**goal_data.dict())
-    db.add(goal)
-    db.commit()
-    db.refresh(goal)
+    goal = await writer_for(current_user.tenant_id).add(Goal(**goal_data.dict()))
+    response_cache.bump_generation(current_user.id)
 
     from app.schemas import GoalResponse
     goal_response = GoalResponse.model_validate(goal)
@@ -45,7 +57,9 @@ async def create_goal(
 
 
 @router.get("", response_model=PaginatedResponse[GoalResponse])
+@cache_per_user
 async def list_goals(
+    request: Request,
     pagination: PaginationParams = Depends(),
     status: Optional[str] = Query(None),
     current_user: User = Depends(get_current_user),
@@ -56,7 +70,10 @@ async def list_goals(
     if status:
         query = query.filter(Goal.status == status)
 
-    total_items = query.count()
+    total_items, validator = collection_validator(query, Goal, current_user.id, request.url.query)
+    not_modified = check_conditional(request, validator)
+    if not_modified:
+        return not_modified
 
     goals = (
         query.order_by(Goal.created_at.desc())
@@ -81,20 +98,28 @@ async def list_goals(
 @router.get("/{goal_id}", response_model=ResponseModel[GoalWithMilestonesResponse])
 async def get_goal(
     goal_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get goal with milestones
     """
-    goal = db.query(Goal).filter(Goal.id == goal_id).first()
+    state = entity_validator(db, Goal, goal_id, children=(Goal.milestones,))
     
-    if not goal:
+    if not state:
         raise HTTPException(status_code=404, detail="Goal not found")
     
-    if goal.user_id != current_user.id:
+    owner_id, validator = state
+    if owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
+    not_modified = check_conditional(request, validator)
+    if not_modified:
+        return not_modified
+    
+    goal = db.query(Goal).filter(Goal.id == goal_id).first()
+    
     return ResponseModel(
         success=True,
         data=goal,
@@ -106,26 +131,23 @@ async def get_goal(
 async def update_goal(
     goal_id: int,
     goal_data: GoalUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Update goal
     """
-    goal = db.query(Goal).filter(Goal.id == goal_id).first()
-    
-    if not goal:
-        raise HTTPException(status_code=404, detail="Goal not found")
-    
-    if goal.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
     update_data = goal_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(goal, field, value)
     
-    db.commit()
-    db.refresh(goal)
+    def unit(session: Session) -> Goal:
+        goal = _owned_goal(session, goal_id, current_user.id)
+        for field, value in update_data.items():
+            setattr(goal, field, value)
+        session.flush()
+        session.refresh(goal)
+        return goal
+    
+    goal = await writer_for(current_user.tenant_id).run(unit)
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
@@ -137,22 +159,16 @@ async def update_goal(
 @router.delete("/{goal_id}", response_model=ResponseModel[None])
 async def delete_goal(
     goal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Delete goal
     """
-    goal = db.query(Goal).filter(Goal.id == goal_id).first()
-    
-    if not goal:
-        raise HTTPException(status_code=404, detail="Goal not found")
-    
-    if goal.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    def unit(session: Session):
+        session.delete(_owned_goal(session, goal_id, current_user.id))
     
-    db.delete(goal)
-    db.commit()
+    await writer_for(current_user.tenant_id).run(unit)
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
@@ -165,24 +181,21 @@ async def delete_goal(
 async def add_milestone(
     goal_id: int,
     milestone_data: GoalMilestoneCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Add milestone to goal
     """
-    goal = db.query(Goal).filter(Goal.id == goal_id).first()
-    
-    if not goal:
-        raise HTTPException(status_code=404, detail="Goal not found")
-    
-    if goal.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    milestone = GoalMilestone(**milestone_data.dict())
-    db.add(milestone)
-    db.commit()
-    db.refresh(milestone)
+    def unit(session: Session) -> GoalMilestone:
+        _owned_goal(session, goal_id, current_user.id)
+        milestone = GoalMilestone(**milestone_data.dict())
+        session.add(milestone)
+        session.flush()
+        session.refresh(milestone)
+        return milestone
+    
+    milestone = await writer_for(current_user.tenant_id).run(unit)
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
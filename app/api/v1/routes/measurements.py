@@ -1,24 +1,29 @@
 # ==================== Body Measurements Routes ====================
 # File: app/api/v1/routes/measurements.py
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Optional
 from app.db.session import get_db
+from app.db.writer import writer_for
 from app.api.deps import get_current_user, PaginationParams
 from app.schemas.measurement import BodyMeasurementCreate, BodyMeasurementResponse
 from app.models import User, BodyMeasurement
-from app.api.responses import ResponseModel, PaginatedResponse
+from app.api.conditional import check_conditional, collection_validator
+from app.core.cache import cache_per_user, response_cache
+from app.api.responses import ResponseModel, PaginatedResponse, PrevalidatedRoute
+from app.db.projection import Projection
 
-router = APIRouter(prefix="/measurements", tags=["Body Measurements"])
+router = APIRouter(prefix="/measurements", tags=["Body Measurements"], route_class=PrevalidatedRoute)
+
+MEASUREMENT_LIST = Projection(BodyMeasurement, BodyMeasurementResponse)
 
 
 @router.post("", response_model=ResponseModel[BodyMeasurementResponse])
 async def create_measurement(
     measurement_data: BodyMeasurementCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Record body measurement
@@ -26,10 +31,8 @@ async def create_measurement(
     if measurement_data.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Cannot create measurement for other users")
     
-    measurement = BodyMeasurement(**measurement_data.dict())
-    db.add(measurement)
-    db.commit()
-    db.refresh(measurement)
+    measurement = await writer_for(current_user.tenant_id).add(BodyMeasurement(**measurement_data.dict()))
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
@@ -39,7 +42,9 @@ async def create_measurement(
 
 
 @router.get("", response_model=PaginatedResponse[BodyMeasurementResponse])
+@cache_per_user
 async def list_measurements(
+    request: Request,
     pagination: PaginationParams = Depends(),
     metric_type: Optional[str] = Query(None),
     from_date: Optional[datetime] = Query(None),
@@ -59,11 +64,18 @@ async def list_measurements(
     if to_date:
         query = query.filter(BodyMeasurement.measured_at <= to_date)
     
-    total_items = query.count()
-    measurements = query.order_by(BodyMeasurement.measured_at.desc())\
-        .offset(pagination.skip)\
-        .limit(pagination.page_size)\
-        .all()
+    total_items, validator = collection_validator(
+        query, BodyMeasurement, current_user.id, request.url.query
+    )
+    not_modified = check_conditional(request, validator)
+    if not_modified:
+        return not_modified
+    
+    measurements = MEASUREMENT_LIST.fetch(
+        query.order_by(BodyMeasurement.measured_at.desc())
+        .offset(pagination.skip)
+        .limit(pagination.page_size)
+    )
     
     total_pages = (total_items + pagination.page_size - 1) // pagination.page_size
     
@@ -0,0 +1,86 @@
+# ==================== Sync Routes ====================
+# File: app/api/v1/routes/sync.py
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.db.session import get_snapshot_db
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.schemas.sync import SyncChangesResponse, SyncTombstone
+from app.models import (
+    User, ChangeLog, Workout, StrengthExercise, CardioActivity, Goal, GoalMilestone, BodyMeasurement
+)
+from app.api.responses import ResponseModel, PrevalidatedRoute
+
+router = APIRouter(prefix="/sync", tags=["Sync"], route_class=PrevalidatedRoute)
+
+# change_log.entity_type -> (model, field of SyncChangesResponse)
+SYNC_ENTITIES = {
+    "workout": (Workout, "workouts"),
+    "strength_exercise": (StrengthExercise, "strength_exercises"),
+    "cardio_activity": (CardioActivity, "cardio_activities"),
+    "goal": (Goal, "goals"),
+    "goal_milestone": (GoalMilestone, "goal_milestones"),
+    "body_measurement": (BodyMeasurement, "body_measurements"),
+}
+
+
+@router.get("/changes", response_model=ResponseModel[SyncChangesResponse])
+async def get_changes(
+    since: int = Query(0, ge=0, description="Cursor from the previous page (0 for a first sync)"),
+    limit: int = Query(settings.SYNC_DEFAULT_LIMIT, ge=1, le=settings.SYNC_MAX_LIMIT),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_snapshot_db)
+):
+    """
+    Entities created, updated or deleted since a cursor
+
+    Reads up to ``limit`` change-log entries after ``since`` and returns the
+    current state of each changed entity (several changes to one entity
+    collapse into one) plus tombstones for deletions. A deleted workout or
+    goal comes with a tombstone for each of its children. Keep calling with
+    the returned cursor while ``has_more`` is true.
+    """
+    entries = (
+        db.query(ChangeLog.id, ChangeLog.entity_type, ChangeLog.entity_id,
+                 ChangeLog.operation, ChangeLog.changed_at)
+        .filter(ChangeLog.user_id == current_user.id, ChangeLog.id > since)
+        .order_by(ChangeLog.id)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Last change per entity wins
+    latest = {}
+    for entry in entries:
+        latest[(entry.entity_type, entry.entity_id)] = entry
+
+    changed_ids = {}
+    deleted = []
+    for (entity_type, entity_id), entry in latest.items():
+        if entity_type not in SYNC_ENTITIES:
+            continue
+        if entry.operation == "deleted":
+            deleted.append(SyncTombstone(entity_type=entity_type, id=entity_id, deleted_at=entry.changed_at))
+        else:
+            changed_ids.setdefault(entity_type, []).append(entity_id)
+
+    # Rows deleted by a later change are simply missing here; their
+    # tombstone arrives on a later page
+    changes = {}
+    for entity_type, ids in changed_ids.items():
+        model, field = SYNC_ENTITIES[entity_type]
+        changes[field] = db.query(model).filter(model.id.in_(ids)).order_by(model.id).all()
+
+    return ResponseModel(
+        success=True,
+        data=SyncChangesResponse(
+            **changes,
+            deleted=deleted,
+            cursor=entries[-1].id if entries else since,
+            has_more=has_more,
+        ),
+        message="Changes retrieved successfully"
+    )
@@ -0,0 +1,142 @@
+# ==================== System Routes ====================
+# File: app/api/v1/routes/system.py
+
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.api.deps import get_current_admin_user
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models import User, Workout, Goal, BodyMeasurement
+
+router = APIRouter(prefix="/admin/system", tags=["Admin - System"])
+
+
+# ==================== Metrics (Admin) ====================
+
+@router.get("/metrics")
+async def get_metrics(current_user: User = Depends(get_current_admin_user)):
+    """
+    Snapshot of in-process counters for this worker (Admin only)
+    """
+    return {
+        "success": True,
+        "data": metrics.snapshot(),
+        "message": "Metrics retrieved successfully"
+    }
+
+
+# ==================== Database (Admin) ====================
+
+@router.get("/database")
+async def get_database_stats(current_user: User = Depends(get_current_admin_user)):
+    """
+    WAL size, page and freelist statistics of each SQLite file, with the
+    maintenance scheduler's last actions (Admin only)
+    """
+    from app.db.maintenance import scheduler
+
+    return {
+        "success": True,
+        "data": {"databases": await run_in_threadpool(scheduler.report)},
+        "message": "Database statistics retrieved successfully"
+    }
+
+
+# ==================== Shards (Admin) ====================
+
+def _shard_counts(db: Session):
+    return {
+        "workouts": db.query(func.count(Workout.id)).scalar(),
+        "goals": db.query(func.count(Goal.id)).scalar(),
+        "measurements": db.query(func.count(BodyMeasurement.id)).scalar(),
+    }
+
+
+@router.get("/shards")
+async def get_shards(current_user: User = Depends(get_current_admin_user)):
+    """
+    Per-tenant shard sizes and row counts, queried in parallel (Admin only)
+    """
+    if not settings.SHARDING_ENABLED:
+        raise HTTPException(status_code=404, detail="Sharding is disabled")
+
+    from app.db.sharding import shards
+
+    counts = await run_in_threadpool(shards.fan_out, _shard_counts)
+    tenants = [
+        {
+            "tenant_id": tenant_id,
+            "path": shards.path(tenant_id),
+            "size_bytes": os.path.getsize(shards.path(tenant_id)) if rows is not None else 0,
+            "rows": rows,
+        }
+        for tenant_id, rows in counts.items()
+    ]
+    return {
+        "success": True,
+        "data": {"shards": tenants, "cache": shards.stats()},
+        "message": "Shards retrieved successfully"
+    }
+
+
+# ==================== Jobs (Admin) ====================
+
+@router.get("/jobs")
+async def list_jobs(current_user: User = Depends(get_current_admin_user)):
+    """
+    Recent background jobs of this worker, newest first (Admin only)
+    """
+    from app.core.jobs import jobs
+
+    return {
+        "success": True,
+        "data": {"jobs": jobs.list(), "stats": jobs.stats()},
+        "message": "Jobs retrieved successfully"
+    }
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, current_user: User = Depends(get_current_admin_user)):
+    """
+    Status, progress and row errors of a background job (Admin only)
+    """
+    from app.core.jobs import jobs
+
+    job = jobs.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "success": True,
+        "data": job,
+        "message": "Job retrieved successfully"
+    }
+
+
+# ==================== Profiling (Admin) ====================
+
+@router.post("/profile")
+async def profile_worker(
+    seconds: float = Query(10, gt=0, description="Sampling window in seconds"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """
+    Sample every thread of this worker for N seconds (Admin only)
+
+    Returns a collapsed-stack file that can be fed to flamegraph.pl or speedscope.
+    """
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if seconds > settings.PROFILING_MAX_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Profiling window is limited to {settings.PROFILING_MAX_SECONDS} seconds"
+        )
+
+    from app.core import profiling
+
+    profiler = await run_in_threadpool(profiling.profile_for, seconds)
+    return profiling.collapsed_response(profiler, filename="worker.collapsed")
@@ -4,15 +4,18 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.db.writer import writer
 from app.api.deps import get_current_admin_user, PaginationParams
 from app.schemas import (
     TenantCreate, TenantResponse,
     TenantConfigUpdate, TenantConfigResponse
 )
 from app.models import User, Tenant, TenantConfigs
-from app.api.responses import ResponseModel, PaginatedResponse
+from app.api.responses import ResponseModel, PaginatedResponse, PrevalidatedRoute
+from app.core.tenant_config import tenant_configs
+from app.db.usage import get_usage
 
-router = APIRouter(prefix="/tenants", tags=["Tenants (Admin Only)"])
+router = APIRouter(prefix="/tenants", tags=["Tenants (Admin Only)"], route_class=PrevalidatedRoute)
 
 
 @router.post("", response_model=ResponseModel[TenantResponse])
@@ -28,15 +31,20 @@ async def create_tenant(
     if existing_tenant:
         raise HTTPException(status_code=400, detail="Tenant name already exists")
     
-    tenant = Tenant(**tenant_data.dict())
-    db.add(tenant)
-    db.commit()
-    db.refresh(tenant)
+    def unit(session: Session):
+        tenant = Tenant(**tenant_data.dict())
+        session.add(tenant)
+        session.flush()
+        # Create default tenant config
+        config = TenantConfigs(tenant_id=tenant.id)
+        session.add(config)
+        session.flush()
+        session.refresh(tenant)
+        session.refresh(config)
+        return tenant, config
     
-    # Create default tenant config
-    config = TenantConfigs(tenant_id=tenant.id)
-    db.add(config)
-    db.commit()
+    tenant, config = await writer.run(unit)
+    tenant_configs.put(config)
     
     return ResponseModel(
         success=True,
@@ -78,26 +86,48 @@ async def list_tenants(
 async def update_tenant_config(
     tenant_id: int,
     config_data: TenantConfigUpdate,
-    current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_admin_user)
 ):
     """
     Update tenant configuration (Admin only)
     """
-    config = db.query(TenantConfigs).filter(TenantConfigs.tenant_id == tenant_id).first()
-    
-    if not config:
-        raise HTTPException(status_code=404, detail="Tenant config not found")
-    
     update_data = config_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(config, field, value)
     
-    db.commit()
-    db.refresh(config)
+    def unit(session: Session) -> TenantConfigs:
+        config = session.query(TenantConfigs).filter(TenantConfigs.tenant_id == tenant_id).first()
+        if not config:
+            raise HTTPException(status_code=404, detail="Tenant config not found")
+        for field, value in update_data.items():
+            setattr(config, field, value)
+        session.flush()
+        session.refresh(config)
+        return config
+    
+    config = await writer.run(unit)
+    # Other workers pick the change up through data_version polling
+    tenant_configs.put(config)
     
     return ResponseModel(
         success=True,
         data=config,
         message="Tenant configuration updated successfully"
     )
+
+
+@router.get("/{tenant_id}/usage", response_model=ResponseModel[dict])
+async def get_tenant_usage(
+    tenant_id: int,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Tenant usage counters and quota limits (Admin only)
+    """
+    if db.get(Tenant, tenant_id) is None:
+        raise HTTPException(status_code=404, detail="Tenant not found")
+    
+    return ResponseModel(
+        success=True,
+        data=get_usage(db, tenant_id),
+        message="Tenant usage retrieved successfully"
+    )
@@ -1,9 +1,10 @@
 # ==================== User Profile Routes ====================
 # File: app/api/v1/routes/users.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.db.writer import writer
 from app.api.deps import get_current_user
 from app.schemas import (
     UserProfileResponse, UserProfileUpdate, UserDetailResponse,
@@ -11,12 +12,14 @@ from app.schemas import (
     UserConsentCreate, UserConsentResponse
 )
 from app.models import User, UserProfile, NotificationPreference, UserConsent
-from app.api.responses import ResponseModel
+from app.core.cache import cache_per_user, response_cache
+from app.api.responses import ResponseModel, PrevalidatedRoute
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=PrevalidatedRoute)
 
 
 @router.get("/me", response_model=ResponseModel[UserDetailResponse])
+@cache_per_user
 async def get_current_user_profile(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -34,23 +37,25 @@ async def get_current_user_profile(
 @router.put("/me/profile", response_model=ResponseModel[UserProfileResponse])
 async def update_profile(
     profile_data: UserProfileUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Update current user's profile
     """
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
-    
-    if not profile:
-        raise HTTPException(status_code=404, detail="Profile not found")
-    
     update_data = profile_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(profile, field, value)
     
-    db.commit()
-    db.refresh(profile)
+    def unit(session: Session) -> UserProfile:
+        profile = session.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+        if not profile:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        for field, value in update_data.items():
+            setattr(profile, field, value)
+        session.flush()
+        session.refresh(profile)
+        return profile
+    
+    profile = await writer.run(unit)
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
@@ -62,25 +67,27 @@ async def update_profile(
 @router.put("/me/notifications", response_model=ResponseModel[NotificationPreferenceResponse])
 async def update_notification_preferences(
     notif_data: NotificationPreferenceUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Update notification preferences
     """
-    notif_pref = db.query(NotificationPreference).filter(
-        NotificationPreference.user_id == current_user.id
-    ).first()
-    
-    if not notif_pref:
-        raise HTTPException(status_code=404, detail="Notification preferences not found")
-    
     update_data = notif_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(notif_pref, field, value)
     
-    db.commit()
-    db.refresh(notif_pref)
+    def unit(session: Session) -> NotificationPreference:
+        notif_pref = session.query(NotificationPreference).filter(
+            NotificationPreference.user_id == current_user.id
+        ).first()
+        if not notif_pref:
+            raise HTTPException(status_code=404, detail="Notification preferences not found")
+        for field, value in update_data.items():
+            setattr(notif_pref, field, value)
+        session.flush()
+        session.refresh(notif_pref)
+        return notif_pref
+    
+    notif_pref = await writer.run(unit)
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
@@ -92,28 +99,60 @@ async def update_notification_preferences(
 @router.post("/me/consents", response_model=ResponseModel[UserConsentResponse])
 async def create_consent(
     consent_data: UserConsentCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Record user consent (GDPR/CCPA compliance)
     """
     from datetime import datetime
     
-    consent = UserConsent(
+    consent = await writer.add(UserConsent(
         user_id=current_user.id,
         consent_type=consent_data.consent_type,
         granted=consent_data.granted,
         version=consent_data.version,
         granted_at=datetime.utcnow() if consent_data.granted else None
-    )
-    
-    db.add(consent)
-    db.commit()
-    db.refresh(consent)
+    ))
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
         data=consent,
         message="Consent recorded successfully"
     )
+
+
+# ==================== Data Export ====================
+
+@router.post("/me/export")
+async def export_my_data(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Export everything held about the current user (GDPR/CCPA right of access)
+    
+    The archive is a ZIP of NDJSON files, one per table, plus a manifest.
+    Large accounts are exported by a background job (202); download the
+    archive from download_url once it is ready.
+    """
+    from app.api.exports import start_export
+    
+    return await start_export(
+        current_user, current_user,
+        lambda export_id: str(request.url_for("download_my_export", export_id=export_id))
+    )
+
+
+@router.get("/me/exports/{export_id}")
+async def download_my_export(
+    export_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download an export of the current user's data (Range requests supported)
+    """
+    from app.api.exports import serve_export
+    
+    return serve_export(request, current_user.id, export_id)
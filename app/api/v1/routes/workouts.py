@@ -1,11 +1,12 @@
 # ==================== Workout Routes ====================
 # File: app/api/v1/routes/workouts.py
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import Optional
 from app.db.session import get_db
+from app.db.writer import writer_for
 from app.api.deps import get_current_user, PaginationParams
 from app.schemas.workout import (
     WorkoutCreate, WorkoutUpdate, WorkoutResponse, WorkoutWithExercisesResponse,
@@ -13,16 +14,34 @@ from app.schemas.workout import (
     CardioActivityCreate, CardioActivityResponse
 )
 from app.models import User, Workout, StrengthExercise, CardioActivity
-from app.api.responses import ResponseModel, PaginatedResponse
+from app.api.conditional import check_conditional, collection_validator, entity_validator
+from app.core.cache import cache_per_user, response_cache
+from app.api.responses import ResponseModel, PaginatedResponse, PrevalidatedRoute
+from app.db.projection import Projection
 
-router = APIRouter(prefix="/workouts", tags=["Workouts"])
+router = APIRouter(prefix="/workouts", tags=["Workouts"], route_class=PrevalidatedRoute)
+
+WORKOUT_LIST = Projection(Workout, WorkoutResponse)
+WORKOUT_CHILDREN = (Workout.strength_exercises, Workout.cardio_activities, Workout.media)
+
+
+def _owned_workout(session: Session, workout_id: int, user_id: int) -> Workout:
+    """
+    Look up a workout inside a write unit; 404/403 roll the unit back
+    """
+    workout = session.get(Workout, workout_id)
+    if not workout:
+        raise HTTPException(status_code=404, detail="Workout not found")
+    # Tenant isolation check
+    if workout.user_id != user_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return workout
 
 
 @router.post("", response_model=ResponseModel[WorkoutResponse])
 async def create_workout(
     workout_data: WorkoutCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Create a new workout
@@ -31,10 +50,8 @@ async def create_workout(
     if workout_data.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Cannot create workout for other users")
     
-    workout = Workout(**workout_data.dict())
-    db.add(workout)
-    db.commit()
-    db.refresh(workout)
+    workout = await writer_for(current_user.tenant_id).add(Workout(**workout_data.dict()))
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
@@ -44,7 +61,9 @@ async def create_workout(
 
 
 @router.get("", response_model=PaginatedResponse[WorkoutResponse])
+@cache_per_user
 async def list_workouts(
+    request: Request,
     pagination: PaginationParams = Depends(),
     workout_type: Optional[str] = Query(None),
     from_date: Optional[datetime] = Query(None),
@@ -65,14 +84,18 @@ async def list_workouts(
     if to_date:
         query = query.filter(Workout.workout_datetime <= to_date)
     
-    # Get total count
-    total_items = query.count()
-    
-    # Apply pagination
-    workouts = query.order_by(Workout.workout_datetime.desc())\
-        .offset(pagination.skip)\
-        .limit(pagination.page_size)\
-        .all()
+    # Count and validator from one aggregate; answer 304 before loading rows
+    total_items, validator = collection_validator(query, Workout, current_user.id, request.url.query)
+    not_modified = check_conditional(request, validator)
+    if not_modified:
+        return not_modified
+    
+    # Apply pagination (columns only, no ORM entities)
+    workouts = WORKOUT_LIST.fetch(
+        query.order_by(Workout.workout_datetime.desc())
+        .offset(pagination.skip)
+        .limit(pagination.page_size)
+    )
     
     total_pages = (total_items + pagination.page_size - 1) // pagination.page_size
     
@@ -90,21 +113,29 @@ async def list_workouts(
 @router.get("/{workout_id}", response_model=ResponseModel[WorkoutWithExercisesResponse])
 async def get_workout(
     workout_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
     Get workout details with exercises
     """
-    workout = db.query(Workout).filter(Workout.id == workout_id).first()
+    state = entity_validator(db, Workout, workout_id, children=WORKOUT_CHILDREN)
     
-    if not workout:
+    if not state:
         raise HTTPException(status_code=404, detail="Workout not found")
     
     # Tenant isolation check
-    if workout.user_id != current_user.id:
+    owner_id, validator = state
+    if owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
     
+    not_modified = check_conditional(request, validator)
+    if not_modified:
+        return not_modified
+    
+    workout = db.query(Workout).filter(Workout.id == workout_id).first()
+    
     return ResponseModel(
         success=True,
         data=workout,
@@ -116,27 +147,23 @@ async def get_workout(
 async def update_workout(
     workout_id: int,
     workout_data: WorkoutUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Update workout
     """
-    workout = db.query(Workout).filter(Workout.id == workout_id).first()
-    
-    if not workout:
-        raise HTTPException(status_code=404, detail="Workout not found")
-    
-    # Tenant isolation check
-    if workout.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
     update_data = workout_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(workout, field, value)
     
-    db.commit()
-    db.refresh(workout)
+    def unit(session: Session) -> Workout:
+        workout = _owned_workout(session, workout_id, current_user.id)
+        for field, value in update_data.items():
+            setattr(workout, field, value)
+        session.flush()
+        session.refresh(workout)
+        return workout
+    
+    workout = await writer_for(current_user.tenant_id).run(unit)
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
@@ -148,23 +175,16 @@ async def update_workout(
 @router.delete("/{workout_id}", response_model=ResponseModel[None])
 async def delete_workout(
     workout_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Delete workout
     """
-    workout = db.query(Workout).filter(Workout.id == workout_id).first()
-    
-    if not workout:
-        raise HTTPException(status_code=404, detail="Workout not found")
-    
-    # Tenant isolation check
-    if workout.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    def unit(session: Session):
+        session.delete(_owned_workout(session, workout_id, current_user.id))
     
-    db.delete(workout)
-    db.commit()
+    await writer_for(current_user.tenant_id).run(unit)
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
@@ -177,25 +197,21 @@ async def delete_workout(
 async def add_strength_exercise(
     workout_id: int,
     exercise_data: StrengthExerciseCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Add strength exercise to workout
     """
-    workout = db.query(Workout).filter(Workout.id == workout_id).first()
-    
-    if not workout:
-        raise HTTPException(status_code=404, detail="Workout not found")
-    
-    # Tenant isolation check
-    if workout.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    def unit(session: Session) -> StrengthExercise:
+        _owned_workout(session, workout_id, current_user.id)
+        exercise = StrengthExercise(**exercise_data.dict())
+        session.add(exercise)
+        session.flush()
+        session.refresh(exercise)
+        return exercise
     
-    exercise = StrengthExercise(**exercise_data.dict())
-    db.add(exercise)
-    db.commit()
-    db.refresh(exercise)
+    exercise = await writer_for(current_user.tenant_id).run(unit)
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
@@ -208,25 +224,21 @@ async def add_strength_exercise(
 async def add_cardio_activity(
     workout_id: int,
     activity_data: CardioActivityCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """
     Add cardio activity to workout
     """
-    workout = db.query(Workout).filter(Workout.id == workout_id).first()
-    
-    if not workout:
-        raise HTTPException(status_code=404, detail="Workout not found")
-    
-    # Tenant isolation check
-    if workout.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    activity = CardioActivity(**activity_data.dict())
-    db.add(activity)
-    db.commit()
-    db.refresh(activity)
+    def unit(session: Session) -> CardioActivity:
+        _owned_workout(session, workout_id, current_user.id)
+        activity = CardioActivity(**activity_data.dict())
+        session.add(activity)
+        session.flush()
+        session.refresh(activity)
+        return activity
+    
+    activity = await writer_for(current_user.tenant_id).run(unit)
+    response_cache.bump_generation(current_user.id)
     
     return ResponseModel(
         success=True,
@@ -0,0 +1,225 @@
+# ==================== Admission Control ====================
+# File: app/core/admission.py
+
+"""
+Per-worker admission control and load shedding.
+
+Requests are sorted into pools (reads, writes, expensive admin routes),
+each with its own concurrency limit, bounded wait queue and deadline.
+When a pool is full, requests wait in per-tenant queues served round-robin,
+so one busy tenant cannot starve the others, and a single tenant may hold
+at most a share of the queue. A request is rejected straight away with
+``503`` and ``Retry-After`` when the queue is full or its expected wait
+(queue position x recent service time / limit) exceeds the deadline, and
+again if it is still queued when the deadline passes.
+
+Shedding early keeps latency bounded for admitted requests instead of
+letting them pile up behind SQLite's busy_timeout.
+"""
+
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+# Served without admission: health checks, docs and the metrics themselves
+EXEMPT_PATHS = {
+    "/", "/health", "/openapi.json", "/docs", "/redoc",
+    f"{settings.API_V1_PREFIX}/admin/system/metrics",
+}
+EXPENSIVE_PREFIXES = (f"{settings.API_V1_PREFIX}/admin",)
+
+# Weight of the newest sample in the service-time average
+EWMA_ALPHA = 0.2
+
+
+class Shed(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionPool:
+    """
+    Concurrency limit with a bounded, tenant-fair wait queue
+    """
+    def __init__(self, name: str, limit: int, queue_limit: int, deadline: float, tenant_share: float):
+        self.name = name
+        self.limit = limit
+        self.queue_limit = queue_limit
+        self.deadline = deadline
+        self.tenant_queue_limit = max(1, int(queue_limit * tenant_share))
+        self.active = 0
+        self.queued = 0
+        self._queues: "OrderedDict[Any, Deque[asyncio.Future]]" = OrderedDict()
+        self.service_time = 0.05  # seconds, EWMA
+        self.admitted = 0
+        self.queued_total = 0
+        self.shed: Dict[str, int] = {"queue_full": 0, "tenant_share": 0, "deadline": 0, "timeout": 0}
+
+    def expected_wait(self, position: int) -> float:
+        return self.service_time * position / self.limit
+
+    def _reject(self, reason: str, position: int) -> Shed:
+        self.shed[reason] += 1
+        return Shed(reason, max(1.0, self.expected_wait(position)))
+
+    async def acquire(self, tenant: Any):
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            self.admitted += 1
+            return
+
+        position = self.queued + 1
+        if self.queued >= self.queue_limit:
+            raise self._reject("queue_full", position)
+        queue = self._queues.get(tenant)
+        if queue is not None and len(queue) >= self.tenant_queue_limit:
+            raise self._reject("tenant_share", position)
+        if self.expected_wait(position) > self.deadline:
+            raise self._reject("deadline", position)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(tenant, deque()).append(future)
+        self.queued += 1
+        self.queued_total += 1
+        try:
+            done, _ = await asyncio.wait({future}, timeout=self.deadline)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(None)  # slot was handed over; give it back
+            else:
+                self._remove(tenant, future)
+            raise
+        if not done:
+            self._remove(tenant, future)
+            raise self._reject("timeout", self.queued + 1)
+        self.admitted += 1
+
+    def _remove(self, tenant: Any, future: asyncio.Future):
+        queue = self._queues.get(tenant)
+        if queue is not None and future in queue:
+            queue.remove(future)
+            self.queued -= 1
+            if not queue:
+                del self._queues[tenant]
+        future.cancel()
+
+    def release(self, service_time: Optional[float]):
+        if service_time is not None:
+            self.service_time += EWMA_ALPHA * (service_time - self.service_time)
+        # Hand the slot to the next tenant in round-robin order
+        while self._queues:
+            tenant, queue = next(iter(self._queues.items()))
+            future = queue.popleft()
+            self.queued -= 1
+            if queue:
+                self._queues.move_to_end(tenant)
+            else:
+                del self._queues[tenant]
+            if not future.done():
+                future.set_result(True)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "queue_limit": self.queue_limit,
+            "queued_tenants": len(self._queues),
+            "deadline_s": self.deadline,
+            "service_time_ms": round(self.service_time * 1000, 2),
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "shed": dict(self.shed),
+        }
+
+
+def _tenant_of(headers: Headers) -> Any:
+    """
+    Tenant id from a valid bearer token; unauthenticated traffic shares one queue
+    """
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]).get("tenant_id")
+    except JWTError:
+        return None
+
+
+class AdmissionMiddleware:
+    """
+    Admit, queue or shed each HTTP request according to its pool
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        share = settings.ADMISSION_TENANT_QUEUE_SHARE
+        queue_limit = settings.ADMISSION_QUEUE_LIMIT
+        self.pools = {
+            "read": AdmissionPool("read", settings.ADMISSION_READ_LIMIT, queue_limit,
+                                  settings.ADMISSION_READ_DEADLINE, share),
+            "write": AdmissionPool("write", settings.ADMISSION_WRITE_LIMIT, queue_limit,
+                                   settings.ADMISSION_WRITE_DEADLINE, share),
+            "expensive": AdmissionPool("expensive", settings.ADMISSION_EXPENSIVE_LIMIT, queue_limit,
+                                       settings.ADMISSION_EXPENSIVE_DEADLINE, share),
+        }
+        metrics.register("admission", self.stats)
+
+    def classify(self, scope: Scope) -> Optional[AdmissionPool]:
+        path = scope["path"]
+        if path in EXEMPT_PATHS:
+            return None
+        if path.startswith(EXPENSIVE_PREFIXES):
+            return self.pools["expensive"]
+        return self.pools["read" if scope["method"] in READ_METHODS else "write"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        pool = self.classify(scope) if scope["type"] == "http" else None
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await pool.acquire(_tenant_of(Headers(scope=scope)))
+        except Shed as shed:
+            await _busy_response(send, pool.name, shed)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release(time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": settings.ADMISSION_ENABLED, **{name: pool.stats() for name, pool in self.pools.items()}}
+
+
+async def _busy_response(send: Send, pool: str, shed: Shed):
+    body = json.dumps({
+        "success": False,
+        "data": None,
+        "message": "Server is busy, please retry later",
+    }).encode()
+    headers: Tuple[Tuple[bytes, bytes], ...] = (
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(math.ceil(shed.retry_after)).encode()),
+        (b"x-shed-reason", f"{pool}:{shed.reason}".encode()),
+    )
+    await send({"type": "http.response.start", "status": 503, "headers": list(headers)})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,185 @@
+# ==================== Per-User Response Cache ====================
+# File: app/core/cache.py
+
+"""
+Per-user cache of serialized GET responses.
+
+Entries are keyed by (user, generation, path, normalized query) and hold
+the response bytes. Every user has a generation counter; any write that
+changes what the user can read bumps it, so older entries simply stop
+matching and age out of the LRU. Invalidation is O(1) and never serves
+stale data within a worker.
+
+Generations live in process memory by default, so a write handled by one
+worker would not invalidate another worker's entries. The pre-fork launcher
+(app/serve.py) calls ``share_generations()`` before forking, which moves
+the counters into shared memory: a fixed table indexed by user id modulo
+its size, where collisions only cause extra invalidations. A cache whose
+generations nobody can vouch for is never consulted: it stays off until
+the launcher calls ``share_generations()`` (several workers) or
+``enable()`` (a single one), so workers started any other way (e.g.
+``uvicorn --workers``) always render fresh responses.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+# Query parameters that never change the response body
+IGNORED_QUERY_PARAMS = {"__profile"}
+
+# Headers stored alongside the body and replayed on a hit
+CACHED_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+# Rough per-entry bookkeeping cost (key tuple, entry object, OrderedDict node)
+ENTRY_OVERHEAD_BYTES = 256
+
+# Shared generation table size (8 bytes per slot)
+SHARED_GENERATION_SLOTS = 1 << 16
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    status_code: int
+    headers: Tuple[Tuple[str, str], ...]
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + ENTRY_OVERHEAD_BYTES
+
+
+class ResponseCache:
+    """
+    Byte-capped LRU of serialized responses with per-user generations
+    """
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[tuple, CachedResponse]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._shared = None
+        self._shared_lock = None
+        self.enabled = False
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    # ---------- Generations ----------
+
+    def enable(self):
+        """
+        Serve from the cache; only safe when this process sees every write
+        """
+        self.enabled = True
+
+    def share_generations(self, slots: int = SHARED_GENERATION_SLOTS):
+        """
+        Keep generations in shared memory; call before forking workers
+        """
+        import multiprocessing  # only the pre-fork launcher needs it
+
+        self._shared = multiprocessing.RawArray("Q", slots)
+        self._shared_lock = multiprocessing.Lock()
+        self.enabled = True
+
+    def generation(self, user_id: int) -> int:
+        if self._shared is not None:
+            return self._shared[user_id % len(self._shared)]
+        return self._generations.get(user_id, 0)
+
+    def bump_generation(self, user_id: int):
+        """
+        Invalidate everything cached for ``user_id``
+        """
+        if self._shared is not None:
+            with self._shared_lock:
+                self._shared[user_id % len(self._shared)] += 1
+        else:
+            with self._lock:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        self.invalidations += 1
+
+    # ---------- Entries ----------
+
+    @staticmethod
+    def make_key(user_id: int, generation: int, path: str, query_items) -> tuple:
+        query = tuple(sorted(
+            (name, value) for name, value in query_items
+            if value != "" and name not in IGNORED_QUERY_PARAMS
+        ))
+        return (user_id, generation, path, query)
+
+    def get(self, key: tuple) -> Optional[CachedResponse]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, entry: CachedResponse):
+        if not self.enabled or entry.size > self.max_entry_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._entries[key] = entry
+            self._size += entry.size
+            self.stores += 1
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.RESPONSE_CACHE_ENABLED and self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def cache_per_user(endpoint: Callable) -> Callable:
+    """
+    Mark a GET endpoint as cacheable per user.
+
+    Takes effect on routers using ``PrevalidatedRoute``; writes that affect
+    the user must call ``response_cache.bump_generation(user_id)``.
+    """
+    endpoint.__cache_per_user__ = True
+    return endpoint
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+    max_entry_bytes=settings.RESPONSE_CACHE_MAX_ENTRY_KB * 1024,
+)
+metrics.register("response_cache", response_cache.stats)
@@ -0,0 +1,336 @@
+# ==================== Response Compression ====================
+# File: app/core/compression.py
+
+"""
+Negotiated response compression (zstd, brotli, gzip) as ASGI middleware.
+
+- Picks the best encoding from Accept-Encoding that is installed here;
+  brotli (``brotli``) and zstd (``zstandard``) are optional packages,
+  gzip is always available.
+- Bodies below COMPRESSION_MIN_SIZE and non-text content types are sent
+  as they are.
+- Streaming responses without a Content-Length are compressed chunk by
+  chunk, flushing each chunk so clients keep receiving data as it is
+  produced.
+- Payloads that rarely change (``static_paths``, e.g. the OpenAPI
+  document) are cached by content hash, so each distinct body is
+  compressed once per encoding.
+
+CPU time and bytes in/out per encoding are reported through the metrics
+registry.
+"""
+
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/javascript", "application/xml",
+    "application/x-ndjson", "image/svg+xml", "text/",
+)
+
+# Server preference when the client weighs encodings equally
+PREFERENCE = ("zstd", "br", "gzip")
+
+STATIC_CACHE_ENTRIES = 64
+
+
+# ==================== Encoders ====================
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return tuple(
+        name for name in PREFERENCE
+        if name == "gzip" or (name == "br" and brotli) or (name == "zstd" and zstandard)
+    )
+
+
+def compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compress(body)
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    stream = _GzipStream(settings.COMPRESSION_GZIP_LEVEL)
+    return stream.compress(body) + stream.finish()
+
+
+def open_stream(encoding: str):
+    if encoding == "zstd":
+        return _ZstdStream(settings.COMPRESSION_ZSTD_LEVEL)
+    if encoding == "br":
+        return _BrotliStream(settings.COMPRESSION_BROTLI_QUALITY)
+    return _GzipStream(settings.COMPRESSION_GZIP_LEVEL)
+
+
+def negotiate(accept_encoding: str, available: Tuple[str, ...]) -> Optional[str]:
+    """
+    Best available encoding for an Accept-Encoding header, or None
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in available:
+        q = weights.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+# ==================== Stats ====================
+
+class CompressionStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_encoding: Dict[str, Dict[str, float]] = {}
+        self.skipped_small = 0
+        self.static_hits = 0
+        self.static_misses = 0
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: float, streamed: bool = False):
+        with self._lock:
+            stats = self.by_encoding.setdefault(encoding, {
+                "responses": 0, "streamed": 0, "bytes_in": 0, "bytes_out": 0, "cpu_ms": 0.0,
+            })
+            stats["responses"] += 0 if streamed else 1
+            stats["streamed"] += 1 if streamed else 0
+            stats["bytes_in"] += bytes_in
+            stats["bytes_out"] += bytes_out
+            stats["cpu_ms"] += cpu_seconds * 1000
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            encodings = {}
+            for name, stats in self.by_encoding.items():
+                saved = stats["bytes_in"] - stats["bytes_out"]
+                encodings[name] = {
+                    **stats,
+                    "cpu_ms": round(stats["cpu_ms"], 3),
+                    "bytes_saved": saved,
+                    "ratio": round(stats["bytes_out"] / stats["bytes_in"], 4) if stats["bytes_in"] else None,
+                }
+            return {
+                "enabled": settings.COMPRESSION_ENABLED,
+                "available": list(available_encodings()),
+                "encodings": encodings,
+                "skipped_small": self.skipped_small,
+                "static_hits": self.static_hits,
+                "static_misses": self.static_misses,
+            }
+
+
+compression_stats = CompressionStats()
+metrics.register("compression", compression_stats.snapshot)
+
+
+# ==================== Middleware ====================
+
+class CompressionMiddleware:
+    """
+    Compress responses for clients that accept it
+    """
+    def __init__(self, app: ASGIApp, minimum_size: int, static_paths: Tuple[str, ...] = ()):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.static_paths = set(static_paths)
+        self.available = available_encodings()
+        self._static: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._static_lock = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.available)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, encoding, scope["path"] in self.static_paths, send)
+        await self.app(scope, receive, responder.send)
+
+    def compress_body(self, encoding: str, body: bytes, static: bool) -> bytes:
+        if not static:
+            return self._timed(encoding, body)
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._static_lock:
+            cached = self._static.get(key)
+            if cached is not None:
+                self._static.move_to_end(key)
+                compression_stats.static_hits += 1
+                return cached
+        compressed = self._timed(encoding, body)
+        with self._static_lock:
+            compression_stats.static_misses += 1
+            self._static[key] = compressed
+            while len(self._static) > STATIC_CACHE_ENTRIES:
+                self._static.popitem(last=False)
+        return compressed
+
+    @staticmethod
+    def _timed(encoding: str, body: bytes) -> bytes:
+        started = time.thread_time()
+        compressed = compress(encoding, body)
+        compression_stats.record(encoding, len(body), len(compressed), time.thread_time() - started)
+        return compressed
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, static: bool, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.static = static
+        self._send = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.stream = None
+        self.buffer: Optional[list] = None
+        self.stream_in = 0
+        self.stream_out = 0
+        self.stream_cpu = 0.0
+
+    def _headers(self) -> MutableHeaders:
+        return MutableHeaders(scope=self.start)
+
+    def _mark_encoded(self, headers: MutableHeaders):
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # The compressed bytes differ, so a strong validator no longer holds
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            return
+
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        if self.passthrough:
+            if self.start is not None:
+                await self._send(self.start)
+                self.start = None
+            await self._send(message)
+            return
+
+        if self.stream is not None:
+            await self._stream_chunk(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = self._headers()
+
+        # A body with a declared length (including one that an inner
+        # BaseHTTPMiddleware re-chunks) is collected and compressed in one go
+        if self.buffer is not None or (more_body and "content-length" in headers):
+            self.buffer = (self.buffer or []) + [body]
+            if more_body:
+                return
+            body, self.buffer = b"".join(self.buffer), None
+            more_body = False
+
+        if not more_body:
+            if len(body) < self.middleware.minimum_size:
+                compression_stats.skipped_small += 1
+                await self._send(self.start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            compressed = self.middleware.compress_body(self.encoding, body, self.static)
+            self._mark_encoded(headers)
+            headers["Content-Length"] = str(len(compressed))
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        # Streaming response of unknown length: compress as it is produced
+        self.stream = open_stream(self.encoding)
+        self._mark_encoded(headers)
+        await self._send(self.start)
+        await self._stream_chunk(message)
+
+    async def _stream_chunk(self, message: Message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        started = time.thread_time()
+        out = self.stream.compress(body) if body else b""
+        if not more_body:
+            out += self.stream.finish()
+        self.stream_cpu += time.thread_time() - started
+        self.stream_in += len(body)
+        self.stream_out += len(out)
+        if not more_body:
+            compression_stats.record(self.encoding, self.stream_in, self.stream_out, self.stream_cpu, streamed=True)
+        await self._send({"type": "http.response.body", "body": out, "more_body": more_body})
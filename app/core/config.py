@@ -24,6 +24,14 @@ class Settings(BaseSettings):
     SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
     SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
     
+    # Production launcher (python -m app.serve); WORKERS=0 means one per CPU
+    WORKERS: int = int(os.getenv("WORKERS", "0"))
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))
+    KEEPALIVE_TIMEOUT: int = int(os.getenv("KEEPALIVE_TIMEOUT", "5"))
+    MAX_REQUESTS: int = int(os.getenv("MAX_REQUESTS", "10000"))
+    MAX_REQUESTS_JITTER: int = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+    GRACEFUL_TIMEOUT: int = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+    
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-change-me")
     ALGORITHM: str = "HS256"
@@ -35,6 +43,88 @@ class Settings(BaseSettings):
         "sqlite:///./fitness_tracking.db"
     )
     
+    # Single-writer queue (see app/db/writer.py): group commit window,
+    # units per transaction, and how long to retry a locked database (s)
+    WRITE_QUEUE_ENABLED: bool = os.getenv("WRITE_QUEUE_ENABLED", "True").lower() == "true"
+    WRITE_GROUP_COMMIT_MS: float = float(os.getenv("WRITE_GROUP_COMMIT_MS", "2"))
+    WRITE_BATCH_MAX: int = int(os.getenv("WRITE_BATCH_MAX", "64"))
+    WRITE_BUSY_TIMEOUT: float = float(os.getenv("WRITE_BUSY_TIMEOUT", "30"))
+    
+    # Read-only engine for GET/HEAD requests (see app/db/session.py)
+    READ_ENGINE_ENABLED: bool = os.getenv("READ_ENGINE_ENABLED", "True").lower() == "true"
+    READ_POOL_SIZE: int = int(os.getenv("READ_POOL_SIZE", "8"))
+    READ_CACHE_MB: int = int(os.getenv("READ_CACHE_MB", "64"))
+    READ_MMAP_MB: int = int(os.getenv("READ_MMAP_MB", "256"))
+    
+    # Database maintenance (see app/db/maintenance.py): WAL checkpoint
+    # thresholds, idle window, optimize/ANALYZE cadence, incremental vacuum
+    MAINTENANCE_ENABLED: bool = os.getenv("MAINTENANCE_ENABLED", "True").lower() == "true"
+    MAINTENANCE_INTERVAL: float = float(os.getenv("MAINTENANCE_INTERVAL", "5"))
+    MAINTENANCE_IDLE_SECONDS: float = float(os.getenv("MAINTENANCE_IDLE_SECONDS", "30"))
+    MAINTENANCE_BUSY_TIMEOUT: float = float(os.getenv("MAINTENANCE_BUSY_TIMEOUT", "0.2"))
+    WAL_CHECKPOINT_MB: int = int(os.getenv("WAL_CHECKPOINT_MB", "16"))
+    WAL_TRUNCATE_MB: int = int(os.getenv("WAL_TRUNCATE_MB", "64"))
+    WAL_AUTOCHECKPOINT_PAGES: int = int(os.getenv("WAL_AUTOCHECKPOINT_PAGES", "20000"))
+    OPTIMIZE_INTERVAL_MINUTES: float = float(os.getenv("OPTIMIZE_INTERVAL_MINUTES", "60"))
+    ANALYZE_INTERVAL_HOURS: float = float(os.getenv("ANALYZE_INTERVAL_HOURS", "24"))
+    VACUUM_FREELIST_PAGES: int = int(os.getenv("VACUUM_FREELIST_PAGES", "1000"))
+    VACUUM_STEP_PAGES: int = int(os.getenv("VACUUM_STEP_PAGES", "500"))
+    
+    # How often each worker checks whether another process changed tenant configs
+    TENANT_CONFIG_POLL_SECONDS: float = float(os.getenv("TENANT_CONFIG_POLL_SECONDS", "1"))
+    
+    # Recompute tenant usage counters from the base tables this often (0 = never)
+    USAGE_RECONCILE_MINUTES: float = float(os.getenv("USAGE_RECONCILE_MINUTES", "60"))
+    
+    # Online backups (see app/db/backup.py); BACKUP_INTERVAL_HOURS > 0 also
+    # takes them from the maintenance scheduler
+    BACKUP_DIR: str = os.getenv("BACKUP_DIR", "./backups")
+    BACKUP_STEP_PAGES: int = int(os.getenv("BACKUP_STEP_PAGES", "1024"))
+    BACKUP_STEP_SLEEP_MS: float = float(os.getenv("BACKUP_STEP_SLEEP_MS", "5"))
+    BACKUP_COMPRESS: bool = os.getenv("BACKUP_COMPRESS", "True").lower() == "true"
+    BACKUP_KEEP: int = int(os.getenv("BACKUP_KEEP", "7"))
+    BACKUP_INTERVAL_HOURS: float = float(os.getenv("BACKUP_INTERVAL_HOURS", "0"))
+    
+    # Background admin jobs (see app/core/jobs.py)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_HISTORY: int = int(os.getenv("JOB_HISTORY", "100"))
+    JOB_DIR: str = os.getenv("JOB_DIR", "./jobs")
+    JOB_MAX_ERRORS: int = int(os.getenv("JOB_MAX_ERRORS", "1000"))
+    JOB_PERSIST_INTERVAL: float = float(os.getenv("JOB_PERSIST_INTERVAL", "1.0"))
+    
+    # Bulk user provisioning (see app/db/provisioning.py); -1 hash workers
+    # = one per CPU, 0 = hash in the job's own thread
+    PROVISION_CHUNK_SIZE: int = int(os.getenv("PROVISION_CHUNK_SIZE", "500"))
+    PROVISION_HASH_WORKERS: int = int(os.getenv("PROVISION_HASH_WORKERS", "-1"))
+    PROVISION_MAX_MB: int = int(os.getenv("PROVISION_MAX_MB", "20"))
+    
+    # Users per transaction in bulk admin operations (see app/db/bulk_users.py)
+    BULK_CHUNK_SIZE: int = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+    # Rows deleted per transaction when purging users' data, and the
+    # account size above which a delete runs as a background job
+    PURGE_BATCH_ROWS: int = int(os.getenv("PURGE_BATCH_ROWS", "1000"))
+    PURGE_INLINE_MAX_ROWS: int = int(os.getenv("PURGE_INLINE_MAX_ROWS", "5000"))
+    
+    # Data subject exports (see app/db/export.py)
+    EXPORT_DIR: str = os.getenv("EXPORT_DIR", "./exports")
+    EXPORT_RETENTION_HOURS: float = float(os.getenv("EXPORT_RETENTION_HOURS", "24"))
+    EXPORT_INLINE_MAX_ROWS: int = int(os.getenv("EXPORT_INLINE_MAX_ROWS", "5000"))
+    EXPORT_FETCH_ROWS: int = int(os.getenv("EXPORT_FETCH_ROWS", "1000"))
+    
+    # Audit-log retention (see app/db/audit_archive.py): entries older than
+    # AUDIT_RETENTION_DAYS move to monthly archives; 0 keeps them all
+    AUDIT_RETENTION_DAYS: int = int(os.getenv("AUDIT_RETENTION_DAYS", "0"))
+    AUDIT_ARCHIVE_DIR: str = os.getenv("AUDIT_ARCHIVE_DIR", "./audit_archive")
+    AUDIT_ARCHIVE_INTERVAL_HOURS: float = float(os.getenv("AUDIT_ARCHIVE_INTERVAL_HOURS", "24"))
+    
+    # Tenant-per-database mode (see app/db/sharding.py); DATABASE_URL
+    # becomes the catalog and each tenant's data lives in SHARD_DIR
+    SHARDING_ENABLED: bool = os.getenv("SHARDING_ENABLED", "False").lower() == "true"
+    SHARD_DIR: str = os.getenv("SHARD_DIR", "./shards")
+    SHARD_MAX_OPEN: int = int(os.getenv("SHARD_MAX_OPEN", "32"))
+    SHARD_FANOUT_WORKERS: int = int(os.getenv("SHARD_FANOUT_WORKERS", "8"))
+    SHARD_WRITER_IDLE_SECONDS: float = float(os.getenv("SHARD_WRITER_IDLE_SECONDS", "30"))
+    
     # Azure (for future use)
     AZURE_STORAGE_CONNECTION_STRING: Optional[str] = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
     AZURE_STORAGE_CONTAINER_NAME: str = "workout-media"
@@ -51,6 +141,47 @@ class Settings(BaseSettings):
     DEFAULT_PAGE_SIZE: int = 20
     MAX_PAGE_SIZE: int = 100
     
+    # Sync feed: change-log entries per /sync/changes page
+    SYNC_DEFAULT_LIMIT: int = 200
+    SYNC_MAX_LIMIT: int = 1000
+    
+    # Audit-log query API: entries per /admin/audit-logs page
+    AUDIT_QUERY_DEFAULT_LIMIT: int = 100
+    AUDIT_QUERY_MAX_LIMIT: int = 1000
+    
+    # Serialize responses once with cached TypeAdapters (see app/api/responses.py)
+    FAST_JSON_RESPONSES: bool = os.getenv("FAST_JSON_RESPONSES", "True").lower() == "true"
+    
+    # Per-user response cache for hot GET endpoints; only served from when
+    # launched through app/serve.py (see app/core/cache.py)
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "True").lower() == "true"
+    RESPONSE_CACHE_MAX_MB: int = int(os.getenv("RESPONSE_CACHE_MAX_MB", "64"))
+    RESPONSE_CACHE_MAX_ENTRY_KB: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRY_KB", "512"))
+    
+    # API docs: /openapi.json is always served (prebuilt from OPENAPI_PATH if
+    # set, see app/core/openapi.py); /docs and /redoc only when enabled
+    DOCS_ENABLED: bool = os.getenv("DOCS_ENABLED", "True").lower() == "true"
+    OPENAPI_PATH: str = os.getenv("OPENAPI_PATH", "")
+    
+    # Admission control (see app/core/admission.py): per-worker concurrency
+    # limits, queue size and deadlines (seconds) for each request pool
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "True").lower() == "true"
+    ADMISSION_READ_LIMIT: int = int(os.getenv("ADMISSION_READ_LIMIT", "32"))
+    ADMISSION_WRITE_LIMIT: int = int(os.getenv("ADMISSION_WRITE_LIMIT", "16"))
+    ADMISSION_EXPENSIVE_LIMIT: int = int(os.getenv("ADMISSION_EXPENSIVE_LIMIT", "2"))
+    ADMISSION_QUEUE_LIMIT: int = int(os.getenv("ADMISSION_QUEUE_LIMIT", "64"))
+    ADMISSION_READ_DEADLINE: float = float(os.getenv("ADMISSION_READ_DEADLINE", "2"))
+    ADMISSION_WRITE_DEADLINE: float = float(os.getenv("ADMISSION_WRITE_DEADLINE", "5"))
+    ADMISSION_EXPENSIVE_DEADLINE: float = float(os.getenv("ADMISSION_EXPENSIVE_DEADLINE", "10"))
+    ADMISSION_TENANT_QUEUE_SHARE: float = float(os.getenv("ADMISSION_TENANT_QUEUE_SHARE", "0.5"))
+    
+    # Response compression (see app/core/compression.py); levels favour latency
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "5"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    COMPRESSION_ZSTD_LEVEL: int = int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3"))
+    
     # File Upload
     MAX_UPLOAD_SIZE_MB: int = 10
     ALLOWED_FILE_TYPES: list = ["image/jpeg", "image/png", "video/mp4"]
@@ -61,6 +192,11 @@ class Settings(BaseSettings):
     SMTP_USER: Optional[str] = os.getenv("SMTP_USER")
     SMTP_PASSWORD: Optional[str] = os.getenv("SMTP_PASSWORD")
     
+    # Profiling (admin-only sampling profiler, off unless enabled)
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "False").lower() == "true"
+    PROFILING_INTERVAL_MS: float = float(os.getenv("PROFILING_INTERVAL_MS", "2"))
+    PROFILING_MAX_SECONDS: int = int(os.getenv("PROFILING_MAX_SECONDS", "120"))
+    
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
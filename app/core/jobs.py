@@ -0,0 +1,219 @@
+# ==================== Background Jobs ====================
+# File: app/core/jobs.py
+
+"""
+Registry of long-running admin jobs (bulk provisioning, exports, ...).
+
+    job = jobs.submit("user_provisioning", run, created_by=admin.id)
+    # in run(job): job.update(processed=..., created=...); job.add_error({...})
+
+Jobs run on a small thread pool (JOB_WORKERS) in the worker that accepted
+them, and the request returns the job id straight away. Each job's status,
+progress and errors are also written to JOB_DIR/<id>.json (at most every
+JOB_PERSIST_INTERVAL seconds while running), so a status request that
+lands on another pre-forked worker, or comes after a restart, still finds
+it. ``job.private`` holds results that must stay in memory (e.g. invite
+tokens) and is never written out.
+
+At shutdown, running jobs get up to GRACEFUL_TIMEOUT to finish; jobs still
+queued, or still running after that, are marked failed so nobody waits on
+them after the restart.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+PENDING, RUNNING, SUCCEEDED, FAILED = "pending", "running", "succeeded", "failed"
+
+
+class Job:
+    def __init__(self, kind: str, **meta: Any):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.meta = meta
+        self.status = PENDING
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.progress: Dict[str, Any] = {}
+        self.errors: List[Dict[str, Any]] = []
+        self.errors_dropped = 0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.private: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._persisted = 0.0
+        self._future: Optional[Future] = None
+
+    def update(self, **progress: Any):
+        with self._lock:
+            self.progress.update(progress)
+        self._persist()
+
+    def add_error(self, error: Dict[str, Any]):
+        with self._lock:
+            if len(self.errors) < settings.JOB_MAX_ERRORS:
+                self.errors.append(error)
+            else:
+                self.errors_dropped += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "meta": self.meta,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at and self.started_at.isoformat(),
+                "finished_at": self.finished_at and self.finished_at.isoformat(),
+                "progress": dict(self.progress),
+                "errors": list(self.errors),
+                "errors_dropped": self.errors_dropped,
+                "result": self.result,
+                "error": self.error,
+            }
+
+    def _persist(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._persisted < settings.JOB_PERSIST_INTERVAL:
+            return
+        self._persisted = now
+        try:
+            os.makedirs(settings.JOB_DIR, exist_ok=True)
+            path = os.path.join(settings.JOB_DIR, f"{self.id}.json")
+            with open(path + ".tmp", "w") as f:
+                json.dump(self.snapshot(), f, default=str)
+            os.replace(path + ".tmp", path)
+        except OSError as exc:
+            logger.warning(f"Could not persist job {self.id}: {exc}")
+
+
+class JobRegistry:
+    """
+    Runs jobs on a thread pool and keeps the most recent JOB_HISTORY in memory
+    """
+    def __init__(self, workers: int = settings.JOB_WORKERS, history: int = settings.JOB_HISTORY):
+        self.workers = workers
+        self.history = history
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.submitted = 0
+        self.failed = 0
+
+    def submit(self, kind: str, fn: Callable[[Job], Any], **meta: Any) -> Job:
+        job = Job(kind, **meta)
+        with self._lock:
+            if self._executor is None:
+                # Created lazily so pre-forked workers each get their own threads
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="job")
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                self._jobs.popitem(last=False)
+            self.submitted += 1
+        job._persist(force=True)
+        job._future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]):
+        job.status = RUNNING
+        job.started_at = datetime.utcnow()
+        job._persist(force=True)
+        try:
+            job.result = fn(job)
+            job.status = SUCCEEDED
+        except Exception as exc:
+            logger.exception(f"Job {job.id} ({job.kind}) failed")
+            job.error = str(exc)
+            job.status = FAILED
+            self.failed += 1
+        job.finished_at = datetime.utcnow()
+        job._persist(force=True)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Snapshot of a job from this worker, or as last persisted by any worker
+        """
+        job = self.get(job_id)
+        if job is not None:
+            return job.snapshot()
+        if not all(c in "0123456789abcdef" for c in job_id):
+            return None
+        try:
+            with open(os.path.join(settings.JOB_DIR, f"{job_id}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.snapshot() for job in reversed(jobs)]
+
+    def _abandon(self, job: Job, reason: str):
+        job.error = reason
+        job.status = FAILED
+        job.finished_at = datetime.utcnow()
+        self.failed += 1
+        # Status requests after the restart read this file
+        job._persist(force=True)
+
+    def shutdown(self, timeout: float = 0):
+        """
+        Fail the jobs still queued and give running ones up to ``timeout``
+        seconds to finish; call before stopping the writer they use
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            queued = list(self._jobs.values())
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        running = []
+        for job in queued:
+            if job._future is None:
+                continue
+            if job._future.cancelled():
+                self._abandon(job, "cancelled at shutdown")
+            elif not job._future.done():
+                running.append(job)
+        if not running:
+            return
+        logger.info(f"Waiting up to {timeout}s for {len(running)} running jobs")
+        wait([job._future for job in running], timeout=timeout)
+        for job in running:
+            if not job._future.done():
+                logger.warning(f"Job {job.id} ({job.kind}) still running at shutdown")
+                self._abandon(job, "interrupted at shutdown")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "submitted": self.submitted,
+            "failed": self.failed,
+            "running": sum(job.status == RUNNING for job in jobs),
+            "pending": sum(job.status == PENDING for job in jobs),
+        }
+
+
+jobs = JobRegistry()
+metrics.register("jobs", jobs.stats)
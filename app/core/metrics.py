@@ -0,0 +1,34 @@
+# ==================== Metrics Registry ====================
+# File: app/core/metrics.py
+
+"""
+In-process metrics registry.
+
+Subsystems register a callable that returns a snapshot dict; the admin
+metrics endpoint collects all of them in one response.
+"""
+
+import threading
+from typing import Any, Callable, Dict
+
+
+class MetricsRegistry:
+    """
+    Named snapshot providers, collected on demand
+    """
+    def __init__(self):
+        self._sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, source: Callable[[], Dict[str, Any]]):
+        with self._lock:
+            self._sources[name] = source
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            sources = dict(self._sources)
+        return {name: source() for name, source in sources.items()}
+
+
+# Global registry instance
+metrics = MetricsRegistry()
@@ -0,0 +1,146 @@
+# ==================== Precomputed OpenAPI ====================
+# File: app/core/openapi.py
+
+"""
+Serve /openapi.json from memory, built once per deploy.
+
+FastAPI generates the schema lazily on the first request, which walks
+every route and every generic ``ResponseModel[T]``/``PaginatedResponse[T]``
+and stalls that worker. Here the document is either loaded from a file
+produced at build time, or generated in a background thread at startup,
+then serialized, precompressed for every available encoding and served
+with an ETag per variant (``"<hash>"`` for identity, ``"<hash>-gzip"`` and
+so on): each encoding is a different representation, so it needs its own
+strong validator.
+
+Build time:
+    python -m app.core.openapi --output build/openapi.json
+    OPENAPI_PATH=build/openapi.json uvicorn app.main:app
+
+/docs and /redoc are registered only when DOCS_ENABLED is true; the
+schema itself is always served.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from app.api.conditional import is_not_modified
+from app.core import compression
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OPENAPI_URL = "/openapi.json"
+
+
+class OpenAPIDocument:
+    """
+    The serialized schema and its precompressed variants, each with an ETag
+    """
+    def __init__(self, app: FastAPI, path: Optional[str] = None):
+        self.app = app
+        self.path = path
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self.encoded: Dict[str, bytes] = {}
+        self.etags: Dict[Optional[str], str] = {}
+        self._lock = threading.Lock()
+
+    def generate(self) -> bytes:
+        schema = self.app.openapi()
+        return json.dumps(schema, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def build(self):
+        """
+        Load or generate the document once; concurrent callers wait for it
+        """
+        with self._lock:
+            if self.body is not None:
+                return
+            if self.path and os.path.exists(self.path):
+                with open(self.path, "rb") as f:
+                    body = f.read()
+                logger.info(f"Loaded prebuilt OpenAPI schema from {self.path}")
+            else:
+                body = self.generate()
+            self.encoded = {
+                encoding: compression.compress(encoding, body)
+                for encoding in compression.available_encodings()
+            }
+            digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+            self.etag = f'"{digest}"'
+            self.etags = {None: self.etag, **{encoding: f'"{digest}-{encoding}"' for encoding in self.encoded}}
+            self.body = body
+
+    def build_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self.build, name="openapi-build", daemon=True)
+        thread.start()
+        return thread
+
+    async def response(self, request: Request) -> Response:
+        if self.body is None:
+            await run_in_threadpool(self.build)
+
+        encoding = compression.negotiate(request.headers.get("accept-encoding", ""), tuple(self.encoded))
+        etag = self.etags[encoding]
+        headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "public, no-cache"}
+        if is_not_modified(request, etag, None):
+            return Response(status_code=304, headers=headers)
+
+        if encoding is None:
+            return Response(self.body, media_type="application/json", headers=headers)
+        # Content-Encoding makes CompressionMiddleware pass this through untouched
+        headers["Content-Encoding"] = encoding
+        return Response(self.encoded[encoding], media_type="application/json", headers=headers)
+
+
+def install_openapi(app: FastAPI) -> OpenAPIDocument:
+    """
+    Register /openapi.json (and /docs, /redoc if enabled) on an app created
+    with ``openapi_url=None, docs_url=None, redoc_url=None``
+    """
+    document = OpenAPIDocument(app, settings.OPENAPI_PATH or None)
+
+    @app.get(OPENAPI_URL, include_in_schema=False)
+    async def openapi_json(request: Request):
+        return await document.response(request)
+
+    if settings.DOCS_ENABLED:
+        from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+
+        @app.get("/docs", include_in_schema=False)
+        async def swagger_ui():
+            return get_swagger_ui_html(openapi_url=OPENAPI_URL, title=f"{app.title} - Swagger UI")
+
+        @app.get("/redoc", include_in_schema=False)
+        async def redoc():
+            return get_redoc_html(openapi_url=OPENAPI_URL, title=f"{app.title} - ReDoc")
+
+    return document
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the OpenAPI schema for a build artifact")
+    parser.add_argument("--output", default="openapi.json")
+    args = parser.parse_args()
+
+    from app.main import openapi_document
+
+    body = openapi_document.generate()
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "wb") as f:
+        f.write(body)
+    print(f"Wrote {len(body)} bytes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
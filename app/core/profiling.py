@@ -0,0 +1,192 @@
+# ==================== Sampling Profiler ====================
+# File: app/core/profiling.py
+
+"""
+Low-overhead wall-clock sampling profiler.
+
+A background thread periodically snapshots the stacks of every other thread
+(``sys._current_frames``) and aggregates them into the "collapsed stack"
+format understood by flamegraph.pl, speedscope and inferno:
+
+    thread;module:function;module:function <sample count>
+
+Nothing is installed unless ``PROFILING_ENABLED`` is set, so the hook costs
+nothing when it is off.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "__profile"
+
+# Leaf frames that only mean "this thread is parked"; they would otherwise
+# dominate a wall-clock profile of an idle worker.
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def _frame_label(frame) -> str:
+    module = frame.f_globals.get("__name__") or os.path.basename(frame.f_code.co_filename)
+    return f"{module}:{frame.f_code.co_name}"
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE_FRAMES
+
+
+class SamplingProfiler:
+    """
+    Samples all thread stacks every ``interval`` seconds until stopped
+    """
+    def __init__(self, interval: Optional[float] = None, include_idle: bool = False):
+        self.interval = interval or settings.PROFILING_INTERVAL_MS / 1000
+        self.include_idle = include_idle
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._ignored = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def ignore_current_thread(self) -> "SamplingProfiler":
+        self._ignored.add(threading.get_ident())
+        return self
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self
+
+    def _run(self):
+        ignored = self._ignored | {threading.get_ident()}
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in ignored:
+                    continue
+                if not self.include_idle and _is_idle(frame):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        """
+        Render samples in collapsed-stack format (one stack per line)
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def profile_for(seconds: float) -> SamplingProfiler:
+    """
+    Profile the whole worker for ``seconds`` (blocking the calling thread)
+    """
+    profiler = SamplingProfiler().ignore_current_thread().start()
+    time.sleep(seconds)
+    return profiler.stop()
+
+
+def collapsed_response(profiler: SamplingProfiler, filename: str, headers: Optional[dict] = None):
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(profiler.sample_count),
+            **(headers or {}),
+        },
+    )
+
+
+def _is_active_admin(user_id: int) -> bool:
+    from app.db.session import ReadSessionLocal
+    from app.models import User
+
+    db = ReadSessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+        return bool(user and user.is_active and user.is_admin)
+    finally:
+        db.close()
+
+
+async def _is_admin_request(request: Request) -> bool:
+    """
+    Check the bearer token belongs to an active admin.
+
+    Only runs for requests that ask to be profiled, so the extra lookup never
+    touches normal traffic; it runs in the threadpool, off the event loop.
+    """
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        user_id = int(payload["sub"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        return False
+
+    return await run_in_threadpool(_is_active_admin, user_id)
+
+
+async def profile_request_middleware(request: Request, call_next):
+    """
+    Profile a single request when it carries ``X-Profile: 1`` or ``?__profile=1``.
+
+    The normal response body is discarded and replaced with the collapsed
+    stacks; the original status is reported in ``X-Profile-Status``. All
+    threads are sampled, so requests running concurrently show up as well.
+    """
+    if request.headers.get(PROFILE_HEADER) != "1" and request.query_params.get(PROFILE_QUERY_PARAM) != "1":
+        return await call_next(request)
+
+    if not await _is_admin_request(request):
+        return JSONResponse(
+            status_code=status.HTTP_403_FORBIDDEN,
+            content={
+                "success": False,
+                "data": None,
+                "message": "Admin privileges required for profiling"
+            }
+        )
+
+    profiler = SamplingProfiler().start()
+    try:
+        response = await call_next(request)
+        # Drain the body inside the profiling window so serialization is counted
+        async for _ in response.body_iterator:
+            pass
+    finally:
+        profiler.stop()
+
+    return collapsed_response(
+        profiler,
+        filename="request.collapsed",
+        headers={"X-Profile-Status": str(response.status_code)},
+    )
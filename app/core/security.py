@@ -3,21 +3,30 @@
 
 from datetime import datetime, timedelta, timezone
 from jose import jwt
-from argon2 import PasswordHasher
 import os
 
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-change-me")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-ph = PasswordHasher()
+_password_hasher = None
+
+def _hasher():
+    """
+    Argon2 hasher, imported on first use: only login and registration need it
+    """
+    global _password_hasher
+    if _password_hasher is None:
+        from argon2 import PasswordHasher
+        _password_hasher = PasswordHasher()
+    return _password_hasher
 
 def hash_password(password: str) -> str:
-    return ph.hash(password)
+    return _hasher().hash(password)
 
 def verify_password(password: str, hashed_password: str) -> bool:
     try:
-        return ph.verify(hashed_password, password)
+        return _hasher().verify(hashed_password, password)
     except Exception:
         return False
 
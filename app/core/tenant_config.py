@@ -0,0 +1,188 @@
+# ==================== Tenant Config Cache ====================
+# File: app/core/tenant_config.py
+
+"""
+In-memory cache of every tenant's config (feature flags, branding, user
+policies), so feature gating and quota checks cost a dict lookup instead
+of a query.
+
+All configs are loaded at startup into an immutable map that lookups read
+without locking; a change builds a new map and swaps it in. Writes through
+``update_tenant_config`` and ``create_tenant`` update this worker's map
+directly. Other workers (and other processes such as the seed scripts)
+notice through SQLite's ``PRAGMA data_version``, which changes whenever
+another connection commits to any table: a poller thread checks it every
+TENANT_CONFIG_POLL_SECONDS and, when it moved, reads a cheap marker of
+tenant_configs (row count, highest id, newest created_at/updated_at). The
+table is only reloaded when the marker changed, or while its newest change
+is less than two to three seconds old (depending on where in its second it
+landed), since the timestamps have one-second resolution
+and a second edit within that second would leave the marker unchanged.
+
+    @router.get("/coaching", dependencies=[Depends(require_feature("coaching_enabled"))])
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import ReadSessionLocal, engine
+from app.models import TenantConfigs
+
+logger = logging.getLogger(__name__)
+
+MARKER_SQL = """
+    SELECT COUNT(*), MAX(id), MAX(COALESCE(updated_at, created_at)),
+           MAX(COALESCE(updated_at, created_at)) >= datetime('now', '-2 seconds')
+    FROM tenant_configs
+"""
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class TenantConfig:
+    tenant_id: int
+    feature_flags: Mapping[str, Any]
+    branding: Mapping[str, Any]
+    user_policies: Mapping[str, Any]
+
+    @classmethod
+    def from_row(cls, row: TenantConfigs) -> "TenantConfig":
+        return cls(
+            tenant_id=row.tenant_id,
+            feature_flags=_freeze(row.feature_flags or {}),
+            branding=_freeze(row.branding or {}),
+            user_policies=_freeze(row.user_policies or {}),
+        )
+
+
+class TenantConfigCache:
+    """
+    Immutable tenant_id -> TenantConfig map, reloaded when the database changes
+    """
+    def __init__(self, poll_interval: float = settings.TENANT_CONFIG_POLL_SECONDS):
+        self.poll_interval = poll_interval
+        self._configs: Optional[Mapping[int, TenantConfig]] = None
+        self._lock = threading.Lock()  # serializes map rebuilds, not lookups
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.loads = 0
+        self.updates = 0
+        self.polls = 0
+        self.skipped = 0
+
+    # ----- lookups -----
+
+    @property
+    def configs(self) -> Mapping[int, TenantConfig]:
+        configs = self._configs
+        if configs is None:
+            self.load()
+            configs = self._configs
+        return configs
+
+    def get(self, tenant_id: int) -> Optional[TenantConfig]:
+        return self.configs.get(tenant_id)
+
+    def feature_enabled(self, tenant_id: int, flag: str) -> bool:
+        config = self.configs.get(tenant_id)
+        return bool(config is not None and config.feature_flags.get(flag))
+
+    def policy(self, tenant_id: int, name: str, default: Any = None) -> Any:
+        config = self.configs.get(tenant_id)
+        return default if config is None else config.user_policies.get(name, default)
+
+    # ----- updates -----
+
+    def load(self):
+        """
+        Replace the map with every row of tenant_configs
+        """
+        db = ReadSessionLocal()
+        try:
+            configs = {row.tenant_id: TenantConfig.from_row(row) for row in db.query(TenantConfigs)}
+        finally:
+            db.close()
+        with self._lock:
+            self._configs = MappingProxyType(configs)
+            self.loads += 1
+
+    def put(self, row: TenantConfigs):
+        """
+        Swap in a just-committed config row
+        """
+        config = TenantConfig.from_row(row)
+        with self._lock:
+            configs = dict(self._configs or {})
+            configs[config.tenant_id] = config
+            self._configs = MappingProxyType(configs)
+            self.updates += 1
+
+    # ----- cross-process invalidation -----
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="tenant-config-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(self.poll_interval + 5)
+        self._thread = None
+
+    def _poll(self):
+        connection = engine.raw_connection()
+        cursor = connection.cursor()
+        try:
+            # Read before loading, so a commit racing the load is caught next time
+            version = cursor.execute("PRAGMA data_version").fetchone()[0]
+            marker = cursor.execute(MARKER_SQL).fetchone()
+            self.load()
+            while not self._stop.wait(self.poll_interval):
+                try:
+                    current = cursor.execute("PRAGMA data_version").fetchone()[0]
+                    self.polls += 1
+                    if current == version:
+                        continue
+                    version = current
+                    # Something was committed, not necessarily to tenant_configs
+                    latest = cursor.execute(MARKER_SQL).fetchone()
+                    if latest[:3] == marker[:3] and not latest[3]:
+                        self.skipped += 1
+                        continue
+                    marker = latest
+                    self.load()
+                except Exception:
+                    logger.exception("Tenant config reload failed")
+        finally:
+            connection.close()
+
+    def stats(self) -> Dict[str, Any]:
+        configs = self._configs
+        return {
+            "tenants": 0 if configs is None else len(configs),
+            "polling": self._thread is not None,
+            "loads": self.loads,
+            "updates": self.updates,
+            "polls": self.polls,
+            "skipped": self.skipped,
+        }
+
+
+tenant_configs = TenantConfigCache()
+metrics.register("tenant_configs", tenant_configs.stats)
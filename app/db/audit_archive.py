@@ -0,0 +1,388 @@
+# ==================== Audit Log Archive ====================
+# File: app/db/audit_archive.py
+
+"""
+Audit-log retention: entries older than AUDIT_RETENTION_DAYS move out of
+the audit_logs table into monthly archive files, and one query API reads
+both.
+
+    GET  /api/v1/admin/audit-logs?user_id=&action_type=&entity_type=&since=&until=&cursor=
+    POST /api/v1/admin/audit-logs/archive      (runs as a job)
+    python -m app.db.audit_archive archive [--days N]
+    python -m app.db.audit_archive query [--user-id N] [--action-type T] [--entity-type T] [--limit N]
+
+An archive run handles one calendar month at a time, oldest first: the
+month's expired rows are read from one snapshot, written to a gzipped
+NDJSON segment, ``audit_logs-YYYY-MM-<first id>-<last id>.ndjson.gz`` in
+AUDIT_ARCHIVE_DIR (through a .partial file, fsynced before the rename),
+and only then deleted from the table, PURGE_BATCH_ROWS rows per writer
+transaction. A crash between the two leaves the rows in both places;
+the next run writes them again, and readers drop the duplicates by id.
+With AUDIT_RETENTION_DAYS set, the maintenance scheduler archives every
+AUDIT_ARCHIVE_INTERVAL_HOURS (see app/db/maintenance.py).
+
+Queries page newest first by (created_at, id) with an opaque keyset
+cursor. The table is read through the composite (filter, created_at)
+indexes; archived months are scanned only when the page reaches back
+past the newest archived month, newest month first, stopping as soon as
+the page is full. created_at is compared as stored (``YYYY-MM-DD
+HH:MM:SS``), in the table and in the archives alike.
+"""
+
+import base64
+import gzip
+import heapq
+import json
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import String, delete, select, tuple_, type_coerce
+
+from app.core.config import settings
+from app.core.jobs import Job
+from app.db.session import ReadSessionLocal, read_snapshot
+from app.db.writer import writer
+from app.models import AuditLog
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+SEGMENT_RE = re.compile(r"^audit_logs-(\d{4}-\d{2})-(\d+)-(\d+)\.ndjson\.gz$")
+
+# created_at as the stored text, so keys compare the same here and in the archives
+CREATED_AT = type_coerce(AuditLog.created_at, String)
+COLUMNS = [column for column in AuditLog.__table__.columns if column.name != "created_at"] \
+    + [CREATED_AT.label("created_at")]
+
+Key = Tuple[str, int]
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def _stamp(value: datetime) -> str:
+    """
+    A datetime in the stored created_at format (UTC)
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S")
+
+
+def _month_bounds(month: str) -> Tuple[str, str]:
+    year, number = int(month[:4]), int(month[5:7])
+    following = f"{year + number // 12:04d}-{number % 12 + 1:02d}"
+    return f"{month}-01 00:00:00", f"{following}-01 00:00:00"
+
+
+def _key(row: Dict[str, Any]) -> Key:
+    return row["created_at"], row["id"]
+
+
+def encode_cursor(key: Key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Key:
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+@dataclass
+class AuditQuery:
+    user_id: Optional[int] = None
+    action_type: Optional[str] = None
+    entity_type: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.user_id is not None:
+            conditions.append(AuditLog.user_id == self.user_id)
+        if self.action_type is not None:
+            conditions.append(AuditLog.action_type == self.action_type)
+        if self.entity_type is not None:
+            conditions.append(AuditLog.entity_type == self.entity_type)
+        if self.since is not None:
+            conditions.append(CREATED_AT >= _stamp(self.since))
+        if self.until is not None:
+            conditions.append(CREATED_AT < _stamp(self.until))
+        return conditions
+
+    def matches(self, row: Dict[str, Any]) -> bool:
+        return (self.user_id is None or row["user_id"] == self.user_id) \
+            and (self.action_type is None or row["action_type"] == self.action_type) \
+            and (self.entity_type is None or row["entity_type"] == self.entity_type) \
+            and (self.since is None or row["created_at"] >= _stamp(self.since)) \
+            and (self.until is None or row["created_at"] < _stamp(self.until))
+
+
+# ==================== Segments ====================
+
+def list_segments() -> List[Dict[str, Any]]:
+    """
+    Archive segments, oldest month first
+    """
+    if not os.path.isdir(settings.AUDIT_ARCHIVE_DIR):
+        return []
+    segments = []
+    for name in os.listdir(settings.AUDIT_ARCHIVE_DIR):
+        match = SEGMENT_RE.match(name)
+        if match:
+            path = os.path.join(settings.AUDIT_ARCHIVE_DIR, name)
+            segments.append({
+                "month": match.group(1),
+                "file": name,
+                "first_id": int(match.group(2)),
+                "last_id": int(match.group(3)),
+                "bytes": os.path.getsize(path),
+            })
+    return sorted(segments, key=lambda segment: (segment["month"], segment["first_id"]))
+
+
+def _read_month(month: str, segments: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for segment in segments:
+        if segment["month"] == month:
+            with gzip.open(os.path.join(settings.AUDIT_ARCHIVE_DIR, segment["file"]), "rt", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+
+
+def archived_entries(query: AuditQuery) -> Iterator[Dict[str, Any]]:
+    """
+    Every archived entry matching ``query``, oldest month first
+    """
+    segments = list_segments()
+    for month in sorted({segment["month"] for segment in segments}):
+        seen = set()
+        for row in _read_month(month, segments):
+            if row["id"] not in seen and query.matches(row):
+                seen.add(row["id"])
+                yield row
+
+
+# ==================== Query ====================
+
+def _from_archives(
+    query: AuditQuery,
+    before: Optional[Key],
+    limit: int,
+    candidates: List[Dict[str, Any]],
+    segments: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Add archived rows to ``candidates`` month by month, newest first,
+    until no older month can change the top ``limit``
+    """
+    bounds = ([_stamp(query.until)] if query.until else []) + ([before[0]] if before else [])
+    upper = min(bounds, default=None)
+    lower = _stamp(query.since) if query.since else None
+    by_id = {row["id"]: row for row in candidates}
+    scanned = 0
+    for month in sorted({segment["month"] for segment in segments}, reverse=True):
+        start, end = _month_bounds(month)
+        if upper is not None and start > upper:
+            continue
+        if lower is not None and end <= lower:
+            break
+        scanned += 1
+        for row in _read_month(month, segments):
+            if row["id"] not in by_id and query.matches(row) and (before is None or _key(row) < before):
+                by_id[row["id"]] = row
+        top = heapq.nlargest(limit, by_id.values(), key=_key)
+        by_id = {row["id"]: row for row in top}
+        # Older months hold only keys below this month's start
+        if len(top) == limit and top[-1]["created_at"] >= start:
+            break
+    return heapq.nlargest(limit, by_id.values(), key=_key), scanned
+
+
+def query_audit_logs(query: AuditQuery, cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
+    """
+    One page of matching entries, newest first, from the table and the
+    archives; pass ``cursor`` back for the next page while ``has_more``
+    """
+    before = decode_cursor(cursor) if cursor else None
+    statement = select(*COLUMNS).where(*query.conditions())
+    if before is not None:
+        statement = statement.where(tuple_(CREATED_AT, AuditLog.id) < tuple_(*before))
+    statement = statement.order_by(CREATED_AT.desc(), AuditLog.id.desc()).limit(limit + 1)
+    db = ReadSessionLocal()
+    try:
+        rows = [dict(row) for row in db.execute(statement).mappings()]
+    finally:
+        db.close()
+
+    scanned = 0
+    segments = list_segments()
+    if segments:
+        # Archived rows are all older than the month after the newest archived one
+        horizon = _month_bounds(segments[-1]["month"])[1]
+        if len(rows) <= limit or rows[-1]["created_at"] < horizon:
+            rows, scanned = _from_archives(query, before, limit + 1, rows, segments)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "entries": rows,
+        "cursor": encode_cursor(_key(rows[-1])) if has_more else None,
+        "has_more": has_more,
+        "archived_months_scanned": scanned,
+    }
+
+
+# ==================== Archival ====================
+
+@contextmanager
+def _archive_lock():
+    os.makedirs(settings.AUDIT_ARCHIVE_DIR, exist_ok=True)
+    with open(os.path.join(settings.AUDIT_ARCHIVE_DIR, ".lock"), "a") as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                raise ArchiveError("Another archive run is in progress")
+        yield
+
+
+def _write_segment(month: str, start: str, end: str) -> Optional[Dict[str, Any]]:
+    """
+    Write the month's rows in [start, end) to a segment; None if there are none
+    """
+    partial = os.path.join(settings.AUDIT_ARCHIVE_DIR, f"audit_logs-{month}.partial")
+    statement = select(*COLUMNS).where(CREATED_AT >= start, CREATED_AT < end).order_by(AuditLog.id)
+    first_id = last_id = None
+    rows = 0
+    with read_snapshot() as db, open(partial, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as packed:
+            result = db.execute(statement.execution_options(yield_per=settings.EXPORT_FETCH_ROWS))
+            for partition in result.mappings().partitions():
+                packed.write("".join(
+                    json.dumps(dict(row), ensure_ascii=False) + "\n" for row in partition
+                ).encode())
+                first_id = partition[0]["id"] if first_id is None else first_id
+                last_id = partition[-1]["id"]
+                rows += len(partition)
+        raw.flush()
+        os.fsync(raw.fileno())
+    if not rows:
+        os.remove(partial)
+        return None
+    name = f"audit_logs-{month}-{first_id}-{last_id}.ndjson.gz"
+    os.replace(partial, os.path.join(settings.AUDIT_ARCHIVE_DIR, name))
+    return {"month": month, "file": name, "rows": rows, "last_id": last_id}
+
+
+def _delete_archived(session, start: str, end: str, last_id: int, limit: int) -> int:
+    """
+    Writer unit: delete up to ``limit`` rows already written to a segment
+    """
+    connection = session.connection(bind_arguments={"mapper": AuditLog.__mapper__})
+    ids = select(AuditLog.id).where(CREATED_AT >= start, CREATED_AT < end, AuditLog.id <= last_id).limit(limit)
+    return connection.execute(delete(AuditLog.__table__).where(AuditLog.id.in_(ids))).rowcount
+
+
+def archive_audit_logs(
+    retention_days: Optional[int] = None,
+    job: Optional[Job] = None,
+) -> Dict[str, Any]:
+    """
+    Move entries older than ``retention_days`` (AUDIT_RETENTION_DAYS) to
+    the monthly archives
+    """
+    retention_days = settings.AUDIT_RETENTION_DAYS if retention_days is None else retention_days
+    if retention_days <= 0:
+        raise ValueError("Retention must be at least one day")
+    cutoff = _stamp(datetime.utcnow() - timedelta(days=retention_days))
+    result: Dict[str, Any] = {"cutoff": cutoff, "segments": [], "archived": 0, "deleted": 0}
+
+    with _archive_lock():
+        db = ReadSessionLocal()
+        try:
+            oldest = db.execute(
+                select(CREATED_AT).where(CREATED_AT < cutoff).order_by(CREATED_AT).limit(1)
+            ).scalar()
+        finally:
+            db.close()
+        months = _months_between(oldest, cutoff) if oldest else []
+
+        for month in months:
+            start, end = _month_bounds(month)
+            end = min(end, cutoff)
+            segment = _write_segment(month, start, end)
+            if segment is None:
+                continue
+            result["segments"].append(segment["file"])
+            result["archived"] += segment["rows"]
+            limit = settings.PURGE_BATCH_ROWS
+            while True:
+                deleted = writer.run_sync(
+                    lambda session: _delete_archived(session, start, end, segment["last_id"], limit)
+                )
+                result["deleted"] += deleted
+                if deleted < limit:
+                    break
+            if job is not None:
+                job.update(months_done=len(result["segments"]), archived=result["archived"],
+                           deleted=result["deleted"])
+    return result
+
+
+def _months_between(first: str, cutoff: str) -> List[str]:
+    """
+    "YYYY-MM" of every month from ``first``'s through ``cutoff``'s
+    """
+    months = []
+    month = first[:7]
+    while month <= cutoff[:7]:
+        months.append(month)
+        month = _month_bounds(month)[1][:7]
+    return months
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive and query the audit log")
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive = commands.add_parser("archive", help="Move expired entries to the monthly archives")
+    archive.add_argument("--days", type=int, help="Retention (default AUDIT_RETENTION_DAYS)")
+    query = commands.add_parser("query", help="Print matching entries as NDJSON, newest first")
+    query.add_argument("--user-id", type=int)
+    query.add_argument("--action-type")
+    query.add_argument("--entity-type")
+    query.add_argument("--limit", type=int, default=settings.AUDIT_QUERY_DEFAULT_LIMIT)
+    args = parser.parse_args()
+
+    if args.command == "archive":
+        try:
+            result = archive_audit_logs(args.days)
+        except (ArchiveError, ValueError) as exc:
+            parser.exit(1, f"error: {exc}\n")
+        finally:
+            writer.stop()
+        for segment in result["segments"]:
+            print(segment)
+        print(f"archived {result['archived']} entries older than {result['cutoff']}, deleted {result['deleted']}")
+    else:
+        page = query_audit_logs(
+            AuditQuery(user_id=args.user_id, action_type=args.action_type, entity_type=args.entity_type),
+            limit=args.limit,
+        )
+        for row in page["entries"]:
+            print(json.dumps(row, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+# ==================== Online Backup ====================
+# File: app/db/backup.py
+
+"""
+Hot backups of the SQLite files, taken while the app keeps serving.
+
+    python -m app.db.backup create [--no-compress] [--step-pages N] [--step-sleep-ms MS]
+    python -m app.db.backup list
+    python -m app.db.backup verify BACKUP
+    python -m app.db.backup restore BACKUP [--target PATH]
+    python -m app.db.backup prune
+
+A backup copies the database with SQLite's online backup API,
+BACKUP_STEP_PAGES pages per step with a BACKUP_STEP_SLEEP_MS pause in
+between. The source connection holds one read transaction for the whole
+copy, so the backup is the database as of the moment it started, however
+long the copy takes. In WAL mode a reader never blocks writers; the WAL
+just cannot be checkpointed past that point until the copy is done.
+
+Each copy is checked with ``PRAGMA integrity_check``, gzipped unless
+BACKUP_COMPRESS is off, and described by a JSON manifest next to it
+(source, time, pages, SHA-256). The newest BACKUP_KEEP backups of each
+database are kept. With BACKUP_INTERVAL_HOURS set, the maintenance
+scheduler also takes them in-process (see app/db/maintenance.py).
+
+A restore checks the backup's checksum and integrity first, saves the
+current database as a backup of its own, then copies the backup over it
+in a single backup step: other connections see either the old or the new
+database, never a mix. Stop the app before restoring all the same, so no
+request works from pre-restore state.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.db.maintenance import database_paths
+
+
+class BackupError(Exception):
+    pass
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _integrity(conn: sqlite3.Connection) -> str:
+    return "; ".join(row[0] for row in conn.execute("PRAGMA integrity_check"))
+
+
+def create_backup(
+    path: str,
+    dest_dir: str = settings.BACKUP_DIR,
+    compress: bool = settings.BACKUP_COMPRESS,
+    step_pages: int = settings.BACKUP_STEP_PAGES,
+    step_sleep: float = settings.BACKUP_STEP_SLEEP_MS / 1000,
+    keep: int = settings.BACKUP_KEEP,
+    label: str = "",
+) -> Dict[str, Any]:
+    """
+    Back up the database at ``path`` into ``dest_dir`` and return its manifest
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    started = datetime.utcnow()
+    timer = time.perf_counter()
+    name = f"{_stem(path)}-{started.strftime('%Y%m%dT%H%M%S')}{'-' + label if label else ''}.db"
+    partial = os.path.join(dest_dir, name + ".partial")
+    steps = 0
+
+    def progress(status, remaining, total):
+        nonlocal steps
+        steps += 1
+
+    source = sqlite3.connect(path, timeout=settings.WRITE_BUSY_TIMEOUT, isolation_level=None)
+    target = sqlite3.connect(partial, isolation_level=None)
+    try:
+        # Pin one read snapshot so every step copies the same point in time
+        source.execute("BEGIN")
+        source.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=step_pages, progress=progress, sleep=step_sleep)
+        source.execute("ROLLBACK")
+        page_size = target.execute("PRAGMA page_size").fetchone()[0]
+        page_count = target.execute("PRAGMA page_count").fetchone()[0]
+        integrity = _integrity(target)
+        target.execute("PRAGMA journal_mode=DELETE")  # a single self-contained file
+    finally:
+        source.close()
+        target.close()
+    if integrity != "ok":
+        os.remove(partial)
+        raise BackupError(f"Backup of {path} failed the integrity check: {integrity}")
+
+    final = os.path.join(dest_dir, name + (".gz" if compress else ""))
+    if compress:
+        with open(partial, "rb") as raw, gzip.open(final, "wb", compresslevel=6) as packed:
+            shutil.copyfileobj(raw, packed, 1024 * 1024)
+        os.remove(partial)
+    else:
+        os.replace(partial, final)
+
+    manifest = {
+        "file": os.path.basename(final),
+        "source": os.path.abspath(path),
+        "created_at": started.isoformat(),
+        "duration_s": round(time.perf_counter() - timer, 3),
+        "steps": steps,
+        "page_size": page_size,
+        "page_count": page_count,
+        "database_bytes": page_size * page_count,
+        "bytes": os.path.getsize(final),
+        "compressed": compress,
+        "sha256": _sha256(final),
+        "integrity": integrity,
+    }
+    _write_json(final + ".json", manifest)
+    if keep:
+        prune(manifest["source"], dest_dir, keep)
+    return manifest
+
+
+def list_backups(dest_dir: str = settings.BACKUP_DIR, source: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Manifests in ``dest_dir``, oldest first, optionally only those of ``source``
+    """
+    if not os.path.isdir(dest_dir):
+        return []
+    manifests = []
+    for name in os.listdir(dest_dir):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(dest_dir, name)) as f:
+            manifest = json.load(f)
+        if source is None or manifest["source"] == os.path.abspath(source):
+            manifests.append(manifest)
+    return sorted(manifests, key=lambda manifest: manifest["created_at"])
+
+
+def latest_backup(source: str, dest_dir: str = settings.BACKUP_DIR) -> Optional[Dict[str, Any]]:
+    backups = list_backups(dest_dir, source)
+    return backups[-1] if backups else None
+
+
+def prune(source: str, dest_dir: str = settings.BACKUP_DIR, keep: int = settings.BACKUP_KEEP) -> List[str]:
+    """
+    Delete all but the newest ``keep`` backups of ``source``
+    """
+    removed = []
+    for manifest in list_backups(dest_dir, source)[:-keep or None]:
+        path = os.path.join(dest_dir, manifest["file"])
+        for stale in (path, path + ".json"):
+            if os.path.exists(stale):
+                os.remove(stale)
+        removed.append(manifest["file"])
+    return removed
+
+
+def _manifest_of(backup: str) -> Dict[str, Any]:
+    try:
+        with open(backup + ".json") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise BackupError(f"No manifest next to {backup}")
+
+
+@contextmanager
+def verified_copy(backup: str) -> Iterator[str]:
+    """
+    Check ``backup`` against its manifest and yield the path of a
+    decompressed copy that passed ``PRAGMA integrity_check``
+    """
+    manifest = _manifest_of(backup)
+    checksum = _sha256(backup)
+    if checksum != manifest["sha256"]:
+        raise BackupError(f"Checksum mismatch for {backup}: {checksum} != {manifest['sha256']}")
+
+    handle, copy = tempfile.mkstemp(suffix=".db", dir=os.path.dirname(os.path.abspath(backup)))
+    try:
+        with os.fdopen(handle, "wb") as out:
+            opener = gzip.open if manifest["compressed"] else open
+            with opener(backup, "rb") as data:
+                shutil.copyfileobj(data, out, 1024 * 1024)
+        conn = sqlite3.connect(copy)
+        try:
+            integrity = _integrity(conn)
+        finally:
+            conn.close()
+        if integrity != "ok":
+            raise BackupError(f"{backup} failed the integrity check: {integrity}")
+        yield copy
+    finally:
+        os.remove(copy)
+
+
+def restore_backup(backup: str, target: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Replace ``target`` (by default the database the backup was taken
+    from) with ``backup`` after verifying it
+    """
+    manifest = _manifest_of(backup)
+    target = os.path.abspath(target or manifest["source"])
+    dest_dir = os.path.dirname(os.path.abspath(backup))
+    with verified_copy(backup) as copy:
+        previous = create_backup(target, dest_dir, keep=0, label="pre-restore") if os.path.exists(target) else None
+        source = sqlite3.connect(copy)
+        destination = sqlite3.connect(target, timeout=settings.WRITE_BUSY_TIMEOUT)
+        try:
+            source.backup(destination)  # one step: all pages under one write lock
+        finally:
+            source.close()
+            destination.close()
+    return {"restored": manifest["file"], "target": target, "previous": previous and previous["file"]}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SQLite online backup")
+    sub = parser.add_subparsers(dest="command", required=True)
+    create = sub.add_parser("create", help="Back up the main database and every shard")
+    create.add_argument("--dest", default=settings.BACKUP_DIR)
+    create.add_argument("--no-compress", action="store_true")
+    create.add_argument("--step-pages", type=int, default=settings.BACKUP_STEP_PAGES)
+    create.add_argument("--step-sleep-ms", type=float, default=settings.BACKUP_STEP_SLEEP_MS)
+    listing = sub.add_parser("list")
+    listing.add_argument("--dest", default=settings.BACKUP_DIR)
+    verify = sub.add_parser("verify")
+    verify.add_argument("backup")
+    restore = sub.add_parser("restore")
+    restore.add_argument("backup")
+    restore.add_argument("--target")
+    pruning = sub.add_parser("prune")
+    pruning.add_argument("--dest", default=settings.BACKUP_DIR)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "create":
+            for path in database_paths():
+                manifest = create_backup(
+                    path, args.dest, compress=not args.no_compress,
+                    step_pages=args.step_pages, step_sleep=args.step_sleep_ms / 1000,
+                )
+                print(f"{path} -> {manifest['file']} ({manifest['bytes']} bytes, {manifest['duration_s']}s)")
+        elif args.command == "list":
+            for manifest in list_backups(args.dest):
+                print(f"{manifest['created_at']}  {manifest['file']}  {manifest['bytes']} bytes  {manifest['source']}")
+        elif args.command == "verify":
+            with verified_copy(args.backup):
+                print(f"{args.backup}: ok")
+        elif args.command == "restore":
+            result = restore_backup(args.backup, args.target)
+            print(f"Restored {result['restored']} into {result['target']} (previous copy: {result['previous']})")
+        elif args.command == "prune":
+            for path in database_paths():
+                for name in prune(path, args.dest):
+                    print(f"removed {name}")
+    except BackupError as exc:
+        parser.exit(1, f"error: {exc}\n")
+
+
+if __name__ == "__main__":
+    main()
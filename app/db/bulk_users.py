@@ -0,0 +1,271 @@
+# ==================== Bulk User Operations ====================
+# File: app/db/bulk_users.py
+
+"""
+Set-based activate, deactivate and delete of the users matching a filter.
+
+    result = bulk_update_users(UserFilter(tenant_id=3), "deactivate", actor_id=admin.id)
+
+A filter combines any of: a tenant, a list of ids, and ``last_login_before``
+(users whose last sign-in, or creation if they never signed in, is older).
+The acting admin is never included. Matching ids are read once, grouped
+by tenant, and processed in chunks of BULK_CHUNK_SIZE, one writer unit
+per chunk:
+
+- activate/deactivate is a single ``UPDATE users ... WHERE id IN (...)``;
+- delete deactivates every matched user first, then purges what each
+  chunk of users owns (workouts, goals, ...) PURGE_BATCH_ROWS rows per
+  transaction, so the write lock is never held for long, and finally
+  deletes the users. Children of those rows, and the users' profile,
+  consents and preferences, go through ON DELETE CASCADE (see
+  app/db/foreign_keys.py); audit entries the users made are kept with
+  user_id cleared. The usage counters are decreased in the same
+  transactions. Accounts owning more than PURGE_INLINE_MAX_ROWS rows are
+  deleted by a background job (see the admin routes).
+
+Chunks commit independently, so a failure stops the operation with the
+earlier chunks done; the result reports what was applied. Each operation
+writes one summarized audit entry, and every affected user's cached
+responses are invalidated.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.jobs import Job
+from app.db.session import ReadSessionLocal, read_snapshot
+from app.db.usage import USER_TENANTS, add_usage, current_month
+from app.db.writer import writer, writer_for
+from app.models import (
+    AuditLog, BodyMeasurement, ChangeLog, Goal, PersonalRecord, User, Workout, WorkoutMedia, WorkoutTemplate
+)
+
+OPERATIONS = ("activate", "deactivate", "delete")
+
+# Tables a user owns directly in the tenant's data; their own children
+# (exercises, media, milestones, ...) go with them through ON DELETE CASCADE
+USER_DATA = (Workout, Goal, WorkoutTemplate, BodyMeasurement, PersonalRecord, ChangeLog)
+
+
+@dataclass
+class UserFilter:
+    tenant_id: Optional[int] = None
+    user_ids: Optional[List[int]] = None
+    last_login_before: Optional[datetime] = None
+
+    def is_empty(self) -> bool:
+        return self.tenant_id is None and self.user_ids is None and self.last_login_before is None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "tenant_id": self.tenant_id,
+            "user_ids": self.user_ids,
+            "last_login_before": self.last_login_before and self.last_login_before.isoformat(),
+        }
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.tenant_id is not None:
+            conditions.append(User.tenant_id == self.tenant_id)
+        if self.user_ids is not None:
+            conditions.append(User.id.in_(self.user_ids))
+        if self.last_login_before is not None:
+            before = self.last_login_before
+            if before.tzinfo is not None:
+                before = before.astimezone(timezone.utc).replace(tzinfo=None)
+            conditions.append(or_(
+                User.last_login < before,
+                and_(User.last_login.is_(None), User.created_at < before),
+            ))
+        return conditions
+
+
+def matching_users(user_filter: UserFilter, exclude_id: Optional[int] = None) -> Dict[int, List[int]]:
+    """
+    tenant_id -> ids of the users matching ``user_filter``
+    """
+    if user_filter.is_empty():
+        raise ValueError("At least one filter is required")
+    query = select(User.tenant_id, User.id).where(*user_filter.conditions()).order_by(User.tenant_id, User.id)
+    if exclude_id is not None:
+        query = query.where(User.id != exclude_id)
+    db = ReadSessionLocal()
+    try:
+        by_tenant: Dict[int, List[int]] = {}
+        for tenant_id, user_id in db.execute(query):
+            by_tenant.setdefault(tenant_id, []).append(user_id)
+        return by_tenant
+    finally:
+        db.close()
+
+
+def _set_active(session: Session, user_ids: List[int], active: bool) -> int:
+    connection = session.connection(bind_arguments={"mapper": User.__mapper__})
+    return connection.execute(
+        update(User.__table__)
+        .where(User.id.in_(user_ids), User.is_active != active)
+        .values(is_active=active, updated_at=func.now())
+    ).rowcount
+
+
+def _usage_of_workouts(connection, workout_ids) -> Dict[str, int]:
+    """
+    Counter decrements for deleting ``workout_ids`` (a list or a subquery)
+    """
+    storage = connection.execute(
+        select(func.coalesce(func.sum(WorkoutMedia.file_size_bytes), 0)).where(WorkoutMedia.workout_id.in_(workout_ids))
+    ).scalar()
+    this_month = connection.execute(
+        select(func.count(Workout.id))
+        .where(Workout.id.in_(workout_ids), func.strftime("%Y-%m", Workout.created_at) == current_month())
+    ).scalar()
+    return {"storage_bytes": -storage, "workouts_this_month": -this_month}
+
+
+def _purge_batch(session: Session, tenant_id: int, model, user_ids: List[int], limit: int) -> int:
+    """
+    Writer unit: delete up to ``limit`` rows of ``model`` owned by ``user_ids``
+    """
+    connection = session.connection(bind_arguments={"mapper": model.__mapper__})
+    ids = connection.execute(select(model.id).where(model.user_id.in_(user_ids)).limit(limit)).scalars().all()
+    if not ids:
+        return 0
+    if model is Workout:
+        add_usage(session, tenant_id, **_usage_of_workouts(connection, ids))
+    return connection.execute(delete(model.__table__).where(model.id.in_(ids))).rowcount
+
+
+def purge_user_data(tenant_id: int, user_ids: List[int], job: Optional[Job] = None) -> int:
+    """
+    Delete what ``user_ids`` own in batches of PURGE_BATCH_ROWS, one write
+    transaction each, so other writers get the lock in between
+    """
+    purged = 0
+    limit = settings.PURGE_BATCH_ROWS
+    for model in USER_DATA:
+        while True:
+            deleted = writer_for(tenant_id).run_sync(
+                lambda session, model=model: _purge_batch(session, tenant_id, model, user_ids, limit)
+            )
+            purged += deleted
+            if job is not None and deleted:
+                job.update(purged_rows=job.progress.get("purged_rows", 0) + deleted)
+            if deleted < limit:
+                break
+    return purged
+
+
+def _delete_users(session: Session, tenant_id: int, user_ids: List[int]) -> int:
+    """
+    Writer unit: delete ``user_ids`` and everything they still own
+    """
+    data = session.connection(bind_arguments={"mapper": Workout.__mapper__})
+    changes = _usage_of_workouts(data, select(Workout.id).where(Workout.user_id.in_(user_ids)))
+    # Explicit in sharding mode, where this data is not in the users' database
+    for model in USER_DATA:
+        data.execute(delete(model.__table__).where(model.user_id.in_(user_ids)))
+    catalog = session.connection(bind_arguments={"mapper": User.__mapper__})
+    deleted = catalog.execute(delete(User.__table__).where(User.id.in_(user_ids))).rowcount
+    add_usage(session, tenant_id, users=-deleted, **changes)
+    return deleted
+
+
+def owned_rows(by_tenant: Dict[int, List[int]]) -> int:
+    """
+    Rows the users own directly, to tell whether deleting them is quick
+    """
+    total = 0
+    size = settings.BULK_CHUNK_SIZE
+    for tenant_id, ids in by_tenant.items():
+        with read_snapshot(tenant_id if settings.SHARDING_ENABLED else None) as db:
+            for start in range(0, len(ids), size):
+                chunk = ids[start:start + size]
+                for model in USER_DATA:
+                    total += db.execute(select(func.count()).where(model.user_id.in_(chunk))).scalar()
+    return total
+
+
+def is_large_delete(user_filter: UserFilter, actor_id: Optional[int] = None) -> bool:
+    """
+    Whether deleting the matching users should run as a background job
+    """
+    return owned_rows(matching_users(user_filter, exclude_id=actor_id)) > settings.PURGE_INLINE_MAX_ROWS
+
+
+def bulk_update_users(
+    user_filter: UserFilter,
+    operation: str,
+    actor_id: Optional[int] = None,
+    dry_run: bool = False,
+    job: Optional[Job] = None,
+) -> Dict[str, Any]:
+    """
+    Apply ``operation`` to every user matching ``user_filter`` except
+    ``actor_id``; returns the matched and affected counts per tenant
+    """
+    if operation not in OPERATIONS:
+        raise ValueError(f"Unknown operation {operation!r}")
+    by_tenant = matching_users(user_filter, exclude_id=actor_id)
+    matched = sum(len(ids) for ids in by_tenant.values())
+    result: Dict[str, Any] = {
+        "operation": operation,
+        "matched": matched,
+        "affected": 0,
+        "tenants": {tenant_id: {"matched": len(ids), "affected": 0} for tenant_id, ids in by_tenant.items()},
+        "dry_run": dry_run,
+    }
+    if dry_run or not matched:
+        return result
+
+    size = settings.BULK_CHUNK_SIZE
+    chunks = [
+        (tenant_id, ids[start:start + size])
+        for tenant_id, ids in by_tenant.items() for start in range(0, len(ids), size)
+    ]
+    error = None
+    try:
+        if operation == "delete":
+            # Lock everyone out first: purging a large account takes a while
+            for tenant_id, chunk in chunks:
+                writer_for(tenant_id).run_sync(lambda session, chunk=chunk: _set_active(session, chunk, False))
+                for user_id in chunk:
+                    response_cache.bump_generation(user_id)
+            result["purged_rows"] = 0
+        for tenant_id, chunk in chunks:
+            if operation == "delete":
+                result["purged_rows"] += purge_user_data(tenant_id, chunk, job)
+
+                def unit(session, tenant_id=tenant_id, chunk=chunk):
+                    return _delete_users(session, tenant_id, chunk)
+            else:
+                def unit(session, chunk=chunk):
+                    return _set_active(session, chunk, operation == "activate")
+            affected = writer_for(tenant_id).run_sync(unit)
+            result["tenants"][tenant_id]["affected"] += affected
+            result["affected"] += affected
+            if job is not None:
+                job.update(affected=result["affected"], matched=matched)
+            for user_id in chunk:
+                response_cache.bump_generation(user_id)
+                if operation == "delete":
+                    USER_TENANTS.pop(user_id, None)
+    except Exception as exc:
+        error = result["error"] = str(exc)
+        raise
+    finally:
+        summary = {key: value for key, value in result.items() if key != "dry_run"}
+        audit = AuditLog(
+            user_id=actor_id,
+            action_type=f"bulk_{operation}",
+            entity_type="user",
+            old_value={"filter": user_filter.as_dict()},
+            new_value=summary if error is None else {**summary, "error": error},
+        )
+        writer.run_sync(lambda session: session.add(audit))
+    return result
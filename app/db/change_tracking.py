@@ -0,0 +1,128 @@
+# ==================== Change Tracking ====================
+# File: app/db/change_tracking.py
+
+"""
+Record ORM writes to synced entities in the change_log table.
+
+Listeners on ``SessionLocal`` (registered when app.db.session is imported)
+add one change_log row per created, updated or deleted entity, inside the
+same flush (and therefore the same transaction, see
+``begin_write_transaction``) as the write itself. The sync feed
+(/sync/changes) reads this log by cursor.
+
+Only writes that go through a Session flush are recorded; Core or bulk
+``query.update()/delete()`` statements must add their own entries. Rows
+removed by ON DELETE CASCADE (a workout's exercises, a goal's milestones)
+are never loaded, so their "deleted" entries are copied from the database
+by parent id (INSERT ... SELECT) before the parent's DELETE runs.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from sqlalchemy import event, insert, literal, select
+
+from app.db.session import SessionLocal
+from app.models import (
+    ChangeLog, Workout, StrengthExercise, CardioActivity, Goal, GoalMilestone, BodyMeasurement
+)
+
+PENDING_DELETES = "change_log_pending_deletes"
+
+
+@dataclass(frozen=True)
+class TrackedEntity:
+    entity_type: str
+    # Resolve the owning user_id of an instance: (connection, obj) -> user_id
+    owner: Callable[[Any, Any], Optional[int]]
+
+
+def _own_user(connection, obj) -> Optional[int]:
+    return obj.user_id
+
+
+def _parent_user(parent: Type[Any], foreign_key: str):
+    def resolve(connection, obj) -> Optional[int]:
+        return connection.execute(
+            select(parent.user_id).where(parent.id == getattr(obj, foreign_key))
+        ).scalar()
+    return resolve
+
+
+TRACKED: Dict[type, TrackedEntity] = {
+    Workout: TrackedEntity("workout", _own_user),
+    StrengthExercise: TrackedEntity("strength_exercise", _parent_user(Workout, "workout_id")),
+    CardioActivity: TrackedEntity("cardio_activity", _parent_user(Workout, "workout_id")),
+    Goal: TrackedEntity("goal", _own_user),
+    GoalMilestone: TrackedEntity("goal_milestone", _parent_user(Goal, "goal_id")),
+    BodyMeasurement: TrackedEntity("body_measurement", _own_user),
+}
+
+
+# Tracked children the database deletes with their parent: parent -> foreign keys
+CASCADED = {
+    Workout: (StrengthExercise.workout_id, CardioActivity.workout_id),
+    Goal: (GoalMilestone.goal_id,),
+}
+
+
+def _entries(session, objects, operation: str) -> List[dict]:
+    connection = session.connection()
+    entries = []
+    for obj in objects:
+        tracked = TRACKED.get(type(obj))
+        if tracked is None:
+            continue
+        if operation == "updated" and not session.is_modified(obj, include_collections=False):
+            continue
+        user_id = tracked.owner(connection, obj)
+        if user_id is None:
+            continue
+        entries.append({
+            "user_id": user_id,
+            "entity_type": tracked.entity_type,
+            "entity_id": obj.id,
+            "operation": operation,
+        })
+    return entries
+
+
+def _record_cascaded_deletes(session):
+    """
+    Log a "deleted" entry for each tracked child the database will cascade
+    """
+    connection = session.connection()
+    for parent, foreign_keys in CASCADED.items():
+        parent_ids = [obj.id for obj in session.deleted if type(obj) is parent]
+        if not parent_ids:
+            continue
+        for foreign_key in foreign_keys:
+            child = foreign_key.class_
+            rows = (
+                select(parent.user_id, literal(TRACKED[child].entity_type), child.id, literal("deleted"))
+                .join(parent, parent.id == foreign_key)
+                .where(foreign_key.in_(parent_ids))
+            )
+            # Children the session deletes itself are logged by _entries
+            flushed = [obj.id for obj in session.deleted if type(obj) is child]
+            if flushed:
+                rows = rows.where(child.id.not_in(flushed))
+            connection.execute(
+                insert(ChangeLog).from_select(["user_id", "entity_type", "entity_id", "operation"], rows)
+            )
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def collect_deletes(session, flush_context, instances):
+    # Owners of deleted children are looked up while their parents still exist
+    session.info[PENDING_DELETES] = _entries(session, session.deleted, "deleted")
+    _record_cascaded_deletes(session)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def record_changes(session, flush_context):
+    entries = _entries(session, session.new, "created")
+    entries += _entries(session, session.dirty, "updated")
+    entries += session.info.pop(PENDING_DELETES, [])
+    if entries:
+        session.connection().execute(insert(ChangeLog), entries)
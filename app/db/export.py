@@ -0,0 +1,241 @@
+# ==================== Data Subject Export ====================
+# File: app/db/export.py
+
+"""
+GDPR/CCPA export of everything held about a user, as a ZIP of NDJSON
+files (one per table, audit entries moved out by the retention job in
+audit_logs_archived.ndjson) plus a manifest.json with the row counts.
+
+    POST /api/v1/users/me/export              (admins: /admin/users/{id}/export)
+    GET  /api/v1/users/me/exports/{export_id}  (Range requests supported)
+    python -m app.db.export USER_ID
+
+Rows go straight from the database into the archive: each query is read
+EXPORT_FETCH_ROWS rows at a time (pysqlite steps the statement as rows
+are fetched) and written to its member through ``ZipFile.open(name, "w")``,
+so memory stays flat however large the account. The queries on a database
+share one read snapshot (in sharding mode: one on the shard, one on the
+catalog).
+
+Archives are written to EXPORT_DIR/<user_id>/<export_id>.zip through a
+.partial file, so a download never sees half an archive, and removed after
+EXPORT_RETENTION_HOURS. Accounts owning more than EXPORT_INLINE_MAX_ROWS
+rows are exported by a background job (see app/api/exports.py).
+"""
+
+import json
+import os
+import time
+import uuid
+import zipfile
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.jobs import Job
+from app.db.audit_archive import AuditQuery, archived_entries
+from app.db.session import read_snapshot
+from app.db.writer import writer
+from app.models import (
+    AuditLog, BodyMeasurement, CardioActivity, Goal, GoalMilestone, NotificationPreference, PersonalRecord,
+    StrengthExercise, TemplateExercise, User, UserConsent, UserProfile, Workout, WorkoutMedia, WorkoutTemplate
+)
+
+# Never exported: credentials, not data about the person
+EXCLUDED_COLUMNS = {"hashed_password"}
+
+
+def _owned(model):
+    return lambda user_id: model.user_id == user_id
+
+
+def _via(model, foreign_key: str, parent):
+    return lambda user_id: getattr(model, foreign_key).in_(select(parent.id).where(parent.user_id == user_id))
+
+
+# member name -> (model, condition selecting the user's rows)
+SECTIONS = {
+    "user": (User, lambda user_id: User.id == user_id),
+    "profile": (UserProfile, _owned(UserProfile)),
+    "consents": (UserConsent, _owned(UserConsent)),
+    "notification_preferences": (NotificationPreference, _owned(NotificationPreference)),
+    "workouts": (Workout, _owned(Workout)),
+    "strength_exercises": (StrengthExercise, _via(StrengthExercise, "workout_id", Workout)),
+    "cardio_activities": (CardioActivity, _via(CardioActivity, "workout_id", Workout)),
+    "workout_media": (WorkoutMedia, _via(WorkoutMedia, "workout_id", Workout)),
+    "workout_templates": (WorkoutTemplate, _owned(WorkoutTemplate)),
+    "template_exercises": (TemplateExercise, _via(TemplateExercise, "template_id", WorkoutTemplate)),
+    "goals": (Goal, _owned(Goal)),
+    "goal_milestones": (GoalMilestone, _via(GoalMilestone, "goal_id", Goal)),
+    "body_measurements": (BodyMeasurement, _owned(BodyMeasurement)),
+    "personal_records": (PersonalRecord, _owned(PersonalRecord)),
+    "audit_logs": (AuditLog, _owned(AuditLog)),
+}
+
+
+class ExportError(Exception):
+    pass
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _valid_id(export_id: str) -> bool:
+    return len(export_id) == 32 and all(c in "0123456789abcdef" for c in export_id)
+
+
+def export_path(user_id: int, export_id: str) -> str:
+    return os.path.join(settings.EXPORT_DIR, str(user_id), f"{export_id}.zip")
+
+
+def find_export(user_id: int, export_id: str) -> Optional[str]:
+    """
+    Path of a finished archive, None if unknown, unfinished or expired
+    """
+    if not _valid_id(export_id):
+        return None
+    path = export_path(user_id, export_id)
+    return path if os.path.isfile(path) else None
+
+
+def prune_exports(retention_hours: float = settings.EXPORT_RETENTION_HOURS) -> int:
+    """
+    Delete archives (and abandoned partial files) older than the retention
+    """
+    if not os.path.isdir(settings.EXPORT_DIR):
+        return 0
+    cutoff = time.time() - retention_hours * 3600
+    removed = 0
+    for directory in os.listdir(settings.EXPORT_DIR):
+        path = os.path.join(settings.EXPORT_DIR, directory)
+        if not os.path.isdir(path):
+            continue
+        for name in os.listdir(path):
+            file = os.path.join(path, name)
+            if os.path.getmtime(file) < cutoff:
+                os.remove(file)
+                removed += 1
+    return removed
+
+
+def _write_section(archive: zipfile.ZipFile, db, name: str, user_id: int) -> int:
+    model, condition = SECTIONS[name]
+    columns = [column for column in model.__table__.columns if column.name not in EXCLUDED_COLUMNS]
+    query = select(*columns).where(condition(user_id)).order_by(model.__table__.c.id)
+    connection = db.connection(bind_arguments={"mapper": model.__mapper__})
+    rows = 0
+    with archive.open(f"{name}.ndjson", "w", force_zip64=True) as member:
+        result = connection.execute(query.execution_options(yield_per=settings.EXPORT_FETCH_ROWS))
+        for partition in result.mappings().partitions():
+            member.write("".join(
+                json.dumps(dict(row), default=_json_default, ensure_ascii=False) + "\n" for row in partition
+            ).encode())
+            rows += len(partition)
+    return rows
+
+
+def _write_archived(archive: zipfile.ZipFile, user_id: int) -> int:
+    rows = 0
+    with archive.open("audit_logs_archived.ndjson", "w", force_zip64=True) as member:
+        for row in archived_entries(AuditQuery(user_id=user_id)):
+            member.write((json.dumps(row, ensure_ascii=False) + "\n").encode())
+            rows += 1
+    return rows
+
+
+def create_export(
+    user_id: int,
+    tenant_id: int,
+    requested_by: Optional[int] = None,
+    export_id: Optional[str] = None,
+    job: Optional[Job] = None,
+) -> Dict[str, Any]:
+    """
+    Write the archive for ``user_id`` and return where it is and what it holds
+    """
+    export_id = export_id or uuid.uuid4().hex
+    path = export_path(user_id, export_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    prune_exports()
+
+    counts: Dict[str, int] = {}
+    with read_snapshot(tenant_id if settings.SHARDING_ENABLED else None) as db:
+        if db.get(User, user_id) is None:
+            raise ExportError(f"User {user_id} not found")
+        with zipfile.ZipFile(path + ".partial", "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+            for name in SECTIONS:
+                counts[name] = _write_section(archive, db, name, user_id)
+                if job is not None:
+                    job.update(tables_done=len(counts), tables=len(SECTIONS), rows=sum(counts.values()))
+            counts["audit_logs_archived"] = _write_archived(archive, user_id)
+            archive.writestr("manifest.json", json.dumps({
+                "export_id": export_id,
+                "user_id": user_id,
+                "created_at": datetime.utcnow().isoformat(),
+                "format": "ndjson",
+                "tables": counts,
+            }, indent=2))
+    os.replace(path + ".partial", path)
+
+    result = {
+        "export_id": export_id,
+        "user_id": user_id,
+        "bytes": os.path.getsize(path),
+        "rows": sum(counts.values()),
+        "tables": counts,
+    }
+    audit = AuditLog(
+        user_id=requested_by,
+        action_type="export",
+        entity_type="user",
+        entity_id=user_id,
+        new_value={"export_id": export_id, "rows": result["rows"], "bytes": result["bytes"]},
+    )
+    writer.run_sync(lambda session: session.add(audit))
+    return result
+
+
+def is_large_export(user_id: int, tenant_id: int) -> bool:
+    """
+    Whether the account should be exported by a background job
+    """
+    from app.db.bulk_users import owned_rows
+
+    return owned_rows({tenant_id: [user_id]}) > settings.EXPORT_INLINE_MAX_ROWS
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export everything held about a user (GDPR/CCPA)")
+    parser.add_argument("user_id", type=int)
+    args = parser.parse_args()
+
+    from app.db.session import ReadSessionLocal
+
+    db = ReadSessionLocal()
+    try:
+        user = db.get(User, args.user_id)
+    finally:
+        db.close()
+    if user is None:
+        parser.exit(1, f"error: user {args.user_id} not found\n")
+    try:
+        result = create_export(user.id, user.tenant_id)
+    finally:
+        writer.stop()
+    for name, rows in result["tables"].items():
+        print(f"{name}: {rows} rows")
+    print(f"{export_path(user.id, result['export_id'])} ({result['bytes']} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# ==================== Foreign Key Actions ====================
+# File: app/db/foreign_keys.py
+
+"""
+Keep each table's foreign keys, and their ON DELETE actions, as the
+models declare them.
+
+Connections run with ``PRAGMA foreign_keys=ON`` and the models declare
+``ondelete="CASCADE"`` (``SET NULL`` for audit entries and personal
+records), so deleting a workout, goal or user is a single DELETE and
+SQLite removes the children itself; relationships use
+``passive_deletes=True`` so the ORM does not load them first.
+
+SQLite cannot alter a constraint, and ``create_all`` leaves existing
+tables alone, so tables created before the actions were declared are
+rebuilt: create the new table, copy the rows, drop the old one, rename
+(the procedure from the SQLite ALTER TABLE docs), all in one write
+transaction with enforcement off, followed by ``PRAGMA foreign_key_check``.
+This runs at startup and when a shard is opened (a few PRAGMA reads when
+nothing is outdated), or by hand:
+
+    python -m app.db.foreign_keys upgrade
+
+Shard tables reference users, which live in the catalog file; SQLite
+rejects writes to a table whose parent table is missing, so shards get
+their tables without those constraints (``skip``).
+"""
+
+import logging
+from typing import Any, Collection, Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import Table, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+logger = logging.getLogger(__name__)
+
+ForeignKeyRow = Tuple[str, str, str, str]
+
+
+def _constraints(table: Table, skip: Collection[str]) -> list:
+    return [
+        constraint for constraint in table.foreign_key_constraints
+        if constraint.referred_table.name not in skip
+    ]
+
+
+def expected_foreign_keys(table: Table, skip: Collection[str] = ()) -> Set[ForeignKeyRow]:
+    """
+    (parent table, column, parent column, ON DELETE action) per declared key
+    """
+    return {
+        (fk.column.table.name, fk.parent.name, fk.column.name, (constraint.ondelete or "NO ACTION").upper())
+        for constraint in _constraints(table, skip)
+        for fk in constraint.elements
+    }
+
+
+def actual_foreign_keys(dbapi_conn, table: str) -> Set[ForeignKeyRow]:
+    rows = dbapi_conn.execute(f'PRAGMA foreign_key_list("{table}")').fetchall()
+    # id, seq, table, from, to, on_update, on_delete, match
+    return {(row[2], row[3], row[4], row[6].upper()) for row in rows}
+
+
+def _existing_tables(dbapi_conn) -> Set[str]:
+    return {row[0] for row in dbapi_conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def outdated_tables(dbapi_conn, tables: Iterable[Table], skip: Collection[str] = ()) -> List[Table]:
+    existing = _existing_tables(dbapi_conn)
+    return [
+        table for table in tables
+        if table.name in existing and actual_foreign_keys(dbapi_conn, table.name) != expected_foreign_keys(table, skip)
+    ]
+
+
+def _ddl(engine: Engine, table: Table, skip: Collection[str]) -> Tuple[str, List[str]]:
+    create = str(CreateTable(table, include_foreign_key_constraints=_constraints(table, skip))
+                 .compile(dialect=engine.dialect))
+    indexes = [str(CreateIndex(index).compile(dialect=engine.dialect)) for index in table.indexes]
+    return create, indexes
+
+
+def create_tables(engine: Engine, tables: Iterable[Table], skip: Collection[str] = ()):
+    """
+    ``create_all`` for ``tables``, leaving out foreign keys to ``skip``
+    """
+    existing = set(inspect(engine).get_table_names())
+    with engine.begin() as connection:
+        for table in tables:
+            if table.name in existing:
+                continue
+            create, indexes = _ddl(engine, table, skip)
+            connection.exec_driver_sql(create)
+            for index in indexes:
+                connection.exec_driver_sql(index)
+
+
+def _rebuild(engine: Engine, dbapi_conn, table: Table, skip: Collection[str]):
+    preparer = engine.dialect.identifier_preparer
+    name = preparer.format_table(table)
+    new_name = preparer.quote(f"{table.name}__rebuild")
+    create, indexes = _ddl(engine, table, skip)
+    existing = {row[1] for row in dbapi_conn.execute(f"PRAGMA table_info({name})")}
+    columns = ", ".join(preparer.quote(column.name) for column in table.columns if column.name in existing)
+
+    dbapi_conn.execute(f"DROP TABLE IF EXISTS {new_name}")
+    dbapi_conn.execute(create.replace(f"CREATE TABLE {name} ", f"CREATE TABLE {new_name} ", 1))
+    dbapi_conn.execute(f"INSERT INTO {new_name} ({columns}) SELECT {columns} FROM {name}")
+    dbapi_conn.execute(f"DROP TABLE {name}")
+    dbapi_conn.execute(f"ALTER TABLE {new_name} RENAME TO {name}")
+    for index in indexes:
+        dbapi_conn.execute(index)
+
+
+def upgrade(engine: Engine, tables: Iterable[Table], skip: Collection[str] = ()) -> Dict[str, Any]:
+    """
+    Rebuild the tables whose foreign keys differ from the models; returns
+    the rebuilt tables and any rows whose parent is missing
+    """
+    tables = list(tables)
+    connection = engine.raw_connection()
+    dbapi_conn = connection.driver_connection
+    try:
+        if not outdated_tables(dbapi_conn, tables, skip):
+            return {"rebuilt": [], "violations": {}}
+        # Enforcement cannot change inside a transaction, and must be off
+        # while the old tables are dropped
+        dbapi_conn.execute("PRAGMA foreign_keys=OFF")
+        dbapi_conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have upgraded while we waited for the lock
+            outdated = outdated_tables(dbapi_conn, tables, skip)
+            for table in outdated:
+                _rebuild(engine, dbapi_conn, table, skip)
+            violations: Dict[str, int] = {}
+            for row in dbapi_conn.execute("PRAGMA foreign_key_check"):
+                violations[row[0]] = violations.get(row[0], 0) + 1
+            dbapi_conn.execute("COMMIT")
+        except Exception:
+            dbapi_conn.execute("ROLLBACK")
+            raise
+        finally:
+            dbapi_conn.execute("PRAGMA foreign_keys=ON")
+    finally:
+        connection.close()
+
+    rebuilt = [table.name for table in outdated]
+    if rebuilt:
+        logger.info(f"Rebuilt {', '.join(rebuilt)} with their ON DELETE actions")
+    if violations:
+        logger.warning(f"Rows referencing missing parents: {violations}")
+    return {"rebuilt": rebuilt, "violations": violations}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bring foreign key ON DELETE actions up to date")
+    parser.add_argument("command", choices=["upgrade"])
+    parser.parse_args()
+
+    from app.core.config import settings
+    from app.db.base import Base
+    from app.db.session import engine
+
+    results = {settings.DATABASE_URL: upgrade(engine, Base.metadata.sorted_tables)}
+    if settings.SHARDING_ENABLED:
+        from app.db.sharding import shards
+        for tenant_id in shards.tenant_ids():
+            # Opening a shard upgrades it
+            results[shards.path(tenant_id)] = shards.get(tenant_id).foreign_keys
+    for database, result in results.items():
+        print(f"{database}: rebuilt {', '.join(result['rebuilt']) or 'nothing'}")
+        for table, count in result["violations"].items():
+            print(f"  {table}: {count} rows reference a missing parent")
+
+
+if __name__ == "__main__":
+    main()
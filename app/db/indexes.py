@@ -0,0 +1,55 @@
+# ==================== Index Upgrades ====================
+# File: app/db/indexes.py
+
+"""
+Keep each table's indexes as the models declare them.
+
+``create_all`` only indexes the tables it creates, so an index added to
+an existing table (like the audit log's query indexes) would never reach
+databases created before it. At startup, and when a shard is opened,
+missing indexes are created and ``ix_``-named indexes the models no
+longer declare (superseded by a composite one) are dropped; when nothing
+changed this is one read of sqlite_master.
+"""
+
+import logging
+from typing import Dict, Iterable, List
+
+from sqlalchemy import Table
+from sqlalchemy.engine import Engine
+from sqlalchemy.schema import CreateIndex
+
+logger = logging.getLogger(__name__)
+
+
+def sync_indexes(engine: Engine, tables: Iterable[Table]) -> Dict[str, List[str]]:
+    """
+    Create missing and drop stale indexes of ``tables``; returns both lists
+    """
+    tables = list(tables)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as connection:
+        existing = {
+            name: table for name, table in connection.exec_driver_sql(
+                "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL"
+            )
+        }
+        tables_present = {
+            row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        created, dropped = [], []
+        for table in tables:
+            if table.name not in tables_present:
+                continue
+            declared = {index.name for index in table.indexes}
+            for index in table.indexes:
+                if index.name not in existing:
+                    connection.exec_driver_sql(str(CreateIndex(index).compile(dialect=engine.dialect)))
+                    created.append(index.name)
+            for name, table_name in existing.items():
+                if table_name == table.name and name.startswith("ix_") and name not in declared:
+                    connection.exec_driver_sql(f"DROP INDEX {preparer.quote(name)}")
+                    dropped.append(name)
+    if created or dropped:
+        logger.info(f"Indexes created: {', '.join(created) or 'none'}; dropped: {', '.join(dropped) or 'none'}")
+    return {"created": created, "dropped": dropped}
@@ -0,0 +1,364 @@
+# ==================== Database Maintenance ====================
+# File: app/db/maintenance.py
+
+"""
+Background WAL checkpointing and housekeeping for the SQLite files.
+
+A scheduler thread, started from the app's startup event, looks at the
+main database (and every tenant shard in sharding mode) each
+MAINTENANCE_INTERVAL seconds:
+
+- WAL above WAL_CHECKPOINT_MB: ``wal_checkpoint(PASSIVE)``, which copies
+  frames back without blocking anyone. Above WAL_TRUNCATE_MB, or whenever
+  the database is idle, ``wal_checkpoint(TRUNCATE)`` also resets the file.
+- ``PRAGMA optimize`` every OPTIMIZE_INTERVAL_MINUTES, and a full
+  ``ANALYZE`` every ANALYZE_INTERVAL_HOURS in an idle window.
+- ``incremental_vacuum`` in idle windows once the freelist passes
+  VACUUM_FREELIST_PAGES (only for files with auto_vacuum=INCREMENTAL; new
+  files get it, existing ones are converted with
+  ``python -m app.db.maintenance enable-incremental-vacuum``).
+- Every USAGE_RECONCILE_MINUTES (and on the first tick), the tenant usage
+  counters are recomputed from the base tables (app/db/usage.py).
+- With BACKUP_INTERVAL_HOURS set, an online backup (app/db/backup.py)
+  once that many hours have passed since the newest one.
+- With AUDIT_RETENTION_DAYS set, expired audit entries move to the
+  monthly archives (app/db/audit_archive.py) every
+  AUDIT_ARCHIVE_INTERVAL_HOURS.
+
+"Idle" means the database and its WAL have not been written for
+MAINTENANCE_IDLE_SECONDS. Request connections keep a much higher
+wal_autocheckpoint as a safety net, so checkpoints no longer land on
+request threads. With several workers, one of them (holding a lock file
+next to each database) does the maintenance.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+def database_paths() -> List[str]:
+    """
+    The main SQLite file plus, in sharding mode, every tenant shard
+    """
+    paths = []
+    parsed = make_url(settings.DATABASE_URL)
+    if parsed.get_backend_name() == "sqlite" and parsed.database and parsed.database != ":memory:":
+        paths.append(os.path.abspath(parsed.database))
+    if settings.SHARDING_ENABLED:
+        shard_dir = os.path.abspath(settings.SHARD_DIR)
+        if os.path.isdir(shard_dir):
+            paths.extend(sorted(
+                os.path.join(shard_dir, name) for name in os.listdir(shard_dir)
+                if name.startswith("tenant_") and name.endswith(".db")
+            ))
+    return [path for path in paths if os.path.exists(path)]
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _last_write(path: str) -> float:
+    return max((os.path.getmtime(p) for p in (path, path + "-wal") if os.path.exists(p)), default=0.0)
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    # Short busy timeout: maintenance gives way to traffic and retries next tick
+    return sqlite3.connect(path, timeout=settings.MAINTENANCE_BUSY_TIMEOUT, isolation_level=None)
+
+
+def database_stats(path: str) -> Dict[str, Any]:
+    """
+    Size, WAL and page statistics of one database file
+    """
+    conn = _connect(path)
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    finally:
+        conn.close()
+    return {
+        "path": path,
+        "size_bytes": _file_size(path),
+        "wal_bytes": _file_size(path + "-wal"),
+        "journal_mode": journal_mode,
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist,
+        "freelist_bytes": freelist * page_size,
+        "auto_vacuum": AUTO_VACUUM_MODES.get(auto_vacuum, auto_vacuum),
+        "idle_seconds": round(time.time() - _last_write(path), 1),
+    }
+
+
+@dataclass
+class DatabaseState:
+    """
+    What the scheduler has done to one file
+    """
+    lock_file: Optional[Any] = None
+    last_optimize: float = 0.0
+    last_analyze: float = 0.0
+    last_checkpoint: Optional[Dict[str, Any]] = None
+    last_backup: Optional[float] = None
+    last_backup_file: Optional[str] = None
+    counters: Dict[str, int] = field(default_factory=lambda: {
+        "checkpoint_passive": 0,
+        "checkpoint_truncate": 0,
+        "checkpoint_busy": 0,
+        "optimize": 0,
+        "analyze": 0,
+        "vacuumed_pages": 0,
+        "backups": 0,
+        "errors": 0,
+    })
+
+
+class MaintenanceScheduler:
+    """
+    Background thread running checkpoints, optimize/ANALYZE and incremental vacuum
+    """
+    def __init__(self, interval: float = settings.MAINTENANCE_INTERVAL):
+        self.interval = interval
+        self.states: Dict[str, DatabaseState] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_reconcile = 0.0
+        self.last_audit_archive = 0.0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="db-maintenance", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+        for state in self.states.values():
+            if state.lock_file is not None:
+                state.lock_file.close()
+                state.lock_file = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            for index, path in enumerate(database_paths()):
+                state = self.states.setdefault(path, DatabaseState())
+                if not self._is_leader(path, state):
+                    continue
+                try:
+                    self.maintain(path, state)
+                except sqlite3.Error as exc:
+                    state.counters["errors"] += 1
+                    logger.warning(f"Maintenance of {path} failed: {exc}")
+                if settings.BACKUP_INTERVAL_HOURS:
+                    self.backup_if_due(path, state)
+                # The main database's leader also reconciles tenant usage counters
+                if index == 0 and settings.USAGE_RECONCILE_MINUTES:
+                    self.reconcile_if_due()
+                # ...and moves expired audit entries to the archives
+                if index == 0 and settings.AUDIT_RETENTION_DAYS:
+                    self.archive_audit_if_due()
+
+    def _is_leader(self, path: str, state: DatabaseState) -> bool:
+        """
+        Hold an exclusive lock file so only one worker maintains ``path``
+        """
+        if fcntl is None or state.lock_file is not None:
+            return True
+        lock_file = open(path + ".maintenance.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        state.lock_file = lock_file
+        return True
+
+    def maintain(self, path: str, state: DatabaseState):
+        now = time.time()
+        wal_bytes = _file_size(path + "-wal")
+        idle = now - _last_write(path) >= settings.MAINTENANCE_IDLE_SECONDS
+        counters = state.counters
+
+        conn = _connect(path)
+        try:
+            mode = None
+            if wal_bytes >= settings.WAL_TRUNCATE_MB * 1024 * 1024 or (idle and wal_bytes > 0):
+                mode = "TRUNCATE"
+            elif wal_bytes >= settings.WAL_CHECKPOINT_MB * 1024 * 1024:
+                mode = "PASSIVE"
+            if mode:
+                busy, log_frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+                counters[f"checkpoint_{mode.lower()}"] += 1
+                if busy:
+                    counters["checkpoint_busy"] += 1
+                state.last_checkpoint = {
+                    "mode": mode, "at": now, "wal_bytes_before": wal_bytes,
+                    "busy": bool(busy), "log_frames": log_frames, "checkpointed_frames": checkpointed,
+                }
+
+            if now - state.last_optimize >= settings.OPTIMIZE_INTERVAL_MINUTES * 60:
+                conn.execute("PRAGMA optimize")
+                state.last_optimize = now
+                counters["optimize"] += 1
+
+            if not idle:
+                return
+
+            if now - state.last_analyze >= settings.ANALYZE_INTERVAL_HOURS * 3600:
+                conn.execute("ANALYZE")
+                state.last_analyze = now
+                counters["analyze"] += 1
+
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if freelist >= settings.VACUUM_FREELIST_PAGES:
+                    conn.execute(f"PRAGMA incremental_vacuum({settings.VACUUM_STEP_PAGES})")
+                    counters["vacuumed_pages"] += freelist - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            conn.close()
+
+    def backup_if_due(self, path: str, state: DatabaseState):
+        from app.db.backup import create_backup, latest_backup
+
+        if state.last_backup is None:
+            latest = latest_backup(path)
+            state.last_backup = datetime.fromisoformat(latest["created_at"]).replace(
+                tzinfo=timezone.utc
+            ).timestamp() if latest else 0.0
+        now = time.time()
+        if now - state.last_backup < settings.BACKUP_INTERVAL_HOURS * 3600:
+            return
+        state.last_backup = now  # a failed backup is retried next interval, not every tick
+        try:
+            manifest = create_backup(path)
+        except Exception:
+            state.counters["errors"] += 1
+            logger.exception(f"Backup of {path} failed")
+            return
+        state.counters["backups"] += 1
+        state.last_backup_file = manifest["file"]
+
+    def reconcile_if_due(self):
+        now = time.time()
+        if now - self.last_reconcile < settings.USAGE_RECONCILE_MINUTES * 60:
+            return
+        self.last_reconcile = now
+        from app.db.usage import reconcile
+        try:
+            reconcile()
+        except Exception:
+            logger.exception("Tenant usage reconcile failed")
+
+    def archive_audit_if_due(self):
+        now = time.time()
+        if now - self.last_audit_archive < settings.AUDIT_ARCHIVE_INTERVAL_HOURS * 3600:
+            return
+        self.last_audit_archive = now
+        from app.db.audit_archive import archive_audit_logs
+        try:
+            archive_audit_logs()
+        except Exception:
+            logger.exception("Audit log archive failed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None,
+            "databases": {
+                path: {
+                    "leader": state.lock_file is not None or fcntl is None,
+                    "last_checkpoint": state.last_checkpoint,
+                    "last_backup": state.last_backup_file,
+                    **state.counters,
+                }
+                for path, state in self.states.items()
+            },
+        }
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        Fresh statistics for every database, with what maintenance did to it
+        """
+        databases = []
+        for path in database_paths():
+            state = self.states.get(path)
+            databases.append({
+                **database_stats(path),
+                "maintenance": None if state is None else {
+                    "last_checkpoint": state.last_checkpoint,
+                    "last_optimize": state.last_optimize or None,
+                    "last_analyze": state.last_analyze or None,
+                    "last_backup": state.last_backup_file,
+                    **state.counters,
+                },
+            })
+        return databases
+
+
+scheduler = MaintenanceScheduler()
+metrics.register("maintenance", scheduler.snapshot)
+
+
+def enable_incremental_vacuum(path: str):
+    """
+    Switch an existing file to auto_vacuum=INCREMENTAL (rewrites it with VACUUM)
+    """
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def main():
+    import argparse  # CLI only; keeps it out of the app's import
+
+    parser = argparse.ArgumentParser(description="SQLite maintenance")
+    parser.add_argument("command", choices=["stats", "run", "enable-incremental-vacuum"])
+    args = parser.parse_args()
+
+    for path in database_paths():
+        if args.command == "enable-incremental-vacuum":
+            enable_incremental_vacuum(path)
+        elif args.command == "run":
+            state = DatabaseState()
+            scheduler.maintain(path, state)
+            print(path, state.counters)
+            continue
+        print(database_stats(path))
+
+
+if __name__ == "__main__":
+    main()
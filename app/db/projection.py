@@ -0,0 +1,135 @@
+# ==================== Column Projection ====================
+# File: app/db/projection.py
+
+"""
+Read-only column projection for list endpoints.
+
+Loading full ORM entities for a list page pays for the identity map,
+attribute instrumentation and change tracking, only for the objects to be
+dumped into Pydantic models straight away. A ``Projection`` rewrites an
+existing query to select just the columns a response schema needs and
+returns lightweight rows that Pydantic reads with ``from_attributes``.
+
+Example:
+    WORKOUT_LIST = Projection(Workout, WorkoutResponse)
+    workouts = WORKOUT_LIST.fetch(query.order_by(...).offset(skip).limit(size))
+
+Rows come back as ``__slots__`` records, which Pydantic reads faster than
+SQLAlchemy ``Row`` objects. Nested one-to-one relationships (e.g.
+``UserDetailResponse.profile``) are outer-joined and built as nested records.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import Select, inspect as sa_inspect
+from sqlalchemy.orm import Query, aliased
+
+
+def make_record_type(name: str, fields: Sequence[str]) -> type:
+    """
+    Build a minimal ``__slots__`` class holding ``fields``.
+
+    The positional ``__init__`` is generated (as namedtuple and dataclasses
+    do) because a per-field ``setattr`` loop costs more than the query.
+    """
+    for field in fields:
+        if not field.isidentifier():
+            raise ValueError(f"Invalid field name for record: {field!r}")
+    source = f"def __init__(self, {', '.join(fields)}):\n" + "".join(
+        f"    self.{field} = {field}\n" for field in fields
+    ) if fields else "def __init__(self):\n    pass\n"
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+
+    def __repr__(self):
+        inner = ", ".join(f"{f}={getattr(self, f)!r}" for f in fields)
+        return f"{name}({inner})"
+
+    return type(name, (), {
+        "__slots__": tuple(fields),
+        "__init__": namespace["__init__"],
+        "__repr__": __repr__,
+    })
+
+
+class Projection:
+    """
+    Select only the columns of ``model`` that ``schema`` declares.
+
+    Args:
+        model: SQLAlchemy model the query is built on
+        schema: Pydantic response schema to project onto
+        nested: Optional {relationship name: Projection} for one-to-one
+            relationships that the schema embeds
+    """
+    def __init__(
+        self,
+        model: Type[Any],
+        schema: Type[BaseModel],
+        nested: Optional[Dict[str, "Projection"]] = None,
+    ):
+        self.model = model
+        self.schema = schema
+        self.nested = nested or {}
+
+        mapper = sa_inspect(model)
+        column_keys = set(mapper.column_attrs.keys())
+        self.fields: List[str] = []
+        for name, info in schema.model_fields.items():
+            if name in column_keys:
+                self.fields.append(name)
+            elif name in self.nested:
+                relationship = mapper.relationships.get(name)
+                if relationship is None or relationship.uselist:
+                    raise ValueError(f"{model.__name__}.{name} is not a one-to-one relationship")
+            elif info.is_required():
+                raise ValueError(
+                    f"{schema.__name__}.{name} is required but not a column of {model.__name__}"
+                )
+
+        self.record_type = make_record_type(f"{schema.__name__}Record", self.fields + list(self.nested))
+
+    def columns(self, entity: Any = None, prefix: str = "") -> List[Any]:
+        entity = entity if entity is not None else self.model
+        return [getattr(entity, field).label(f"{prefix}{field}") for field in self.fields]
+
+    def _rewrite(self, query: Query) -> Tuple[Select, List[Tuple[str, int, int]]]:
+        # Work on the Core statement: Query refuses joins once LIMIT/OFFSET
+        # are applied, but a one-to-one outer join doesn't change the paging.
+        statement = query.statement
+        columns = self.columns()
+        slices = []
+        for name, projection in self.nested.items():
+            alias = aliased(projection.model)
+            statement = statement.outerjoin(getattr(self.model, name).of_type(alias))
+            start = len(columns)
+            columns.extend(projection.columns(alias, prefix=f"{name}__"))
+            primary_key = sa_inspect(projection.model).primary_key[0].key
+            columns.append(getattr(alias, primary_key).label(f"{name}__pk"))
+            slices.append((name, start, len(columns)))
+        return statement.with_only_columns(*columns), slices
+
+    def fetch(self, query: Query) -> List[Any]:
+        """
+        Execute ``query`` (filters, ordering and paging included) as a projection
+        """
+        statement, slices = self._rewrite(query)
+        rows = query.session.execute(statement).all()
+        record = self.record_type
+        if not slices:
+            return [record(*row) for row in rows]
+
+        flat = len(self.fields)
+        records = []
+        for row in rows:
+            values = list(row[:flat])
+            for name, start, end in slices:
+                # Last column of each nested slice is the related primary key;
+                # NULL means the outer join found nothing.
+                if row[end - 1] is None:
+                    values.append(None)
+                else:
+                    values.append(self.nested[name].record_type(*row[start:end - 1]))
+            records.append(record(*values))
+        return records
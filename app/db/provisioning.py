@@ -0,0 +1,287 @@
+# ==================== Bulk User Provisioning ====================
+# File: app/db/provisioning.py
+
+"""
+Bulk user provisioning from CSV or NDJSON.
+
+    POST /api/v1/admin/users/bulk?tenant_id=3   (body: the file; runs as a job)
+    python -m app.db.provisioning users.csv --tenant 3 [--invites invites.csv]
+
+Each row has an ``email`` and optionally a ``password`` and ``full_name``.
+Rows without a password get an invite token instead: a random secret
+stored like a password, which the user signs in with once before setting
+their own.
+
+Rows are handled in chunks of PROVISION_CHUNK_SIZE:
+
+1. every row is validated (email syntax, password length); emails repeated
+   in the file or already registered, found with one ``IN`` query per
+   chunk, become row errors;
+2. passwords and invite tokens are hashed on a process pool of
+   PROVISION_HASH_WORKERS (Argon2 is CPU-bound and holds the GIL);
+3. users, profiles and notification preferences go in with three bulk
+   INSERTs in one transaction of the writer, which also checks the
+   tenant's max_users quota. ``INSERT OR IGNORE`` skips emails registered
+   since step 1; they are reported as duplicates too.
+"""
+
+import csv
+import io
+import json
+import os
+import secrets
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, EmailStr, Field, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.jobs import Job
+from app.core.security import hash_password
+from app.db.session import ReadSessionLocal
+from app.db.usage import add_usage, check_usage
+from app.models import NotificationPreference, Tenant, User, UserProfile
+
+FORMATS = ("csv", "ndjson")
+
+
+class ProvisionRow(BaseModel):
+    email: EmailStr
+    password: Optional[str] = Field(None, min_length=8)
+    full_name: Optional[str] = None
+
+
+def detect_format(content_type: Optional[str], filename: str = "") -> str:
+    if "ndjson" in (content_type or "") or "jsonl" in (content_type or "") \
+            or filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def parse_rows(text: str, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield (row number, dict) per record, or (row number, error message)
+    for records that cannot be read
+    """
+    if fmt == "ndjson":
+        for number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield number, f"Invalid JSON: {exc}"
+                continue
+            yield number, record if isinstance(record, dict) else "Expected a JSON object"
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        if reader.fieldnames:
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        for number, record in enumerate(reader, start=2):  # row 1 is the header
+            yield number, record
+
+
+def _validate(record: Dict[str, Any]) -> ProvisionRow:
+    # Empty CSV cells mean "not given"
+    return ProvisionRow.model_validate({
+        key: value for key, value in record.items()
+        if key in ProvisionRow.model_fields and value not in (None, "")
+    })
+
+
+def _error_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+def _chunks(rows: Iterator[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Hasher:
+    """
+    Argon2 hashing on a process pool, or inline with PROVISION_HASH_WORKERS=0
+    """
+    def __init__(self, workers: int = settings.PROVISION_HASH_WORKERS):
+        self.workers = workers if workers >= 0 else (os.cpu_count() or 1)
+        self._pool = None
+
+    def __enter__(self) -> "Hasher":
+        if self.workers:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn: forking a threaded server process is not safe. Spawned
+            # children re-import __main__, so a server started from a script
+            # needs the usual ``if __name__ == "__main__"`` guard
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def hash_all(self, values: List[str]) -> List[str]:
+        if self._pool is None:
+            return [hash_password(value) for value in values]
+        chunksize = max(1, len(values) // (self.workers * 4))
+        return list(self._pool.map(hash_password, values, chunksize=chunksize))
+
+
+def _insert_chunk(session: Session, tenant_id: int, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Writer unit: bulk insert users with their profile and notification
+    preferences; returns email -> id of the users actually inserted
+    """
+    check_usage(session, tenant_id, users=len(rows))
+    connection = session.connection(bind_arguments={"mapper": User.__mapper__})
+    inserted = connection.execute(
+        insert(User.__table__).prefix_with("OR IGNORE").returning(User.id, User.email),
+        [
+            {"email": row["email"], "hashed_password": row["hashed_password"],
+             "tenant_id": tenant_id, "is_admin": False, "is_active": True}
+            for row in rows
+        ],
+    ).all()
+    ids = {email: user_id for user_id, email in inserted}
+    if ids:
+        names = {row["email"]: row["full_name"] for row in rows}
+        connection.execute(
+            insert(UserProfile.__table__),
+            [{"user_id": user_id, "full_name": names[email]} for email, user_id in ids.items()],
+        )
+        connection.execute(
+            insert(NotificationPreference.__table__),
+            [{"user_id": user_id} for user_id in ids.values()],
+        )
+        add_usage(session, tenant_id, users=len(ids))
+    return ids
+
+
+def provision_users(
+    text: str,
+    fmt: str,
+    tenant_id: int,
+    job: Job,
+    on_chunk: Optional[Callable[[Job], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Create the users described by ``text``; progress and row errors go to ``job``
+    """
+    from app.db.writer import writer
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}")
+    db = ReadSessionLocal()
+    try:
+        if db.get(Tenant, tenant_id) is None:
+            raise ValueError(f"Tenant {tenant_id} not found")
+    finally:
+        db.close()
+
+    seen = set()
+    invites: List[Dict[str, str]] = []
+    processed = created = failed = 0
+    job.update(processed=0, created=0, failed=0)
+
+    with Hasher() as hasher:
+        for chunk in _chunks(parse_rows(text, fmt), settings.PROVISION_CHUNK_SIZE):
+            valid: List[Tuple[int, ProvisionRow]] = []
+            for number, record in chunk:
+                if isinstance(record, str):
+                    job.add_error({"row": number, "error": record})
+                    continue
+                try:
+                    row = _validate(record)
+                except ValidationError as exc:
+                    job.add_error({"row": number, "email": record.get("email"), "error": _error_message(exc)})
+                    continue
+                if row.email.lower() in seen:
+                    job.add_error({"row": number, "email": row.email, "error": "Duplicate email in file"})
+                    continue
+                seen.add(row.email.lower())
+                valid.append((number, row))
+
+            db = ReadSessionLocal()
+            try:
+                existing = set(db.scalars(
+                    select(User.email).where(User.email.in_([row.email for _, row in valid]))
+                )) if valid else set()
+            finally:
+                db.close()
+            for number, row in valid:
+                if row.email in existing:
+                    job.add_error({"row": number, "email": row.email, "error": "Email already registered"})
+            valid = [(number, row) for number, row in valid if row.email not in existing]
+
+            tokens = {row.email: secrets.token_urlsafe(16) for _, row in valid if row.password is None}
+            hashes = hasher.hash_all([row.password or tokens[row.email] for _, row in valid])
+            rows = [
+                {"email": row.email, "full_name": row.full_name, "hashed_password": hashed}
+                for (_, row), hashed in zip(valid, hashes)
+            ]
+
+            ids = writer.run_sync(lambda session, rows=rows: _insert_chunk(session, tenant_id, rows)) \
+                if rows else {}
+            for number, row in valid:
+                if row.email not in ids:
+                    job.add_error({"row": number, "email": row.email, "error": "Email already registered"})
+                elif row.email in tokens:
+                    invites.append({"email": row.email, "invite_token": tokens[row.email]})
+
+            processed += len(chunk)
+            created += len(ids)
+            failed = processed - created
+            job.update(processed=processed, created=created, failed=failed)
+            if on_chunk is not None:
+                on_chunk(job)
+
+    job.private["invites"] = invites
+    return {"tenant_id": tenant_id, "processed": processed, "created": created,
+            "failed": failed, "invites": len(invites)}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Provision users in bulk from CSV or NDJSON")
+    parser.add_argument("file")
+    parser.add_argument("--tenant", type=int, required=True)
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--invites", help="Write invite tokens to this CSV file")
+    args = parser.parse_args()
+
+    from app.db.writer import writer
+
+    with open(args.file, encoding="utf-8-sig") as f:
+        text = f.read()
+    job = Job("user_provisioning", tenant_id=args.tenant)
+    try:
+        result = provision_users(
+            text, args.format or detect_format(None, args.file), args.tenant, job,
+            on_chunk=lambda job: print(f"processed {job.progress['processed']}, "
+                                       f"created {job.progress['created']}, failed {job.progress['failed']}"),
+        )
+    finally:
+        writer.stop()
+    for error in job.errors:
+        print(f"row {error['row']}: {error.get('email') or ''} {error['error']}")
+    if args.invites and job.private["invites"]:
+        with open(args.invites, "w", newline="") as f:
+            out = csv.DictWriter(f, fieldnames=["email", "invite_token"])
+            out.writeheader()
+            out.writerows(job.private["invites"])
+        print(f"{len(job.private['invites'])} invite tokens written to {args.invites}")
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,54 @@
+import os
+from contextlib import contextmanager
+from itertools import chain
+from typing import Optional
+from urllib.parse import quote
+
+from fastapi import Request
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 from app.core.config import settings
 
-# Create SQLite engine (SAFE CONFIG)
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={
-        "check_same_thread": False,
-        "timeout": 30,              # sqlite busy timeout (seconds)
-        "isolation_level": None     # autocommit mode (important)
-    },
-    poolclass=NullPool,             # 🔴 IMPORTANT for SQLite
-    pool_pre_ping=True,
-    echo=settings.DEBUG,
-)
-
-# Enable WAL + busy timeout
-@event.listens_for(engine, "connect")
+# Enable WAL + busy timeout. Checkpoints are run by the maintenance
+# scheduler (app/db/maintenance.py); the autocheckpoint is only a safety
+# net. auto_vacuum only takes effect on a new file. foreign_keys makes
+# SQLite apply the models' ON DELETE actions (see app/db/foreign_keys.py).
 def set_sqlite_pragma(dbapi_conn, connection_record):
     cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
     cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute("PRAGMA synchronous=NORMAL")
     cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.execute(f"PRAGMA wal_autocheckpoint={settings.WAL_AUTOCHECKPOINT_PAGES}")
     cursor.close()
 
+
+def create_sqlite_engine(url: str) -> Engine:
+    """
+    Read-write engine (SAFE CONFIG); also used for tenant shards
+    """
+    sqlite_engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": 30,              # sqlite busy timeout (seconds)
+            "isolation_level": None     # autocommit mode (important)
+        },
+        poolclass=NullPool,             # 🔴 IMPORTANT for SQLite
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+    )
+    event.listen(sqlite_engine, "connect", set_sqlite_pragma)
+    return sqlite_engine
+
+
+# Create SQLite engine
+engine = create_sqlite_engine(settings.DATABASE_URL)
+
 # Session factory
 SessionLocal = sessionmaker(
     bind=engine,
@@ -34,13 +57,148 @@ SessionLocal = sessionmaker(
     expire_on_commit=False,  # 🔴 prevents implicit re-queries
 )
 
+# Writes run in one real transaction: in pysqlite autocommit mode (above)
+# every statement of a flush would otherwise commit on its own. IMMEDIATE
+# takes the write lock up front (waiting up to busy_timeout) instead of
+# failing on a read-to-write upgrade; session.commit()/rollback() end it.
+# A sharded session flushes to the catalog and a shard, so every bind the
+# flush touches gets its own transaction.
+@event.listens_for(SessionLocal, "before_flush")
+def begin_write_transaction(session, flush_context, instances):
+    classes = {type(obj) for obj in chain(session.new, session.dirty, session.deleted)}
+    binds = {session.get_bind()} | {session.get_bind(mapper=cls) for cls in classes}
+    for bind in binds:
+        dbapi_conn = session.connection(bind_arguments={"bind": bind}).connection.dbapi_connection
+        if not dbapi_conn.in_transaction:
+            dbapi_conn.execute("BEGIN IMMEDIATE")
+
+
+# ==================== Read-only Engine ====================
+# GET/HEAD requests read through separate read-only connections
+# (mode=ro, query_only): they never take the write lock, and they get a
+# larger page cache and mmap. WAL lets them run alongside the writer.
+# Connections are pooled since nothing on them holds a lock between requests.
+
+def _read_only_url(url: str) -> Optional[str]:
+    """
+    ``mode=ro`` URI for a file-backed SQLite URL, None for anything else
+    """
+    parsed = make_url(url)
+    database = parsed.database
+    if parsed.get_backend_name() != "sqlite" or not database or database == ":memory:" \
+            or database.startswith("file:"):
+        return None
+    return f"sqlite:///file:{quote(os.path.abspath(database))}?mode=ro&uri=true"
+
+
+def set_read_pragmas(dbapi_conn, connection_record):
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.execute(f"PRAGMA cache_size=-{settings.READ_CACHE_MB * 1024}")
+    cursor.execute(f"PRAGMA mmap_size={settings.READ_MMAP_MB * 1024 * 1024}")
+    cursor.close()
+
+
+def create_read_engine(url: str, pool_size: int = settings.READ_POOL_SIZE) -> Optional[Engine]:
+    """
+    Pooled read-only engine for ``url``, None when disabled or not a SQLite file
+    """
+    read_url = _read_only_url(url) if settings.READ_ENGINE_ENABLED else None
+    if read_url is None:
+        return None
+    ro_engine = create_engine(
+        read_url,
+        connect_args={"check_same_thread": False, "timeout": 30, "isolation_level": None},
+        pool_size=pool_size,
+        max_overflow=settings.READ_POOL_SIZE,
+        echo=settings.DEBUG,
+    )
+    event.listen(ro_engine, "connect", set_read_pragmas)
+    return ro_engine
+
+
+read_engine = create_read_engine(settings.DATABASE_URL) or engine
+
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base model
 Base = declarative_base()
 
+READ_METHODS = {"GET", "HEAD"}
+
+def _shard_of(request: Optional[Request]) -> Optional[int]:
+    """
+    Tenant shard for the request in sharding mode (from the JWT tenant_id claim)
+    """
+    if not settings.SHARDING_ENABLED or request is None:
+        return None
+    from app.db.sharding import tenant_claim
+    return tenant_claim(request)
+
+
+def _session(read: bool, tenant_id: Optional[int]):
+    if tenant_id is not None:
+        from app.db.sharding import shards
+        return shards.session(tenant_id, read=read)
+    return (ReadSessionLocal if read else SessionLocal)()
+
+
 # Dependency
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request = None):
+    """
+    Session for the request: read-only for GET/HEAD, primary otherwise;
+    in sharding mode user data is routed to the caller's tenant shard
+    """
+    read = request is not None and request.method in READ_METHODS
+    db = _session(read, _shard_of(request))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_write_db(request: Request = None):
+    """
+    Primary session regardless of the request method
+    """
+    db = _session(False, _shard_of(request))
     try:
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def read_snapshot(tenant_id: Optional[int] = None):
+    """
+    Read-only session whose queries all see one consistent snapshot
+    (of the tenant's shard in sharding mode)
+    """
+    db = _session(True, tenant_id)
+    try:
+        db.connection().connection.dbapi_connection.execute("BEGIN")
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def get_snapshot_db(request: Request = None):
+    """
+    Dependency for multi-query endpoints (stats, sync) that must not see
+    commits landing between their queries
+    """
+    with read_snapshot(_shard_of(request)) as db:
+        yield db
+
+
+# Flush listeners on SessionLocal (change log, tenant usage and quotas).
+# Registered with the session factory itself so every entry point that
+# writes through it (app, jobs, CLIs) is counted and quota-checked.
+from app.db import change_tracking, usage  # noqa: E402,F401
@@ -0,0 +1,304 @@
+# ==================== Tenant Sharding ====================
+# File: app/db/sharding.py
+
+"""
+Optional tenant-per-database mode (SHARDING_ENABLED).
+
+The main database (DATABASE_URL) becomes the catalog: tenants, tenant
+configs and usage, users with their account tables, and the audit log. What users
+create (workouts, templates, goals, measurements, records and the change
+log) lives in one SQLite file per tenant under SHARD_DIR, so a busy tenant
+only contends for its own write lock and each file is backed up on its own.
+
+Request sessions are routed by the ``tenant_id`` claim of the bearer token
+(see ``get_db``). They are bound to the tenant's shard with the catalog
+models bound to the catalog, so handlers keep using a single ``db``; a
+query cannot join a catalog table to a shard table, though, and a flush
+touching both commits each database separately. Public templates are only
+visible inside their own tenant.
+
+Shards are opened on first use and kept in an LRU of SHARD_MAX_OPEN.
+Setting up a shard's file (tables, foreign keys, indexes) holds only that
+tenant's lock, so other tenants never wait for it. Evicting one disposes
+its idle pooled connections; sessions in flight finish on theirs, and its
+writer thread exits once idle. Admin queries across tenants go through
+``shards.fan_out``, which runs in parallel without evicting the shards
+serving traffic.
+
+Moving an existing single-file database into shards:
+    python -m app.db.sharding split
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from fastapi import Request
+from sqlalchemy import Table
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.security import decode_access_token
+from app.db.base import Base
+from app.db.foreign_keys import create_tables as create_foreign_key_tables, upgrade as upgrade_foreign_keys
+from app.db.indexes import sync_indexes
+from app.db.session import (
+    ReadSessionLocal, SessionLocal, create_read_engine, create_sqlite_engine, engine, read_engine
+)
+from app.db.writer import SQLiteWriter
+from app.models import (
+    AuditLog, NotificationPreference, Tenant, TenantConfigs, TenantUsage, User, UserConsent, UserProfile
+)
+
+CATALOG_MODELS = (
+    Tenant, TenantConfigs, TenantUsage, User, UserProfile, UserConsent, NotificationPreference, AuditLog
+)
+CATALOG_TABLES = {model.__table__.name for model in CATALOG_MODELS}
+SHARD_TABLES: List[Table] = [t for t in Base.metadata.sorted_tables if t.name not in CATALOG_TABLES]
+
+CATALOG_BINDS = {model: engine for model in CATALOG_MODELS}
+CATALOG_READ_BINDS = {model: read_engine for model in CATALOG_MODELS}
+
+
+def tenant_claim(request: Request) -> Optional[int]:
+    """
+    tenant_id claim of a valid bearer token, None otherwise
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_access_token(token)
+    tenant_id = payload.get("tenant_id") if payload else None
+    return int(tenant_id) if tenant_id is not None else None
+
+
+class Shard:
+    """
+    Engines, session factory and writer for one tenant's database file
+    """
+    def __init__(self, tenant_id: int, path: str, create_tables: bool = True):
+        self.tenant_id = tenant_id
+        self.path = path
+        url = f"sqlite:///{path}"
+        self.engine = create_sqlite_engine(url)
+        self.foreign_keys = None
+        if create_tables:
+            create_foreign_key_tables(self.engine, SHARD_TABLES, skip=CATALOG_TABLES)
+            self.foreign_keys = upgrade_foreign_keys(self.engine, SHARD_TABLES, skip=CATALOG_TABLES)
+            sync_indexes(self.engine, SHARD_TABLES)
+        self.read_engine = create_read_engine(url, pool_size=2) or self.engine
+        self.writer = SQLiteWriter(
+            bind=self.engine, binds=CATALOG_BINDS, idle_timeout=settings.SHARD_WRITER_IDLE_SECONDS
+        )
+
+    def session(self, read: bool = False) -> Session:
+        if read:
+            return ReadSessionLocal(bind=self.read_engine, binds=CATALOG_READ_BINDS)
+        return SessionLocal(bind=self.engine, binds=CATALOG_BINDS)
+
+    def dispose(self):
+        self.engine.dispose()
+        if self.read_engine is not self.engine:
+            self.read_engine.dispose()
+
+
+class ShardManager:
+    """
+    LRU of open tenant shards
+    """
+    def __init__(self, directory: str, max_open: int):
+        self.directory = directory
+        self.max_open = max_open
+        self._shards: "OrderedDict[int, Shard]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._opening: Dict[int, threading.Lock] = {}  # per tenant, held while its shard is set up
+        self._created = set()  # shards whose tables exist, so reopening skips create_all
+        self.opened = 0
+        self.evicted = 0
+
+    def path(self, tenant_id: int) -> str:
+        return os.path.join(self.directory, f"tenant_{int(tenant_id)}.db")
+
+    def _open(self, tenant_id: int) -> Optional[Shard]:
+        with self._lock:
+            shard = self._shards.get(tenant_id)
+            if shard is not None:
+                self._shards.move_to_end(tenant_id)
+            return shard
+
+    def get(self, tenant_id: int) -> Shard:
+        shard = self._open(tenant_id)
+        if shard is not None:
+            return shard
+        with self._lock:
+            opening = self._opening.setdefault(tenant_id, threading.Lock())
+        # Creating or upgrading the file can take a while: only this tenant waits
+        with opening:
+            shard = self._open(tenant_id)
+            if shard is not None:
+                return shard
+            os.makedirs(self.directory, exist_ok=True)
+            shard = Shard(tenant_id, self.path(tenant_id), create_tables=tenant_id not in self._created)
+            evicted = []
+            with self._lock:
+                self._shards[tenant_id] = shard
+                self._created.add(tenant_id)
+                self.opened += 1
+                while len(self._shards) > self.max_open:
+                    evicted.append(self._shards.popitem(last=False)[1])
+                self.evicted += len(evicted)
+        for old in evicted:
+            old.dispose()
+        return shard
+
+    def session(self, tenant_id: int, read: bool = False) -> Session:
+        return self.get(tenant_id).session(read)
+
+    def tenant_ids(self) -> List[int]:
+        db = ReadSessionLocal()
+        try:
+            return [tenant_id for (tenant_id,) in db.query(Tenant.id).order_by(Tenant.id)]
+        finally:
+            db.close()
+
+    @contextmanager
+    def _snapshot(self, tenant_id: int) -> Iterator[Optional[Session]]:
+        """
+        Snapshot read of a shard; shards that are not open get a throwaway
+        engine so a fan-out does not evict the ones serving traffic
+        """
+        with self._lock:
+            shard = self._shards.get(tenant_id)
+        transient = None
+        if shard is not None:
+            db = shard.session(read=True)
+        elif os.path.exists(self.path(tenant_id)):
+            url = f"sqlite:///{self.path(tenant_id)}"
+            transient = create_read_engine(url, pool_size=1) or create_sqlite_engine(url)
+            db = ReadSessionLocal(bind=transient, binds=CATALOG_READ_BINDS)
+        else:
+            yield None
+            return
+        try:
+            db.connection().connection.dbapi_connection.execute("BEGIN")
+            yield db
+        finally:
+            db.rollback()
+            db.close()
+            if transient is not None:
+                transient.dispose()
+
+    def fan_out(
+        self, fn: Callable[[Session], Any], tenant_ids: Optional[Iterable[int]] = None
+    ) -> Dict[int, Any]:
+        """
+        Run ``fn(session)`` against every tenant shard in parallel;
+        tenants without a shard file map to None
+        """
+        tenant_ids = self.tenant_ids() if tenant_ids is None else list(tenant_ids)
+
+        def run(tenant_id: int):
+            with self._snapshot(tenant_id) as db:
+                return None if db is None else fn(db)
+
+        if not tenant_ids:
+            return {}
+        workers = min(settings.SHARD_FANOUT_WORKERS, len(tenant_ids))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shard-fanout") as pool:
+            return dict(zip(tenant_ids, pool.map(run, tenant_ids)))
+
+    def close(self):
+        """
+        Commit queued writes and release every open shard
+        """
+        with self._lock:
+            open_shards = list(self._shards.values())
+            self._shards.clear()
+        for shard in open_shards:
+            shard.writer.stop()
+            shard.dispose()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            open_shards = list(self._shards.values())
+        return {
+            "enabled": settings.SHARDING_ENABLED,
+            "directory": self.directory,
+            "open": len(open_shards),
+            "max_open": self.max_open,
+            "opened": self.opened,
+            "evicted": self.evicted,
+            "writers": {shard.tenant_id: shard.writer.snapshot() for shard in open_shards},
+        }
+
+
+shards = ShardManager(settings.SHARD_DIR, settings.SHARD_MAX_OPEN)
+metrics.register("shards", shards.stats)
+
+
+# ==================== Splitting an existing database ====================
+
+def _owner_filter(table: Table) -> str:
+    """
+    SQL condition selecting the rows of ``table`` owned by users of :tenant
+    """
+    if "user_id" in table.c:
+        return "user_id IN (SELECT id FROM catalog.users WHERE tenant_id = :tenant)"
+    for fk in table.foreign_keys:
+        parent = fk.column.table
+        if parent.name not in CATALOG_TABLES and parent is not table:
+            return (
+                f"{fk.parent.name} IN (SELECT {fk.column.name} FROM catalog.{parent.name} "
+                f"WHERE {_owner_filter(parent)})"
+            )
+    raise ValueError(f"Cannot tell which tenant owns rows of {table.name}")
+
+
+def split(manager: ShardManager = shards) -> Dict[int, Dict[str, int]]:
+    """
+    Copy every tenant's user data from the main database into its shard.
+    Rows already in a shard are kept; the main database is left untouched.
+    """
+    catalog_path = os.path.abspath(make_url(settings.DATABASE_URL).database)
+    copied: Dict[int, Dict[str, int]] = {}
+    for tenant_id in manager.tenant_ids():
+        shard = manager.get(tenant_id)
+        conn = sqlite3.connect(shard.path, isolation_level=None)
+        try:
+            conn.execute("ATTACH DATABASE ? AS catalog", (catalog_path,))
+            conn.execute("BEGIN IMMEDIATE")
+            counts = {}
+            for table in SHARD_TABLES:
+                columns = ", ".join(column.name for column in table.columns)
+                cursor = conn.execute(
+                    f"INSERT OR IGNORE INTO main.{table.name} ({columns}) "
+                    f"SELECT {columns} FROM catalog.{table.name} WHERE {_owner_filter(table)}",
+                    {"tenant": tenant_id},
+                )
+                counts[table.name] = cursor.rowcount
+            conn.execute("COMMIT")
+            copied[tenant_id] = counts
+        finally:
+            conn.close()
+    return copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tenant shard maintenance")
+    parser.add_argument("command", choices=["split"])
+    parser.parse_args()
+
+    for tenant_id, counts in split().items():
+        total = sum(counts.values())
+        print(f"tenant {tenant_id}: {total} rows -> {shards.path(tenant_id)}")
+
+
+if __name__ == "__main__":
+    main()
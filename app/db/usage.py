@@ -0,0 +1,358 @@
+# ==================== Tenant Usage & Quotas ====================
+# File: app/db/usage.py
+
+"""
+Per-tenant usage counters and quota enforcement.
+
+tenant_usage holds, for each tenant, its number of users, the bytes of
+its workout media and the workouts created in the current (UTC) month.
+Listeners on ``SessionLocal`` (registered by app.db.session, so CLIs and
+jobs are counted too) adjust the counters in the same flush, and
+so the same transaction, as the write that changes them; reading a
+tenant's usage is a primary-key lookup instead of a COUNT/SUM over the
+base tables.
+
+Limits come from the tenant's ``user_policies`` (via the tenant config
+cache): max_users, max_storage_mb and max_workouts_per_month. A flush that
+would take a counter past its limit raises QuotaExceeded (403) before
+anything is written. The check runs after ``begin_write_transaction`` has
+taken the write lock, so concurrent requests cannot overshoot together.
+
+As with the change log, only Session flushes are counted; bulk Core
+statements call ``check_usage``/``add_usage`` themselves (see
+app/db/provisioning.py). Writes from outside the app leave them off until
+the reconciler recomputes them from the base tables: every
+USAGE_RECONCILE_MINUTES from the maintenance scheduler (and once at
+startup), or with ``python -m app.db.usage reconcile``. In sharding mode
+the counters live in the catalog, so workout and media changes update
+them in a separate commit from the shard write.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import event, func, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.tenant_config import tenant_configs
+from app.db.session import ReadSessionLocal, SessionLocal
+from app.models import Tenant, TenantUsage, User, Workout, WorkoutMedia
+
+logger = logging.getLogger(__name__)
+
+PENDING_USAGE = "tenant_usage_pending"
+
+# Users never change tenant, so the owner lookup for workouts and media is cached
+USER_TENANTS: Dict[int, int] = {}
+USER_TENANTS_MAX = 100_000
+
+COUNTERS = ("users", "storage_bytes", "workouts_this_month")
+
+# counter -> (user_policies key, units per policy unit)
+QUOTAS = {
+    "users": ("max_users", 1),
+    "storage_bytes": ("max_storage_mb", 1024 * 1024),
+    "workouts_this_month": ("max_workouts_per_month", 1),
+}
+
+
+class QuotaExceeded(HTTPException):
+    def __init__(self, policy: str, limit: Any):
+        super().__init__(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Tenant quota exceeded: {policy} is {limit}"
+        )
+
+
+# Add deltas to a tenant's counters, restarting the workout count in a new
+# month (SET expressions see the row as it was before the update)
+RECORD_USAGE = text("""
+    INSERT INTO tenant_usage (tenant_id, users, storage_bytes, month, workouts_this_month, updated_at)
+    VALUES (:tenant_id, max(:users, 0), max(:storage_bytes, 0), :month, max(:workouts_this_month, 0),
+            CURRENT_TIMESTAMP)
+    ON CONFLICT (tenant_id) DO UPDATE SET
+        users = users + :users,
+        storage_bytes = storage_bytes + :storage_bytes,
+        workouts_this_month = CASE WHEN month = :month THEN workouts_this_month + :workouts_this_month
+                                   ELSE max(:workouts_this_month, 0) END,
+        month = :month,
+        updated_at = CURRENT_TIMESTAMP
+""")
+
+
+def current_month() -> str:
+    return datetime.utcnow().strftime("%Y-%m")
+
+
+def _catalog(session: Session):
+    """
+    Connection holding tenant_usage (the catalog in sharding mode)
+    """
+    return session.connection(bind_arguments={"mapper": TenantUsage.__mapper__})
+
+
+# ==================== Counting writes ====================
+
+def _deltas(session: Session) -> Dict[int, Dict[str, int]]:
+    """
+    Counter changes per tenant for the objects about to be flushed
+    """
+    month = current_month()
+
+    def tenant_of(user_id: Optional[int]) -> Optional[int]:
+        tenant_id = USER_TENANTS.get(user_id)
+        if tenant_id is None and user_id is not None:
+            tenant_id = session.execute(select(User.tenant_id).where(User.id == user_id)).scalar()
+            if tenant_id is not None:
+                if len(USER_TENANTS) >= USER_TENANTS_MAX:
+                    USER_TENANTS.clear()
+                USER_TENANTS[user_id] = tenant_id
+        return tenant_id
+
+    def workout_owner(media: WorkoutMedia) -> Optional[int]:
+        if media.workout is not None:
+            return media.workout.user_id
+        return session.execute(select(Workout.user_id).where(Workout.id == media.workout_id)).scalar()
+
+    deltas: Dict[int, Dict[str, int]] = {}
+
+    def add(tenant_id: Optional[int], counter: str, amount: int):
+        if tenant_id is not None and amount:
+            changes = deltas.setdefault(tenant_id, dict.fromkeys(COUNTERS, 0))
+            changes[counter] += amount
+
+    # Media the ORM deletes itself; the rest goes with its workout through ON DELETE CASCADE
+    deleted_media = [obj.id for obj in session.deleted if isinstance(obj, WorkoutMedia)]
+
+    for sign, objects in ((1, session.new), (-1, session.deleted)):
+        for obj in objects:
+            if isinstance(obj, User):
+                add(obj.tenant_id, "users", sign)
+            elif isinstance(obj, Workout):
+                # Deleting last month's workout does not free this month's quota
+                if sign > 0 or (obj.created_at is not None and obj.created_at.strftime("%Y-%m") == month):
+                    add(tenant_of(obj.user_id), "workouts_this_month", sign)
+                if sign < 0:
+                    cascaded = session.execute(
+                        select(func.coalesce(func.sum(WorkoutMedia.file_size_bytes), 0))
+                        .where(WorkoutMedia.workout_id == obj.id, WorkoutMedia.id.not_in(deleted_media))
+                    ).scalar()
+                    add(tenant_of(obj.user_id), "storage_bytes", -cascaded)
+            elif isinstance(obj, WorkoutMedia) and obj.file_size_bytes:
+                add(tenant_of(workout_owner(obj)), "storage_bytes", sign * obj.file_size_bytes)
+    return deltas
+
+
+def _enforce(session: Session, tenant_id: int, changes: Dict[str, int]):
+    limits = {}
+    for counter, amount in changes.items():
+        if amount > 0:
+            policy, unit = QUOTAS[counter]
+            limit = tenant_configs.policy(tenant_id, policy)
+            if limit is not None:
+                limits[counter] = (policy, limit, limit * unit)
+    if not limits:
+        return
+
+    row = _catalog(session).execute(
+        select(TenantUsage).where(TenantUsage.tenant_id == tenant_id)
+    ).mappings().first()
+    for counter, (policy, limit, allowed) in limits.items():
+        used = 0
+        if row is not None and (counter != "workouts_this_month" or row["month"] == current_month()):
+            used = row[counter]
+        if used + changes[counter] > allowed:
+            raise QuotaExceeded(policy, limit)
+
+
+def check_usage(session: Session, tenant_id: int, **changes: int):
+    """
+    Raise QuotaExceeded if ``changes`` would take a counter past its limit;
+    for writes that bypass the flush listeners (bulk Core inserts)
+    """
+    _enforce(session, tenant_id, {**dict.fromkeys(COUNTERS, 0), **changes})
+
+
+def add_usage(session: Session, tenant_id: int, **changes: int):
+    """
+    Record counter changes made by writes that bypass the flush listeners
+    """
+    _catalog(session).execute(RECORD_USAGE, {
+        **dict.fromkeys(COUNTERS, 0), **changes, "tenant_id": tenant_id, "month": current_month()
+    })
+
+
+@event.listens_for(SessionLocal, "before_flush")
+def check_quotas(session, flush_context, instances):
+    deltas = _deltas(session)
+    for tenant_id, changes in deltas.items():
+        _enforce(session, tenant_id, changes)
+    session.info[PENDING_USAGE] = deltas
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def record_usage(session, flush_context):
+    deltas = session.info.pop(PENDING_USAGE, None)
+    if not deltas:
+        return
+    month = current_month()
+    _catalog(session).execute(RECORD_USAGE, [
+        {"tenant_id": tenant_id, "month": month, **changes} for tenant_id, changes in deltas.items()
+    ])
+
+
+# ==================== Reading ====================
+
+def get_usage(db: Session, tenant_id: int) -> Dict[str, Any]:
+    """
+    Counters of ``tenant_id`` with the limits that apply to them
+    """
+    row = db.get(TenantUsage, tenant_id)
+    month = current_month()
+    usage = {
+        "tenant_id": tenant_id,
+        "users": row.users if row else 0,
+        "storage_bytes": row.storage_bytes if row else 0,
+        "month": month,
+        "workouts_this_month": row.workouts_this_month if row and row.month == month else 0,
+        "reconciled_at": row.reconciled_at if row else None,
+    }
+    usage["limits"] = {
+        policy: tenant_configs.policy(tenant_id, policy) for policy, _ in QUOTAS.values()
+    }
+    return usage
+
+
+# ==================== Reconciling ====================
+
+class ReconcileStats:
+    def __init__(self):
+        self.runs = 0
+        self.tenants = 0
+        self.drifted = 0
+        self.last_run: Optional[float] = None
+        self.last_duration_ms = 0.0
+
+
+stats = ReconcileStats()
+
+
+def exact_usage(session: Session, tenant_id: int) -> Dict[str, int]:
+    """
+    Counters recomputed from the base tables
+    """
+    workouts = select(Workout.id)
+    if not settings.SHARDING_ENABLED:  # a shard only holds its own tenant's rows
+        workouts = workouts.where(
+            Workout.user_id.in_(select(User.id).where(User.tenant_id == tenant_id))
+        )
+    return {
+        "users": session.scalar(select(func.count(User.id)).where(User.tenant_id == tenant_id)),
+        "storage_bytes": session.scalar(
+            select(func.coalesce(func.sum(WorkoutMedia.file_size_bytes), 0))
+            .where(WorkoutMedia.workout_id.in_(workouts))
+        ),
+        "workouts_this_month": session.scalar(
+            select(func.count()).select_from(Workout)
+            .where(Workout.id.in_(workouts), func.strftime("%Y-%m", Workout.created_at) == current_month())
+        ),
+    }
+
+
+def reconcile_tenant(session: Session, tenant_id: int) -> Dict[str, int]:
+    """
+    Overwrite the tenant's counters with exact totals; returns the drift
+    (exact minus counted) of each counter
+    """
+    exact = exact_usage(session, tenant_id)
+    connection = _catalog(session)
+    row = connection.execute(
+        select(TenantUsage).where(TenantUsage.tenant_id == tenant_id)
+    ).mappings().first()
+    month = current_month()
+    counted = {
+        counter: (row[counter] if row and (counter != "workouts_this_month" or row["month"] == month) else 0)
+        for counter in COUNTERS
+    }
+    values = {**exact, "month": month, "reconciled_at": func.now(), "updated_at": func.now()}
+    connection.execute(
+        sqlite_insert(TenantUsage).values(tenant_id=tenant_id, **values)
+        .on_conflict_do_update(index_elements=[TenantUsage.tenant_id], set_=values)
+    )
+    return {counter: exact[counter] - counted[counter] for counter in COUNTERS}
+
+
+def reconcile(tenant_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, int]]:
+    """
+    Recompute every tenant's counters, each in a write transaction of
+    its writer so no concurrent write is missed or counted twice
+    """
+    from app.db.writer import writer_for
+
+    if tenant_ids is None:
+        db = ReadSessionLocal()
+        try:
+            tenant_ids = [tenant_id for (tenant_id,) in db.query(Tenant.id).order_by(Tenant.id)]
+        finally:
+            db.close()
+
+    started = time.perf_counter()
+    drift = {}
+    for tenant_id in tenant_ids:
+        changes = writer_for(tenant_id).run_sync(
+            lambda session, tenant_id=tenant_id: reconcile_tenant(session, tenant_id)
+        )
+        if any(changes.values()):
+            drift[tenant_id] = changes
+            logger.warning(f"Usage counters of tenant {tenant_id} drifted: {changes}")
+        stats.tenants += 1
+    stats.runs += 1
+    stats.drifted += len(drift)
+    stats.last_run = time.time()
+    stats.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    return drift
+
+
+def snapshot() -> Dict[str, Any]:
+    return {
+        "reconcile_runs": stats.runs,
+        "tenants_reconciled": stats.tenants,
+        "tenants_drifted": stats.drifted,
+        "last_reconcile": stats.last_run,
+        "last_reconcile_ms": stats.last_duration_ms,
+    }
+
+
+metrics.register("usage", snapshot)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tenant usage counters")
+    parser.add_argument("command", choices=["reconcile"])
+    parser.add_argument("--tenant", type=int, action="append", help="Only these tenants")
+    args = parser.parse_args()
+
+    from app.db.writer import writer
+
+    try:
+        drift = reconcile(args.tenant)
+    finally:
+        writer.stop()
+        if settings.SHARDING_ENABLED:
+            from app.db.sharding import shards
+            shards.close()
+    for tenant_id, changes in drift.items():
+        print(f"tenant {tenant_id}: fixed drift {changes}")
+    print(f"{stats.tenants} tenants reconciled, {len(drift)} drifted")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+# ==================== SQLite Write Queue ====================
+# File: app/db/writer.py
+
+"""
+Single-writer path for SQLite with group commit.
+
+SQLite admits one writer at a time, so handlers that commit on their own
+connections queue on the database lock (through busy_timeout) and each
+pays for its own transaction. Here one thread owns one connection and
+runs every submitted unit of work:
+
+    workout = await writer.add(Workout(**data))
+    result = await writer.run(lambda session: ...)
+    result = writer.run_sync(lambda session: ...)   # from a thread
+
+Units that arrive while a transaction is being committed are run together
+in the next one, each inside its own SAVEPOINT: a failing unit is rolled
+back and gets its exception, the others still commit. Under load the
+writer also waits up to WRITE_GROUP_COMMIT_MS for more units before
+committing.
+
+The connection's own busy_timeout is 0; a lock held by another process
+is retried here and counted in the "writer" metrics (busy retries and
+wait time) instead of disappearing into request latency.
+
+Returned ORM objects are detached: load what the response needs inside
+the unit.
+"""
+
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.session import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteUnit:
+    __slots__ = ("fn", "future")
+
+    def __init__(self, fn: Callable[[Session], Any]):
+        self.fn = fn
+        self.future: Future = Future()
+
+
+class WriterStats:
+    def __init__(self):
+        self.batches = 0
+        self.units = 0
+        self.failed_units = 0
+        self.failed_batches = 0
+        self.max_batch = 0
+        self.commit_ms = 0.0
+        self.busy_retries = 0
+        self.busy_wait_ms = 0.0
+        self.busy_failures = 0
+
+
+class SQLiteWriter:
+    """
+    Dedicated writer thread running queued units of work in grouped transactions
+    """
+    def __init__(
+        self,
+        bind: Optional[Engine] = None,
+        binds: Optional[Dict[type, Engine]] = None,
+        idle_timeout: Optional[float] = None,
+        window: float = settings.WRITE_GROUP_COMMIT_MS / 1000,
+        max_batch: int = settings.WRITE_BATCH_MAX,
+        busy_timeout: float = settings.WRITE_BUSY_TIMEOUT,
+    ):
+        self.bind = bind or engine
+        self.binds = binds
+        # Let the thread (and its connection) go after this many idle seconds
+        self.idle_timeout = idle_timeout
+        self.window = window
+        self.max_batch = max_batch
+        self.busy_timeout = busy_timeout
+        self.stats = WriterStats()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    # ----- submitting -----
+
+    def submit(self, fn: Callable[[Session], Any]) -> Future:
+        unit = WriteUnit(fn)
+        # Started lazily so pre-forked workers each get their own thread;
+        # the lock pairs with the idle exit in _loop so no unit is stranded
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="sqlite-writer", daemon=True)
+                self._thread.start()
+            self._queue.put(unit)
+        return unit.future
+
+    async def run(self, fn: Callable[[Session], Any]) -> Any:
+        """
+        Run ``fn(session)`` in the next write transaction and return its result
+        """
+        if not settings.WRITE_QUEUE_ENABLED:
+            return await run_in_threadpool(self._run_direct, fn)
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def run_sync(self, fn: Callable[[Session], Any]) -> Any:
+        """
+        ``run`` for code already off the event loop (jobs, CLIs); blocks until committed
+        """
+        if not settings.WRITE_QUEUE_ENABLED:
+            return self._run_direct(fn)
+        return self.submit(fn).result()
+
+    def _run_direct(self, fn: Callable[[Session], Any]) -> Any:
+        """
+        Fallback with the queue disabled: one session and transaction per unit
+        """
+        session = SessionLocal(bind=self.bind, binds=self.binds)
+        try:
+            result = fn(session)
+            session.commit()
+            session.expunge_all()
+            return result
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    async def add(self, obj: Any) -> Any:
+        """
+        Insert ``obj`` and return it with server defaults loaded
+        """
+        def unit(session: Session):
+            session.add(obj)
+            session.flush()
+            session.refresh(obj)
+            return obj
+        return await self.run(unit)
+
+    # ----- lifecycle -----
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Commit what is queued, then stop the thread
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+
+    # ----- writer thread -----
+
+    def _loop(self):
+        try:
+            connection = self.bind.connect()
+            connection.exec_driver_sql("PRAGMA busy_timeout=0")
+            connection.commit()  # end the autobegun transaction so the session owns its own
+        except Exception as exc:
+            logger.exception("Writer could not open its connection")
+            self._fail_pending(exc)
+            return
+        session = SessionLocal(bind=connection, binds=self.binds)
+        last_batch = 0
+        try:
+            while True:
+                try:
+                    first = self._queue.get(timeout=self.idle_timeout)
+                except queue.Empty:
+                    first = _STOP
+                if first is _STOP:
+                    if self._exit_if_idle():
+                        return
+                    continue
+                batch, stopping = self._collect(first, grouping=last_batch > 1)
+                self._commit(session, batch)
+                last_batch = len(batch)
+                if stopping and self._exit_if_idle():
+                    return
+        finally:
+            session.close()
+            connection.close()
+
+    def _exit_if_idle(self) -> bool:
+        """
+        Let the thread end (on stop or idle timeout) unless units raced in
+        """
+        with self._lock:
+            if self._queue.empty():
+                self._thread = None
+                return True
+        return False
+
+    def _fail_pending(self, exc: Exception):
+        with self._lock:
+            self._thread = None
+            while not self._queue.empty():
+                unit = self._queue.get_nowait()
+                if unit is not _STOP and unit.future.set_running_or_notify_cancel():
+                    unit.future.set_exception(exc)
+
+    def _collect(self, first: WriteUnit, grouping: bool):
+        """
+        Take whatever else is queued after ``first``; when the last batch was
+        shared (concurrent writers), wait up to the window for more
+        """
+        batch: List[WriteUnit] = [first]
+        deadline = time.monotonic() + self.window if grouping else 0.0
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                unit = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if unit is _STOP:
+                return batch, True
+            batch.append(unit)
+        return batch, False
+
+    def _begin(self, session: Session):
+        """
+        BEGIN IMMEDIATE, retrying while another connection holds the lock
+        """
+        dbapi_conn = session.connection().connection.dbapi_connection
+        started = time.monotonic()
+        delay = 0.001
+        while True:
+            try:
+                dbapi_conn.execute("BEGIN IMMEDIATE")
+                break
+            except sqlite3.OperationalError as exc:
+                if "locked" not in str(exc) and "busy" not in str(exc):
+                    raise
+                waited = time.monotonic() - started
+                if waited >= self.busy_timeout:
+                    self.stats.busy_failures += 1
+                    raise
+                self.stats.busy_retries += 1
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+        self.stats.busy_wait_ms += (time.monotonic() - started) * 1000
+
+    def _commit(self, session: Session, batch: List[WriteUnit]):
+        batch = [unit for unit in batch if unit.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        done = []
+        try:
+            self._begin(session)
+            for unit in batch:
+                try:
+                    with session.begin_nested():
+                        result = unit.fn(session)
+                except Exception as exc:
+                    self.stats.failed_units += 1
+                    unit.future.set_exception(exc)
+                else:
+                    done.append((unit, result))
+            session.commit()
+        except Exception as exc:
+            logger.exception("Write batch failed")
+            session.rollback()
+            self.stats.failed_batches += 1
+            for unit in batch:
+                if not unit.future.done():
+                    unit.future.set_exception(exc)
+            return
+        finally:
+            session.expunge_all()
+
+        stats = self.stats
+        stats.batches += 1
+        stats.units += len(batch)
+        stats.max_batch = max(stats.max_batch, len(batch))
+        stats.commit_ms += (time.perf_counter() - started) * 1000
+        for unit, result in done:
+            unit.future.set_result(result)
+
+    def snapshot(self):
+        stats = self.stats
+        return {
+            "enabled": settings.WRITE_QUEUE_ENABLED,
+            "running": self._thread is not None,
+            "queued": self._queue.qsize(),
+            "batches": stats.batches,
+            "units": stats.units,
+            "failed_units": stats.failed_units,
+            "failed_batches": stats.failed_batches,
+            "avg_batch": round(stats.units / stats.batches, 2) if stats.batches else 0,
+            "max_batch": stats.max_batch,
+            "avg_transaction_ms": round(stats.commit_ms / stats.batches, 3) if stats.batches else 0,
+            "busy_retries": stats.busy_retries,
+            "busy_wait_ms": round(stats.busy_wait_ms, 1),
+            "busy_failures": stats.busy_failures,
+        }
+
+
+writer = SQLiteWriter()
+metrics.register("writer", writer.snapshot)
+
+
+def writer_for(tenant_id: Optional[int]) -> SQLiteWriter:
+    """
+    The tenant shard's writer in sharding mode, the main writer otherwise
+    """
+    if settings.SHARDING_ENABLED and tenant_id is not None:
+        from app.db.sharding import shards
+        return shards.get(tenant_id).writer
+    return writer
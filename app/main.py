@@ -10,7 +10,16 @@ import time
 import logging
 
 from app.core.config import settings
-from app.api.v1.routes import admin, auth, users, workouts, goals, measurements, tenants
+from app.api.v1.routes import admin, auth, users, workouts, goals, measurements, tenants, system, sync
+from app.core.admission import AdmissionMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.openapi import install_openapi
+from app.db.base import Base
+from app.db.session import engine
+from app.db.foreign_keys import upgrade as upgrade_foreign_keys
+from app.db.writer import writer
+from app.db.maintenance import scheduler as maintenance
+from app.core.tenant_config import tenant_configs
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -21,9 +30,10 @@ app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="Cloud-native fitness tracking application with microservices architecture",
-    docs_url="/docs",
-    redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    # Served by install_openapi() from a precomputed document
+    docs_url=None,
+    redoc_url=None,
+    openapi_url=None
 )
 
 
@@ -63,6 +73,32 @@ async def log_requests(request: Request, call_next):
     return response
 
 
+# ==================== Profiling Middleware ====================
+# Registered only when enabled so normal traffic pays nothing for the hook.
+# Added after log_requests, so it wraps it and sees the full request.
+if settings.PROFILING_ENABLED:
+    from app.core.profiling import profile_request_middleware
+    app.middleware("http")(profile_request_middleware)
+
+
+# ==================== Admission Control ====================
+# Wraps logging and the routes, so shed requests cost almost nothing.
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
+
+# ==================== Compression Middleware ====================
+# Outermost, so it compresses everything the inner layers produce.
+# The tenant list is compressed once per content; /openapi.json arrives
+# precompressed.
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        static_paths=(f"{settings.API_V1_PREFIX}/tenants",),
+    )
+
+
 # ==================== Exception Handlers ====================
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -140,7 +176,7 @@ async def root():
         "data": {
             "app_name": settings.APP_NAME,
             "version": settings.APP_VERSION,
-            "docs_url": "/docs",
+            "docs_url": "/docs" if settings.DOCS_ENABLED else None,
             "health_url": "/health"
         },
         "message": "Welcome to Fitness Tracking API"
@@ -170,6 +206,15 @@ app.include_router(measurements.router, prefix=settings.API_V1_PREFIX)
 # Tenant routes (admin only)
 app.include_router(tenants.router, prefix=settings.API_V1_PREFIX)
 
+# System routes (admin only)
+app.include_router(system.router, prefix=settings.API_V1_PREFIX)
+
+# Sync routes
+app.include_router(sync.router, prefix=settings.API_V1_PREFIX)
+
+# OpenAPI schema and docs (after all routers, so the schema covers them)
+openapi_document = install_openapi(app)
+
 
 # ==================== Startup & Shutdown Events ====================
 @app.on_event("startup")
@@ -181,6 +226,24 @@ async def startup_event():
     logger.info(f"Environment: {settings.ENVIRONMENT}")
     logger.info(f"Debug mode: {settings.DEBUG}")
     
+    # Create tables added since the database was initialised (e.g. change_log)
+    Base.metadata.create_all(bind=engine)
+    # Rebuild tables created before their ON DELETE actions were declared
+    upgrade_foreign_keys(engine, Base.metadata.sorted_tables)
+    # Create indexes declared since the tables were created
+    from app.db.indexes import sync_indexes
+    sync_indexes(engine, Base.metadata.sorted_tables)
+    
+    # Build the OpenAPI document off the request path
+    openapi_document.build_in_background()
+    
+    # Load tenant configs and watch for changes made by other workers
+    tenant_configs.start()
+    
+    # WAL checkpoints, optimize/ANALYZE and incremental vacuum
+    if settings.MAINTENANCE_ENABLED:
+        maintenance.start()
+    
     # You can add database connection check here
     # You can add Redis connection check here
     # You can add other initialization logic here
@@ -192,5 +255,16 @@ async def shutdown_event():
     Execute on application shutdown
     """
     logger.info(f"Shutting down {settings.APP_NAME}")
+    # Let running jobs finish before the writer they feed stops; queued
+    # jobs are marked failed
+    from app.core.jobs import jobs
+    jobs.shutdown(timeout=settings.GRACEFUL_TIMEOUT)
+    # Commit writes still queued for the writer thread
+    writer.stop()
+    maintenance.stop()
+    tenant_configs.stop()
+    if settings.SHARDING_ENABLED:
+        from app.db.sharding import shards
+        shards.close()
     # Clean up resources here if needed
     
\ No newline at end of file
@@ -14,6 +14,7 @@ This ensures all models are imported in the correct order and available for:
 # ==================== Tenant Models ====================
 from app.models.auth.tenant import Tenant
 from app.models.auth.tenant_configs import TenantConfigs
+from app.models.auth.tenant_usage import TenantUsage
 
 # ==================== User Models ====================
 from app.models.auth.user import User
@@ -42,11 +43,15 @@ from app.models.goals.personal_record import PersonalRecord
 # ==================== Audit Models ====================
 from app.models.audit.audit_log import AuditLog
 
+# ==================== Sync Models ====================
+from app.models.sync.change_log import ChangeLog
+
 # ==================== Export All Models ====================
 __all__ = [
     # Tenant
     "Tenant",
     "TenantConfigs",
+    "TenantUsage",
     
     # User
     "User",
@@ -74,4 +79,7 @@ __all__ = [
     
     # Audit
     "AuditLog",
+    
+    # Sync
+    "ChangeLog",
 ]
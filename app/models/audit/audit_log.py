@@ -1,5 +1,5 @@
 from sqlalchemy import (
-    Column, Integer, String, ForeignKey, DateTime, JSON
+    Column, Integer, String, ForeignKey, DateTime, JSON, Index
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -9,8 +9,8 @@ class AuditLog(Base):
     __tablename__ = "audit_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), index=True)
-    action_type = Column(String, nullable=False, index=True)  # login, create, update, delete, export
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    action_type = Column(String, nullable=False)  # login, create, update, delete, export
     entity_type = Column(String)  # workout, goal, profile, etc.
     entity_id = Column(Integer)
     old_value = Column(JSON)
@@ -21,3 +21,11 @@ class AuditLog(Base):
 
     # Relationships
     user = relationship("User", back_populates="audit_logs")
+
+    # Filters of the audit query API, newest first by (created_at, id);
+    # id is the rowid, which SQLite appends to every index entry
+    __table_args__ = (
+        Index("ix_audit_logs_user_time", "user_id", "created_at"),
+        Index("ix_audit_logs_action_time", "action_type", "created_at"),
+        Index("ix_audit_logs_entity_time", "entity_type", "created_at"),
+    )
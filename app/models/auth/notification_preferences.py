@@ -9,7 +9,7 @@ class NotificationPreference(Base):
     __tablename__ = "notification_preferences"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
     email_enabled = Column(Boolean, default=True)
     push_enabled = Column(Boolean, default=True)
     workout_reminders = Column(Boolean, default=True)
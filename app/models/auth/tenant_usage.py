@@ -0,0 +1,18 @@
+from sqlalchemy import (
+    Column, Integer, String, ForeignKey, DateTime, BigInteger
+)
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class TenantUsage(Base):
+    __tablename__ = "tenant_usage"
+
+    # Counters kept in step with writes by app/db/usage.py and
+    # recomputed from the base tables by its reconciler
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), primary_key=True)
+    users = Column(Integer, nullable=False, default=0, server_default="0")
+    storage_bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+    month = Column(String(7))  # YYYY-MM that workouts_this_month counts
+    workouts_this_month = Column(Integer, nullable=False, default=0, server_default="0")
+    reconciled_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -18,14 +18,15 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    # Relationships
+    # Relationships. Deleting a user deletes its rows through ON DELETE
+    # CASCADE in the database; only children already loaded go through the ORM
     tenant = relationship("Tenant", back_populates="users")
-    profile = relationship("UserProfile", back_populates="user", uselist=False)
-    workouts = relationship("Workout", back_populates="user")
-    goals = relationship("Goal", back_populates="user")
-    measurements = relationship("BodyMeasurement", back_populates="user")
-    notification_preference = relationship("NotificationPreference", back_populates="user", uselist=False)
-    consents = relationship("UserConsent", back_populates="user")
-    templates = relationship("WorkoutTemplate", back_populates="user")
-    personal_records = relationship("PersonalRecord", back_populates="user")
-    audit_logs = relationship("AuditLog", back_populates="user")
+    profile = relationship("UserProfile", back_populates="user", uselist=False, cascade="all, delete", passive_deletes=True)
+    workouts = relationship("Workout", back_populates="user", cascade="all, delete", passive_deletes=True)
+    goals = relationship("Goal", back_populates="user", cascade="all, delete", passive_deletes=True)
+    measurements = relationship("BodyMeasurement", back_populates="user", cascade="all, delete", passive_deletes=True)
+    notification_preference = relationship("NotificationPreference", back_populates="user", uselist=False, cascade="all, delete", passive_deletes=True)
+    consents = relationship("UserConsent", back_populates="user", cascade="all, delete", passive_deletes=True)
+    templates = relationship("WorkoutTemplate", back_populates="user", cascade="all, delete", passive_deletes=True)
+    personal_records = relationship("PersonalRecord", back_populates="user", cascade="all, delete", passive_deletes=True)
+    audit_logs = relationship("AuditLog", back_populates="user", passive_deletes=True)
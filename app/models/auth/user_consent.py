@@ -8,7 +8,7 @@ class UserConsent(Base):
     __tablename__ = "user_consents"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     consent_type = Column(String, nullable=False)  # data_processing, analytics, marketing, etc.
     granted = Column(Boolean, default=False, nullable=False)
     version = Column(String, nullable=False)  # Policy version
@@ -14,6 +14,7 @@ This ensures all models are imported in the correct order and available for:
 # ==================== Tenant Models ====================
 from app.models.auth.tenant import Tenant
 from app.models.auth.tenant_configs import TenantConfigs
+from app.models.auth.tenant_usage import TenantUsage
 
 # ==================== User Models ====================
 from app.models.auth.user import User
@@ -47,6 +48,7 @@ __all__ = [
     # Tenant
     "Tenant",
     "TenantConfigs",
+    "TenantUsage",
     
     # User
     "User",
@@ -9,7 +9,7 @@ class BodyMeasurement(Base):
     __tablename__ = "body_measurements"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     metric_type = Column(String, nullable=False)  # weight, body_fat_pct, waist, hips, chest, etc.
     value = Column(Float, nullable=False)
     unit = Column(String, nullable=False)  # kg, lb, cm, inches, %
@@ -10,7 +10,7 @@ class Goal(Base):
     __tablename__ = "goals"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     goal_name = Column(String, nullable=False)
     metric_type = Column(String, nullable=False)  # weight, distance, workout_count, exercise_1rm, etc.
     target_value = Column(Float, nullable=False)
@@ -24,4 +24,4 @@ class Goal(Base):
 
     # Relationships
     user = relationship("User", back_populates="goals")
-    milestones = relationship("GoalMilestone", back_populates="goal", cascade="all, delete-orphan")
+    milestones = relationship("GoalMilestone", back_populates="goal", cascade="all, delete-orphan", passive_deletes=True)
@@ -10,7 +10,7 @@ class GoalMilestone(Base):
     __tablename__ = "goal_milestones"
 
     id = Column(Integer, primary_key=True, index=True)
-    goal_id = Column(Integer, ForeignKey("goals.id"), nullable=False, index=True)
+    goal_id = Column(Integer, ForeignKey("goals.id", ondelete="CASCADE"), nullable=False, index=True)
     milestone_name = Column(String, nullable=False)
     milestone_value = Column(Float, nullable=False)
     target_date = Column(Date)
@@ -9,12 +9,12 @@ class PersonalRecord(Base):
     __tablename__ = "personal_records"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     exercise_name = Column(String, nullable=False, index=True)
     record_type = Column(String, nullable=False)  # max_weight, max_reps, fastest_time, longest_distance
     value = Column(Float, nullable=False)
     unit = Column(String, nullable=False)
-    workout_id = Column(Integer, ForeignKey("workouts.id"))
+    workout_id = Column(Integer, ForeignKey("workouts.id", ondelete="SET NULL"))
     achieved_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -0,0 +1,9 @@
+# File: app/models/sync/__init__.py
+
+"""
+Models backing the offline sync change feed.
+"""
+
+from app.models.sync.change_log import ChangeLog
+
+__all__ = ["ChangeLog"]
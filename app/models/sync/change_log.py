@@ -0,0 +1,21 @@
+from sqlalchemy import (
+    Column, Integer, String, ForeignKey, DateTime, Index
+)
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+
+    # id is the sync cursor: monotonic, and commit-ordered because SQLite
+    # has a single writer
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    entity_type = Column(String, nullable=False)  # workout, strength_exercise, goal, ...
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String, nullable=False)  # created, updated, deleted
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_change_log_user_cursor", "user_id", "id"),
+    )
@@ -9,7 +9,7 @@ class CardioActivity(Base):
     __tablename__ = "cardio_activities"
 
     id = Column(Integer, primary_key=True, index=True)
-    workout_id = Column(Integer, ForeignKey("workouts.id"), nullable=False, index=True)
+    workout_id = Column(Integer, ForeignKey("workouts.id", ondelete="CASCADE"), nullable=False, index=True)
     activity_type = Column(String, nullable=False)  # run, cycle, row, swim, etc.
     distance_km = Column(Float)
     duration_minutes = Column(Integer)
@@ -9,7 +9,7 @@ class StrengthExercise(Base):
     __tablename__ = "strength_exercises"
 
     id = Column(Integer, primary_key=True, index=True)
-    workout_id = Column(Integer, ForeignKey("workouts.id"), nullable=False, index=True)
+    workout_id = Column(Integer, ForeignKey("workouts.id", ondelete="CASCADE"), nullable=False, index=True)
     exercise_name = Column(String, nullable=False, index=True)
     sets = Column(Integer)
     reps = Column(Integer)
@@ -9,7 +9,7 @@ class TemplateExercise(Base):
     __tablename__ = "template_exercises"
 
     id = Column(Integer, primary_key=True, index=True)
-    template_id = Column(Integer, ForeignKey("workout_templates.id"), nullable=False, index=True)
+    template_id = Column(Integer, ForeignKey("workout_templates.id", ondelete="CASCADE"), nullable=False, index=True)
     exercise_name = Column(String, nullable=False)
     sets = Column(Integer)
     reps = Column(Integer)
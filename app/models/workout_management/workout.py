@@ -9,7 +9,7 @@ class Workout(Base):
     __tablename__ = "workouts"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     workout_datetime = Column(DateTime(timezone=True), nullable=False, index=True)
     workout_type = Column(String, nullable=False)  # strength, cardio, flexibility, mixed
     duration_minutes = Column(Integer)
@@ -21,6 +21,6 @@ class Workout(Base):
 
     # Relationships
     user = relationship("User", back_populates="workouts")
-    strength_exercises = relationship("StrengthExercise", back_populates="workout", cascade="all, delete-orphan")
-    cardio_activities = relationship("CardioActivity", back_populates="workout", cascade="all, delete-orphan")
-    media = relationship("WorkoutMedia", back_populates="workout", cascade="all, delete-orphan")
+    strength_exercises = relationship("StrengthExercise", back_populates="workout", cascade="all, delete-orphan", passive_deletes=True)
+    cardio_activities = relationship("CardioActivity", back_populates="workout", cascade="all, delete-orphan", passive_deletes=True)
+    media = relationship("WorkoutMedia", back_populates="workout", cascade="all, delete-orphan", passive_deletes=True)
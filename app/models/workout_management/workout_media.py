@@ -9,7 +9,7 @@ class WorkoutMedia(Base):
     __tablename__ = "workout_media"
 
     id = Column(Integer, primary_key=True, index=True)
-    workout_id = Column(Integer, ForeignKey("workouts.id"), nullable=False, index=True)
+    workout_id = Column(Integer, ForeignKey("workouts.id", ondelete="CASCADE"), nullable=False, index=True)
     media_type = Column(String, nullable=False)  # image, video
     blob_url = Column(String, nullable=False)
     thumbnail_url = Column(String)
@@ -9,7 +9,7 @@ class WorkoutTemplate(Base):
     __tablename__ = "workout_templates"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     template_name = Column(String, nullable=False)
     workout_type = Column(String, nullable=False)
     description = Column(Text)
@@ -20,4 +20,4 @@ class WorkoutTemplate(Base):
 
     # Relationships
     user = relationship("User", back_populates="templates")
-    exercises = relationship("TemplateExercise", back_populates="template", cascade="all, delete-orphan")
+    exercises = relationship("TemplateExercise", back_populates="template", cascade="all, delete-orphan", passive_deletes=True)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 # ==================== Audit Log Schemas ====================
@@ -25,3 +25,12 @@ class AuditLogResponse(AuditLogBase):
 
     # ✅ Pydantic v2 config
     model_config = ConfigDict(from_attributes=True)
+
+
+class AuditLogPage(BaseModel):
+    # Newest first
+    entries: List[AuditLogResponse] = []
+    # Pass back as ?cursor= for the next page; None on the last page
+    cursor: Optional[str] = None
+    has_more: bool
+    archived_months_scanned: int = 0
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+from app.schemas.workout import WorkoutResponse, StrengthExerciseResponse, CardioActivityResponse
+from app.schemas.goal import GoalResponse, GoalMilestoneResponse
+from app.schemas.measurement import BodyMeasurementResponse
+
+# ==================== Sync Schemas ====================
+
+class SyncTombstone(BaseModel):
+    entity_type: str
+    id: int
+    deleted_at: datetime
+
+
+class SyncChangesResponse(BaseModel):
+    # Current state of every entity created or updated in this page
+    workouts: List[WorkoutResponse] = []
+    strength_exercises: List[StrengthExerciseResponse] = []
+    cardio_activities: List[CardioActivityResponse] = []
+    goals: List[GoalResponse] = []
+    goal_milestones: List[GoalMilestoneResponse] = []
+    body_measurements: List[BodyMeasurementResponse] = []
+    # Entities deleted in this page; deleting a workout or goal also lists
+    # each of its exercises, cardio activities or milestones
+    deleted: List[SyncTombstone] = []
+    # Pass back as ?since= for the next page
+    cursor: int
+    has_more: bool
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, date
 from app.schemas.enums import Gender, UnitPreference, ConsentType
 from app.schemas.notification import NotificationPreferenceResponse
@@ -34,6 +34,12 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class UserBulkFilter(BaseModel):
+    """At least one of the filters; they are combined with AND"""
+    tenant_id: Optional[int] = None
+    user_ids: Optional[List[int]] = Field(None, min_length=1)
+    last_login_before: Optional[datetime] = None
+
 # ==================== User Profile Schemas ====================
 
 class UserProfileBase(BaseModel):
@@ -0,0 +1,202 @@
+# ==================== Production Launcher ====================
+# File: app/serve.py
+
+"""
+Pre-fork production server.
+
+    python -m app.serve [--workers N] [--host H] [--port P]
+
+The parent imports the app once, freezes the GC so the imported objects
+stay shared copy-on-write, binds the listening socket and forks the
+workers. Each worker runs uvicorn with uvloop and httptools on the
+shared socket and exits after MAX_REQUESTS (+ jitter) requests; the
+parent then forks a fresh one from the preloaded image.
+
+SIGTERM/SIGINT stop the workers gracefully: they stop accepting, finish
+in-flight requests (up to GRACEFUL_TIMEOUT), then run the app's shutdown
+handlers, which drain the background queues: running jobs get up to
+another GRACEFUL_TIMEOUT to finish (queued ones are marked failed, see
+app/core/jobs.py) and the writer commits every write still queued. A
+worker still alive after both windows is killed.
+"""
+
+import argparse
+import gc
+import importlib.util
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.serve")
+
+# A worker dying this soon after starting is treated as a crash loop
+MIN_WORKER_LIFETIME = 1.0
+
+
+def default_workers() -> int:
+    return settings.WORKERS or os.cpu_count() or 1
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def _http_protocol() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+class Supervisor:
+    """
+    Forks workers from the preloaded parent and replaces them when they exit
+    """
+    def __init__(self, app, sock: socket.socket, workers: int, log_level: str):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._run_worker()
+            except BaseException:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+
+    def _run_worker(self):
+        import uvicorn
+
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        gc.enable()
+        random.seed()
+        # Pooled read connections must not be shared with the parent
+        from app.db.session import read_engine
+        read_engine.dispose(close=False)
+
+        max_requests = settings.MAX_REQUESTS
+        if max_requests and settings.MAX_REQUESTS_JITTER:
+            # Stagger restarts so workers don't all recycle at once
+            max_requests += random.randint(0, settings.MAX_REQUESTS_JITTER)
+
+        config = uvicorn.Config(
+            self.app,
+            loop=_event_loop(),
+            http=_http_protocol(),
+            lifespan="on",
+            backlog=settings.SERVER_BACKLOG,
+            timeout_keep_alive=settings.KEEPALIVE_TIMEOUT,
+            limit_max_requests=max_requests or None,
+            timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+            access_log=False,  # log_requests middleware already logs
+            log_level=self.log_level,
+        )
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def _handle_stop(self, signum, frame):
+        if self.stopping:
+            return
+        self.stopping = True
+        logger.info(f"Received {signal.Signals(signum).name}, stopping {len(self.children)} workers")
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+
+        for _ in range(self.workers):
+            self.spawn()
+        logger.info(f"Started {self.workers} workers ({_event_loop()}, {_http_protocol()})")
+
+        deadline = None
+        while self.children:
+            if self.stopping and deadline is None:
+                # In-flight requests, then running jobs, each get GRACEFUL_TIMEOUT
+                deadline = time.monotonic() + 2 * settings.GRACEFUL_TIMEOUT + 5
+            if deadline is not None and time.monotonic() > deadline:
+                for pid in list(self.children):
+                    logger.warning(f"Worker {pid} did not stop in time, killing it")
+                    os.kill(pid, signal.SIGKILL)
+                deadline = float("inf")
+
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.1)
+                continue
+
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0 and time.monotonic() - started < MIN_WORKER_LIFETIME:
+                logger.error(f"Worker {pid} exited with {code} right after starting; backing off")
+                time.sleep(MIN_WORKER_LIFETIME)
+            else:
+                logger.info(f"Worker {pid} exited ({code}), starting a replacement")
+            self.spawn()
+
+        self.sock.close()
+        logger.info("All workers stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with preloaded, pre-forked uvicorn workers")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    sock = bind_socket(args.host, args.port, settings.SERVER_BACKLOG)
+
+    # Preload: everything imported here is shared copy-on-write by the workers
+    gc.disable()
+    from app.main import app
+    from app.core.cache import response_cache
+
+    if args.workers > 1:
+        response_cache.share_generations()
+    else:
+        response_cache.enable()
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Listening on {args.host}:{args.port} (backlog {settings.SERVER_BACKLOG})")
+    Supervisor(app, sock, args.workers, args.log_level).run()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
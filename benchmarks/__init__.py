@@ -0,0 +1,12 @@
+# ==================== Benchmarks ====================
+# File: benchmarks/__init__.py
+
+"""
+Benchmark tooling for the Fitness Tracking API.
+
+- benchmarks.datagen: scale-tiered synthetic dataset generator
+- benchmarks.load: end-to-end load driver for the v1 endpoints
+
+Every tool writes its results as JSON under ``benchmarks/results`` so runs
+can be diffed.
+"""
@@ -0,0 +1,154 @@
+# ==================== Benchmark Helpers ====================
+# File: benchmarks/common.py
+
+"""
+Shared helpers for the benchmark tools
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCHMARKS_DIR.parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+
+
+def configure_environment(database_url: Optional[str] = None):
+    """
+    Point the app at the benchmark database and silence per-request logging.
+
+    Must run before anything under ``app`` is imported, because settings and
+    the engine are created at import time.
+    """
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("DEBUG", "False")
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+
+    import logging
+    logging.getLogger("app.main").setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def sqlite_path(database_url: str) -> str:
+    """
+    Extract the file path from a ``sqlite:///`` URL
+    """
+    if not database_url.startswith("sqlite:///"):
+        raise ValueError(f"Only sqlite:/// URLs are supported, got {database_url!r}")
+    return database_url[len("sqlite:///"):]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Summary statistics for a list of durations (seconds in, milliseconds out)
+    """
+    ordered = sorted(samples)
+    ms = 1000.0
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * ms if ordered else 0.0,
+        "stdev_ms": statistics.stdev(ordered) * ms if len(ordered) > 1 else 0.0,
+        "min_ms": ordered[0] * ms if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50) * ms,
+        "p95_ms": percentile(ordered, 95) * ms,
+        "p99_ms": percentile(ordered, 99) * ms,
+        "max_ms": ordered[-1] * ms if ordered else 0.0,
+    }
+
+
+def run_metadata() -> Dict[str, Any]:
+    """
+    Describe the environment a result was produced in
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_result(name: str, payload: Dict[str, Any], output: Optional[str] = None) -> Path:
+    """
+    Write a result document as pretty JSON and return its path
+    """
+    if output:
+        path = Path(output)
+    else:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = RESULTS_DIR / f"{name}-{stamp}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True, default=str) + "\n")
+    return path
+
+
+# ==================== Scenario Tests ====================
+
+# Prefix for scenario scripts that drive the app: a fresh schema, the app and
+# ``login(client, email, **fields)`` returning auth headers for a new user
+APP_PRELUDE = '''
+import json
+from fastapi.testclient import TestClient
+from app.db.init_db import init_db
+init_db()
+from app.main import app
+
+
+def login(client, email, **fields):
+    client.post("/api/v1/auth/register", json={"email": email, "password": "Passw0rd!", "tenant_id": 1, **fields})
+    token = client.post("/api/v1/auth/login", json={"email": email, "password": "Passw0rd!"}).json()
+    return {"Authorization": "Bearer " + token["data"]["access_token"]}
+'''
+
+
+def run_scenario(script: str, tmp_path: Path, **env: str) -> Any:
+    """
+    Run ``script`` in a fresh interpreter against a database in ``tmp_path``;
+    returns the JSON it prints on its last line.
+
+    Settings and engines are built at import time, so every scenario gets its
+    own process; ``env`` overrides settings for it.
+    """
+    environment = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path}/scenario.db",
+        "DEBUG": "False",
+        "MAINTENANCE_ENABLED": "False",
+        "JOB_DIR": str(tmp_path / "jobs"),
+        "EXPORT_DIR": str(tmp_path / "exports"),
+        "SHARD_DIR": str(tmp_path / "shards"),
+        **env,
+    }
+    completed = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_ROOT, env=environment, capture_output=True, text=True
+    )
+    assert completed.returncode == 0, completed.stderr[-4000:]
+    return json.loads(completed.stdout.strip().splitlines()[-1])
@@ -0,0 +1,309 @@
+# ==================== Synthetic Dataset Generator ====================
+# File: benchmarks/datagen.py
+
+"""
+Bulk-load a realistic, reproducible dataset for benchmarking.
+
+Tiers are approximate total row counts across all tables. Rows are generated
+per user (profile, notification preferences, workouts with exercises,
+measurements, goals with milestones, personal records) and written with
+``executemany`` in large transactions, bypassing the ORM entirely; the
+tenants' usage counters are reconciled afterwards.
+
+Usage:
+    python -m benchmarks.datagen --tier 10k --database sqlite:///./bench_10k.db
+    python -m benchmarks.datagen --tier 1m --database sqlite:///./bench_1m.db --seed 7
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from benchmarks.common import configure_environment, run_metadata, sqlite_path, write_result
+
+TIERS = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+    "50m": 50_000_000,
+}
+
+# Average rows produced per generated user (see _generate_user)
+ROWS_PER_USER = 88
+
+USERS_PER_BATCH = 1_000
+BENCH_PASSWORD = "Bench@12345"
+BENCH_ADMIN_EMAIL = "bench-admin@bench.example.com"
+
+SEED_TENANTS = [
+    ("Individuals", "Public", 0.30),
+    ("Gold's Gym Pune", "Gym", 0.15),
+    ("Infosys Wellness", "Corporate", 0.40),
+    ("IIT Fitness Program", "University", 0.15),
+]
+
+EXERCISES = [
+    "Back Squat", "Bench Press", "Deadlift", "Overhead Press", "Barbell Row",
+    "Pull Up", "Lunge", "Romanian Deadlift", "Incline Press", "Dip",
+]
+CARDIO = ["run", "cycle", "row", "swim", "walk"]
+METRICS = [("weight", "kg", 55, 110), ("body_fat_pct", "%", 8, 35), ("waist", "cm", 65, 110)]
+TAGS = ["5x5", "HIIT", "Mobility", "PPL", "Zone2", "Deload"]
+SQL_DATETIME = "%Y-%m-%d %H:%M:%S.%f"
+
+INSERTS = {
+    "users": "INSERT INTO users (id, email, hashed_password, is_admin, tenant_id, is_active, last_login, created_at) VALUES (?, ?, ?, ?, ?, 1, ?, ?)",
+    "user_profiles": "INSERT INTO user_profiles (user_id, full_name, gender, height_cm, unit_preference, timezone, language, created_at) VALUES (?, ?, ?, ?, 'metric', 'UTC', 'en', ?)",
+    "notification_preferences": "INSERT INTO notification_preferences (user_id, email_enabled, push_enabled, workout_reminders, goal_milestones, streak_alerts, created_at) VALUES (?, 1, 1, 1, 1, 1, ?)",
+    "workouts": "INSERT INTO workouts (id, user_id, workout_datetime, workout_type, duration_minutes, notes, tags, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "strength_exercises": "INSERT INTO strength_exercises (workout_id, exercise_name, sets, reps, weight_kg, rpe, order_index, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    "cardio_activities": "INSERT INTO cardio_activities (workout_id, activity_type, distance_km, duration_minutes, avg_pace_min_per_km, avg_heart_rate, max_heart_rate, calories_burned, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "body_measurements": "INSERT INTO body_measurements (user_id, metric_type, value, unit, measured_at, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+    "goals": "INSERT INTO goals (id, user_id, goal_name, metric_type, target_value, baseline_value, unit, start_date, end_date, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    "goal_milestones": "INSERT INTO goal_milestones (goal_id, milestone_name, milestone_value, target_date, achieved, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+    "personal_records": "INSERT INTO personal_records (user_id, exercise_name, record_type, value, unit, workout_id, achieved_at, created_at) VALUES (?, ?, 'max_weight', ?, 'kg', ?, ?, ?)",
+}
+
+
+def _ts(value: datetime) -> str:
+    return value.strftime(SQL_DATETIME)
+
+
+class Generator:
+    """
+    Deterministic row generator; identical seeds produce identical datasets
+    """
+    def __init__(self, seed: int, now: datetime, hashed_password: str, tenant_weights: Dict[int, float]):
+        self.rng = random.Random(seed)
+        self.now = now
+        self.hashed_password = hashed_password
+        self.tenant_ids = list(tenant_weights)
+        self.tenant_cum = []
+        total = 0.0
+        for weight in tenant_weights.values():
+            total += weight
+            self.tenant_cum.append(total)
+        self.next_workout_id = 1
+        self.next_goal_id = 1
+
+    def _when(self, days_back: int = 730) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randint(0, days_back * 86400))
+
+    def generate_user(self, user_id: int, rows: Dict[str, List[tuple]]):
+        rng = self.rng
+        joined = self._when()
+        tenant_id = self.rng.choices(self.tenant_ids, cum_weights=self.tenant_cum)[0]
+        rows["users"].append((
+            user_id, f"user{user_id}@bench.example.com", self.hashed_password, 0,
+            tenant_id, _ts(self.now - timedelta(hours=rng.randint(0, 720))), _ts(joined),
+        ))
+        rows["user_profiles"].append((
+            user_id, f"Bench User {user_id}", rng.choice(["Male", "Female", "Other"]),
+            round(rng.uniform(150, 195), 1), _ts(joined),
+        ))
+        rows["notification_preferences"].append((user_id, _ts(joined)))
+
+        for _ in range(rng.randint(10, 30)):
+            workout_id = self.next_workout_id
+            self.next_workout_id += 1
+            when = self._when()
+            workout_type = rng.choice(["strength", "strength", "cardio", "mixed", "flexibility"])
+            rows["workouts"].append((
+                workout_id, user_id, _ts(when), workout_type, rng.randint(20, 120),
+                None if rng.random() < 0.7 else "Felt strong today",
+                json.dumps(rng.sample(TAGS, rng.randint(0, 2))), "completed",
+                _ts(when), _ts(when) if rng.random() < 0.2 else None,
+            ))
+            if workout_type in ("strength", "mixed"):
+                count = rng.randint(3, 6) if workout_type == "strength" else 2
+                for order, name in enumerate(rng.sample(EXERCISES, count)):
+                    weight = round(rng.uniform(20, 180), 1)
+                    rows["strength_exercises"].append((
+                        workout_id, name, rng.randint(3, 5), rng.randint(3, 12),
+                        weight, rng.randint(6, 10), order, _ts(when),
+                    ))
+                    if rng.random() < 0.05:
+                        rows["personal_records"].append((
+                            user_id, name, weight, workout_id, _ts(when), _ts(when),
+                        ))
+            if workout_type in ("cardio", "mixed"):
+                distance = round(rng.uniform(2, 25), 2)
+                minutes = rng.randint(12, 150)
+                rows["cardio_activities"].append((
+                    workout_id, rng.choice(CARDIO), distance, minutes,
+                    round(minutes / distance, 2), rng.randint(120, 165),
+                    rng.randint(165, 195), round(minutes * rng.uniform(8, 13), 1), _ts(when),
+                ))
+
+        for _ in range(rng.randint(5, 15)):
+            metric, unit, low, high = rng.choice(METRICS)
+            when = self._when()
+            rows["body_measurements"].append((
+                user_id, metric, round(rng.uniform(low, high), 1), unit, _ts(when), _ts(when),
+            ))
+
+        for _ in range(rng.randint(0, 3)):
+            goal_id = self.next_goal_id
+            self.next_goal_id += 1
+            metric, unit, low, high = rng.choice(METRICS)
+            start = self._when(365)
+            rows["goals"].append((
+                goal_id, user_id, f"Reach target {metric}", metric,
+                round(rng.uniform(low, high), 1), round(rng.uniform(low, high), 1), unit,
+                start.date().isoformat(), (start + timedelta(days=90)).date().isoformat(),
+                rng.choice(["active", "active", "completed", "abandoned"]), _ts(start),
+            ))
+            for step in range(rng.randint(0, 3)):
+                rows["goal_milestones"].append((
+                    goal_id, f"Milestone {step + 1}", round(rng.uniform(low, high), 1),
+                    (start + timedelta(days=30 * (step + 1))).date().isoformat(),
+                    int(rng.random() < 0.4), _ts(start),
+                ))
+
+
+def _prepare_database(database_url: str):
+    """
+    Create the schema through SQLAlchemy metadata so it matches the models
+    """
+    from sqlalchemy import create_engine
+    from app.db.base import Base
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+
+def _ensure_tenants(conn: sqlite3.Connection, extra_tenants: int) -> Dict[int, float]:
+    weights: Dict[int, float] = {}
+    now = _ts(datetime.utcnow())
+    for name, type_, weight in SEED_TENANTS:
+        row = conn.execute("SELECT id FROM tenants WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            cursor = conn.execute(
+                "INSERT INTO tenants (name, type, created_at) VALUES (?, ?, ?)", (name, type_, now)
+            )
+            row = (cursor.lastrowid,)
+        weights[row[0]] = weight
+    for index in range(extra_tenants):
+        name = f"Bench Gym {index + 1}"
+        row = conn.execute("SELECT id FROM tenants WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            row = (conn.execute(
+                "INSERT INTO tenants (name, type, created_at) VALUES (?, 'Gym', ?)", (name, now)
+            ).lastrowid,)
+        weights[row[0]] = 0.15 / extra_tenants
+    return weights
+
+
+def _next_id(conn: sqlite3.Connection, table: str) -> int:
+    return (conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]) + 1
+
+
+def _reconcile_usage(tenant_ids: List[int]):
+    """
+    Recompute the tenants' usage counters, which the raw inserts bypass
+    """
+    import logging
+    from app.db.usage import reconcile
+    from app.db.writer import writer
+
+    # Every tenant "drifts" here: its counters start from nothing
+    logging.getLogger("app.db.usage").setLevel(logging.ERROR)
+    try:
+        reconcile(tenant_ids)
+    finally:
+        writer.stop()
+
+
+def generate(tier: str, database_url: str, seed: int = 42) -> Dict:
+    """
+    Generate a dataset of roughly ``TIERS[tier]`` rows into ``database_url``
+    """
+    configure_environment(database_url)
+    from app.core.security import hash_password
+
+    target_rows = TIERS[tier]
+    user_count = max(1, target_rows // ROWS_PER_USER)
+    extra_tenants = user_count // 5_000
+
+    _prepare_database(database_url)
+    conn = sqlite3.connect(sqlite_path(database_url), isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA cache_size=-262144")
+
+    generator_epoch = datetime(2026, 1, 1)
+    started = time.perf_counter()
+    conn.execute("BEGIN")
+    tenant_weights = _ensure_tenants(conn, extra_tenants)
+    hashed = hash_password(BENCH_PASSWORD)
+    first_user_id = _next_id(conn, "users")
+    if conn.execute("SELECT 1 FROM users WHERE email = ?", (BENCH_ADMIN_EMAIL,)).fetchone() is None:
+        conn.execute(INSERTS["users"], (
+            first_user_id, BENCH_ADMIN_EMAIL, hashed, 1, next(iter(tenant_weights)),
+            None, _ts(generator_epoch),
+        ))
+        first_user_id += 1
+    conn.execute("COMMIT")
+
+    generator = Generator(seed, generator_epoch, hashed, tenant_weights)
+    generator.next_workout_id = _next_id(conn, "workouts")
+    generator.next_goal_id = _next_id(conn, "goals")
+
+    totals = {table: 0 for table in INSERTS}
+    for batch_start in range(0, user_count, USERS_PER_BATCH):
+        rows: Dict[str, List[tuple]] = {table: [] for table in INSERTS}
+        for offset in range(batch_start, min(batch_start + USERS_PER_BATCH, user_count)):
+            generator.generate_user(first_user_id + offset, rows)
+
+        conn.execute("BEGIN")
+        for table, sql in INSERTS.items():
+            if rows[table]:
+                conn.executemany(sql, rows[table])
+                totals[table] += len(rows[table])
+        conn.execute("COMMIT")
+
+        done = min(batch_start + USERS_PER_BATCH, user_count)
+        print(f"  {done}/{user_count} users, {sum(totals.values())} rows", flush=True)
+
+    conn.execute("ANALYZE")
+    conn.close()
+    elapsed = time.perf_counter() - started
+    _reconcile_usage(list(tenant_weights))
+
+    return {
+        "tier": tier,
+        "seed": seed,
+        "database_url": database_url,
+        "users": user_count,
+        "tenants": len(tenant_weights),
+        "rows": totals,
+        "total_rows": sum(totals.values()),
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(sum(totals.values()) / elapsed) if elapsed else None,
+        "admin_email": BENCH_ADMIN_EMAIL,
+        "password": BENCH_PASSWORD,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark dataset")
+    parser.add_argument("--tier", choices=sorted(TIERS, key=TIERS.get), default="10k")
+    parser.add_argument("--database", default=None, help="sqlite:/// URL (default: ./bench_<tier>.db)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="Where to write the JSON summary")
+    args = parser.parse_args()
+
+    database_url = args.database or f"sqlite:///./bench_{args.tier}.db"
+    summary = generate(args.tier, database_url, args.seed)
+    path = write_result(f"datagen-{args.tier}", {"meta": run_metadata(), "summary": summary}, args.output)
+    print(f"✅ Generated {summary['total_rows']} rows in {summary['elapsed_seconds']}s -> {path}")
+
+
+if __name__ == "__main__":
+    main()
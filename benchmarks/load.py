@@ -0,0 +1,281 @@
+# ==================== Load Driver ====================
+# File: benchmarks/load.py
+
+"""
+Replay a weighted mix of v1 API calls and report throughput and latency.
+
+Runs the app in-process over ASGI (httpx.ASGITransport) by default, or
+against a real server with ``--base-url``. Tokens are minted directly for
+generated users, so no Argon2 work happens during setup.
+
+Usage:
+    python -m benchmarks.datagen --tier 10k --database sqlite:///./bench_10k.db
+    python -m benchmarks.load --database sqlite:///./bench_10k.db --duration 30 --concurrency 16
+    python -m benchmarks.load --base-url http://localhost:8000 --database sqlite:///./bench_10k.db
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.common import (
+    configure_environment, run_metadata, sqlite_path, summarize, write_result
+)
+
+API = "/api/v1"
+
+
+@dataclass
+class Persona:
+    user_id: int
+    tenant_id: int
+    token: str
+    workout_ids: List[int]
+    goal_ids: List[int]
+
+
+@dataclass
+class Operation:
+    name: str
+    weight: int
+    method: str
+    build: Callable[[Persona, random.Random], tuple]  # -> (path, json body or None)
+
+
+def _workout_body(persona: Persona, rng: random.Random):
+    return {
+        "user_id": persona.user_id,
+        "workout_datetime": "2026-01-01T07:30:00",
+        "workout_type": rng.choice(["strength", "cardio", "mixed"]),
+        "duration_minutes": rng.randint(20, 90),
+        "tags": ["bench"],
+    }
+
+
+def _measurement_body(persona: Persona, rng: random.Random):
+    return {
+        "user_id": persona.user_id,
+        "metric_type": "weight",
+        "value": round(rng.uniform(55, 110), 1),
+        "unit": "kg",
+        "measured_at": "2026-01-01T07:00:00",
+    }
+
+
+DEFAULT_MIX = [
+    Operation("list_workouts", 30, "GET", lambda p, r: (f"{API}/workouts?page=1&page_size=20", None)),
+    Operation("list_workouts_page100", 3, "GET", lambda p, r: (f"{API}/workouts?page=1&page_size=100", None)),
+    Operation("get_workout", 15, "GET", lambda p, r: (f"{API}/workouts/{r.choice(p.workout_ids)}", None)),
+    Operation("list_measurements", 12, "GET", lambda p, r: (f"{API}/measurements", None)),
+    Operation("list_goals", 10, "GET", lambda p, r: (f"{API}/goals", None)),
+    Operation("get_goal", 4, "GET", lambda p, r: (f"{API}/goals/{r.choice(p.goal_ids)}", None)),
+    Operation("users_me", 15, "GET", lambda p, r: (f"{API}/users/me", None)),
+    Operation("create_workout", 6, "POST", lambda p, r: (f"{API}/workouts", _workout_body(p, r))),
+    Operation("create_measurement", 3, "POST", lambda p, r: (f"{API}/measurements", _measurement_body(p, r))),
+]
+
+
+def load_personas(database_url: str, count: int, seed: int) -> List[Persona]:
+    """
+    Pick users that own workouts and goals and mint access tokens for them
+    """
+    from app.core.security import create_access_token
+
+    conn = sqlite3.connect(sqlite_path(database_url))
+    try:
+        user_rows = conn.execute(
+            "SELECT u.id, u.tenant_id FROM users u "
+            "WHERE u.is_active = 1 AND u.is_admin = 0 "
+            "AND EXISTS (SELECT 1 FROM workouts w WHERE w.user_id = u.id) "
+            "AND EXISTS (SELECT 1 FROM goals g WHERE g.user_id = u.id) "
+            "ORDER BY u.id LIMIT ?",
+            (count * 4,),
+        ).fetchall()
+        rng = random.Random(seed)
+        chosen = rng.sample(user_rows, min(count, len(user_rows)))
+
+        personas = []
+        for user_id, tenant_id in chosen:
+            workout_ids = [r[0] for r in conn.execute(
+                "SELECT id FROM workouts WHERE user_id = ? LIMIT 200", (user_id,)
+            )]
+            goal_ids = [r[0] for r in conn.execute(
+                "SELECT id FROM goals WHERE user_id = ?", (user_id,)
+            )]
+            token = create_access_token({"sub": str(user_id), "tenant_id": tenant_id})
+            personas.append(Persona(user_id, tenant_id, token, workout_ids, goal_ids))
+    finally:
+        conn.close()
+
+    if not personas:
+        raise SystemExit("No suitable users found; run benchmarks.datagen first")
+    return personas
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, elapsed: float, status: Optional[int]):
+        self.latencies[name].append(elapsed)
+        if status is None:
+            self.errors[name] += 1
+        else:
+            self.statuses[name][status] += 1
+            if status >= 400:
+                self.errors[name] += 1
+
+
+async def _worker(client, personas, mix, rng, deadline, recorder, warmup_until):
+    names = [op for op in mix]
+    weights = [op.weight for op in mix]
+    while time.perf_counter() < deadline:
+        op = rng.choices(names, weights=weights)[0]
+        persona = rng.choice(personas)
+        path, body = op.build(persona, rng)
+        headers = {"Authorization": f"Bearer {persona.token}"}
+        started = time.perf_counter()
+        try:
+            response = await client.request(op.method, path, json=body, headers=headers)
+            await response.aread()
+            status = response.status_code
+        except Exception:
+            status = None
+        finished = time.perf_counter()
+        if started >= warmup_until:
+            recorder.record(op.name, finished - started, status)
+
+
+async def run_load(
+    database_url: str,
+    base_url: Optional[str] = None,
+    duration: float = 30.0,
+    warmup: float = 5.0,
+    concurrency: int = 16,
+    users: int = 50,
+    seed: int = 42,
+    mix: Optional[List[Operation]] = None,
+) -> Dict:
+    """
+    Drive the weighted mix for ``warmup + duration`` seconds and summarize
+    """
+    import httpx
+
+    configure_environment(database_url)
+    mix = mix or DEFAULT_MIX
+    personas = load_personas(database_url, users, seed)
+
+    app = None
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+    else:
+        from app.main import app
+        await app.router.startup()
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60
+        )
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    warmup_until = started + warmup
+    deadline = warmup_until + duration
+    try:
+        await asyncio.gather(*[
+            _worker(client, personas, mix, random.Random(seed + index), deadline, recorder, warmup_until)
+            for index in range(concurrency)
+        ])
+    finally:
+        await client.aclose()
+        if app is not None:
+            await app.router.shutdown()
+
+    endpoints = {}
+    all_latencies = []
+    for op in mix:
+        samples = recorder.latencies.get(op.name, [])
+        all_latencies.extend(samples)
+        endpoints[op.name] = {
+            **summarize(samples),
+            "errors": recorder.errors.get(op.name, 0),
+            "statuses": dict(recorder.statuses.get(op.name, {})),
+            "throughput_rps": len(samples) / duration,
+        }
+
+    return {
+        "config": {
+            "database_url": database_url,
+            "mode": "http" if base_url else "asgi",
+            "base_url": base_url,
+            "duration_seconds": duration,
+            "warmup_seconds": warmup,
+            "concurrency": concurrency,
+            "users": len(personas),
+            "seed": seed,
+            "mix": {op.name: op.weight for op in mix},
+        },
+        "overall": {
+            **summarize(all_latencies),
+            "errors": sum(recorder.errors.values()),
+            "throughput_rps": len(all_latencies) / duration,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def print_report(result: Dict):
+    overall = result["overall"]
+    print(f"\n{'endpoint':<24}{'count':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'errors':>8}")
+    for name, stats in result["endpoints"].items():
+        print(
+            f"{name:<24}{stats['count']:>8}{stats['throughput_rps']:>9.1f}"
+            f"{stats['p50_ms']:>9.2f}{stats['p95_ms']:>9.2f}{stats['p99_ms']:>9.2f}{stats['errors']:>8}"
+        )
+    print(
+        f"{'TOTAL':<24}{overall['count']:>8}{overall['throughput_rps']:>9.1f}"
+        f"{overall['p50_ms']:>9.2f}{overall['p95_ms']:>9.2f}{overall['p99_ms']:>9.2f}{overall['errors']:>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the v1 API load mix")
+    parser.add_argument("--database", default="sqlite:///./bench_10k.db")
+    parser.add_argument("--base-url", default=None, help="Target a running server instead of in-process ASGI")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", action="append", default=None, help="Restrict the mix to these operations")
+    parser.add_argument("--output", default=None, help="Where to write the JSON result")
+    args = parser.parse_args()
+
+    mix = DEFAULT_MIX
+    if args.only:
+        mix = [op for op in DEFAULT_MIX if op.name in args.only]
+        if not mix:
+            parser.error(f"--only must name operations from: {', '.join(op.name for op in DEFAULT_MIX)}")
+
+    result = asyncio.run(run_load(
+        database_url=args.database,
+        base_url=args.base_url,
+        duration=args.duration,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        users=args.users,
+        seed=args.seed,
+        mix=mix,
+    ))
+    print_report(result)
+    path = write_result("load", {"meta": run_metadata(), **result}, args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+# ==================== Microbenchmarks ====================
+# File: benchmarks/micro.py
+
+"""
+Stable microbenchmarks for the per-request building blocks.
+
+Each benchmark is warmed up, then timed over several rounds whose iteration
+count is calibrated so a round lasts roughly ``--round-time`` seconds. The
+per-operation time of every round is one sample; the median is compared
+against the stored baseline.
+
+Usage:
+    python -m benchmarks.micro                          # run and compare with baseline
+    python -m benchmarks.micro --save-baseline          # record a new baseline
+    python -m benchmarks.micro --filter token --tolerance 0.2
+
+Exits with status 1 when any benchmark regresses by more than the tolerance.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.common import BENCHMARKS_DIR, configure_environment, run_metadata, write_result
+
+BASELINE_PATH = BENCHMARKS_DIR / "baselines" / "micro.json"
+DEFAULT_TOLERANCE = 0.15
+
+
+@dataclass
+class Benchmark:
+    name: str
+    fn: Callable[[], Any]
+    group: str = "default"
+    max_iterations: Optional[int] = None  # cap for slow primitives (Argon2)
+    stats: Dict[str, float] = field(default_factory=dict)
+
+
+# ==================== Timing Harness ====================
+
+def _time_iterations(fn: Callable, iterations: int) -> float:
+    if inspect.iscoroutinefunction(fn):
+        async def _loop():
+            started = time.perf_counter()
+            for _ in range(iterations):
+                await fn()
+            return time.perf_counter() - started
+        return asyncio.run(_loop())
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return time.perf_counter() - started
+
+
+def _calibrate(bench: Benchmark, round_time: float) -> int:
+    iterations = 1
+    while True:
+        elapsed = _time_iterations(bench.fn, iterations)
+        if elapsed >= round_time / 10 or (bench.max_iterations and iterations >= bench.max_iterations):
+            break
+        iterations *= 2
+    estimate = max(1, int(iterations * round_time / max(elapsed, 1e-9)))
+    if bench.max_iterations:
+        estimate = min(estimate, bench.max_iterations)
+    return estimate
+
+
+def run_benchmark(bench: Benchmark, rounds: int, round_time: float, warmup: float) -> Dict[str, float]:
+    """
+    Warm up, calibrate and time ``rounds`` rounds; returns per-op stats in microseconds
+    """
+    warm_until = time.perf_counter() + warmup
+    while time.perf_counter() < warm_until:
+        _time_iterations(bench.fn, 1)
+
+    iterations = _calibrate(bench, round_time)
+    samples = [_time_iterations(bench.fn, iterations) / iterations for _ in range(rounds)]
+
+    us = 1e6
+    ordered = sorted(samples)
+    quartiles = statistics.quantiles(ordered, n=4) if len(ordered) > 1 else [ordered[0]] * 3
+    bench.stats = {
+        "iterations_per_round": iterations,
+        "rounds": rounds,
+        "median_us": statistics.median(ordered) * us,
+        "mean_us": statistics.fmean(ordered) * us,
+        "stdev_us": (statistics.stdev(ordered) if len(ordered) > 1 else 0.0) * us,
+        "min_us": ordered[0] * us,
+        "max_us": ordered[-1] * us,
+        "iqr_us": (quartiles[2] - quartiles[0]) * us,
+        "ops_per_second": 1 / statistics.median(ordered),
+    }
+    return bench.stats
+
+
+# ==================== Fixtures ====================
+
+def _build_workout(workout_id: int, exercises: int = 5):
+    from datetime import datetime
+    from app.models import Workout, StrengthExercise, CardioActivity
+
+    now = datetime(2026, 1, 1, 7, 30)
+    workout = Workout(
+        id=workout_id, user_id=1, workout_datetime=now, workout_type="strength",
+        duration_minutes=60, notes="Heavy day", tags=["5x5", "PPL"], status="completed",
+        created_at=now, updated_at=now,
+    )
+    workout.strength_exercises = [
+        StrengthExercise(
+            id=workout_id * 10 + i, workout_id=workout_id, exercise_name=f"Lift {i}",
+            sets=5, reps=5, weight_kg=100.0 + i, rpe=8, notes=None, order_index=i, created_at=now,
+        )
+        for i in range(exercises)
+    ]
+    workout.cardio_activities = [
+        CardioActivity(
+            id=workout_id, workout_id=workout_id, activity_type="run", distance_km=5.0,
+            duration_minutes=25, avg_pace_min_per_km=5.0, avg_heart_rate=150,
+            max_heart_rate=180, calories_burned=300.0, notes=None, created_at=now,
+        )
+    ]
+    workout.media = []
+    return workout
+
+
+def _auth_fixture(tmpdir: str):
+    """
+    Create a throwaway database holding one active user and return a session factory
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.db.base import Base
+    from app.models import Tenant, User
+
+    engine = create_engine(f"sqlite:///{os.path.join(tmpdir, 'micro.db')}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    with Session() as db:
+        tenant = Tenant(name="Bench", type="Public")
+        db.add(tenant)
+        db.flush()
+        db.add(User(id=1, email="micro@bench.example.com", hashed_password="x", tenant_id=tenant.id))
+        db.commit()
+    return Session
+
+
+def build_benchmarks(tmpdir: str) -> List[Benchmark]:
+    from fastapi import Request
+    from fastapi.responses import Response
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from app.api.deps import get_current_user
+    from app.api.responses import PaginatedResponse
+    from app.core.security import (
+        RateLimiter, create_access_token, decode_access_token, hash_password, verify_password
+    )
+    from app.main import log_requests
+    from app.schemas.workout import WorkoutResponse, WorkoutWithExercisesResponse
+
+    token = create_access_token({"sub": "1", "tenant_id": 1})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    Session = _auth_fixture(tmpdir)
+    session = Session()
+
+    # Steady state close to the limit: 99 live entries per identifier
+    limiter = RateLimiter(max_requests=100, window_seconds=3600)
+    for identifier in ("user:1", "user:2"):
+        limiter.requests[identifier] = []
+        for _ in range(99):
+            limiter.check_rate_limit(identifier)
+
+    def rate_limit_check():
+        limiter.check_rate_limit("user:1")
+        limiter.requests["user:1"].pop()
+
+    detail_workout = _build_workout(1)
+    page = [_build_workout(i, exercises=0) for i in range(1, 101)]
+    page_model = PaginatedResponse[WorkoutResponse]
+
+    def validate_page():
+        page_model.model_validate({
+            "success": True, "data": page, "message": "ok",
+            "page": 1, "page_size": 100, "total_items": 1000, "total_pages": 10,
+        }, from_attributes=True)
+
+    hashed = hash_password("Bench@12345")
+    scope = {
+        "type": "http", "method": "GET", "path": "/api/v1/workouts", "raw_path": b"/api/v1/workouts",
+        "query_string": b"", "headers": [], "server": ("bench", 80), "scheme": "http",
+        "root_path": "", "http_version": "1.1",
+    }
+
+    async def call_next(request):
+        return Response(b"{}", media_type="application/json")
+
+    async def middleware_log_requests():
+        await log_requests(Request(scope), call_next)
+
+    async def middleware_baseline():
+        await call_next(Request(scope))
+
+    return [
+        Benchmark("security.create_access_token", lambda: create_access_token({"sub": "1", "tenant_id": 1}), "auth"),
+        Benchmark("security.decode_access_token", lambda: decode_access_token(token), "auth"),
+        Benchmark("deps.get_current_user", lambda: get_current_user(credentials, session), "auth"),
+        Benchmark("security.RateLimiter.check_rate_limit", rate_limit_check, "auth"),
+        Benchmark("security.hash_password", lambda: hash_password("Bench@12345"), "password", max_iterations=2),
+        Benchmark("security.verify_password", lambda: verify_password("Bench@12345", hashed), "password", max_iterations=2),
+        Benchmark("schema.WorkoutWithExercisesResponse", lambda: WorkoutWithExercisesResponse.model_validate(detail_workout), "serialization"),
+        Benchmark("schema.PaginatedResponse[WorkoutResponse]x100", validate_page, "serialization"),
+        Benchmark("middleware.log_requests", middleware_log_requests, "middleware"),
+        Benchmark("middleware.baseline", middleware_baseline, "middleware"),
+    ]
+
+
+# ==================== Baseline Comparison ====================
+
+def load_baseline() -> Dict[str, Dict[str, float]]:
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text()).get("benchmarks", {})
+
+
+def save_baseline(results: Dict[str, Dict[str, float]]):
+    BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    BASELINE_PATH.write_text(json.dumps(
+        {"meta": run_metadata(), "benchmarks": results}, indent=2, sort_keys=True
+    ) + "\n")
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float):
+    """
+    Return {name: ratio} for every benchmark slower than baseline by more than ``tolerance``
+    """
+    regressions = {}
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ratio = stats["median_us"] / base["median_us"]
+        if ratio > 1 + tolerance:
+            regressions[name] = ratio
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the hot-path microbenchmarks")
+    parser.add_argument("--filter", default=None, help="Only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=15)
+    parser.add_argument("--round-time", type=float, default=0.1, help="Seconds per timed round")
+    parser.add_argument("--warmup", type=float, default=0.3, help="Warmup seconds per benchmark")
+    parser.add_argument("--tolerance", type=float, default=float(os.getenv("MICRO_TOLERANCE", DEFAULT_TOLERANCE)))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    configure_environment(f"sqlite:///{os.path.join(tmpdir.name, 'micro.db')}")
+    # Keep request logging at INFO so log_requests is measured as deployed,
+    # but send the records nowhere.
+    logging.getLogger("app.main").setLevel(logging.INFO)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.StreamHandler(open(os.devnull, "w")))
+
+    baseline = load_baseline()
+    results: Dict[str, Dict[str, float]] = {}
+    with tmpdir:
+        benchmarks = build_benchmarks(tmpdir.name)
+        print(f"{'benchmark':<48}{'median':>14}{'stdev':>12}{'vs base':>10}")
+        for bench in benchmarks:
+            if args.filter and args.filter not in bench.name:
+                continue
+            stats = run_benchmark(bench, args.rounds, args.round_time, args.warmup)
+            results[bench.name] = stats
+            base = baseline.get(bench.name)
+            delta = f"{(stats['median_us'] / base['median_us'] - 1) * 100:+.1f}%" if base else "n/a"
+            print(f"{bench.name:<48}{stats['median_us']:>12.2f}us{stats['stdev_us']:>10.2f}us{delta:>10}")
+
+    if "middleware.log_requests" in results and "middleware.baseline" in results:
+        overhead = results["middleware.log_requests"]["median_us"] - results["middleware.baseline"]["median_us"]
+        print(f"\nlog_requests overhead: {overhead:.2f}us per request")
+
+    regressions = compare(results, baseline, args.tolerance)
+    path = write_result("micro", {
+        "meta": run_metadata(),
+        "tolerance": args.tolerance,
+        "benchmarks": results,
+        "regressions": regressions,
+    }, args.output)
+    print(f"Results written to {path}")
+
+    if args.save_baseline:
+        save_baseline({**baseline, **results})
+        print(f"Baseline updated: {BASELINE_PATH}")
+        return
+
+    if regressions:
+        for name, ratio in sorted(regressions.items()):
+            print(f"❌ {name}: {(ratio - 1) * 100:.1f}% slower than baseline (tolerance {args.tolerance:.0%})")
+        sys.exit(1)
+    print("✅ No regressions beyond tolerance")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# ==================== Projection Benchmark ====================
+# File: benchmarks/projection.py
+
+"""
+Compare ORM entity loading with column projection for 100-row list pages.
+
+For each list endpoint query (workouts, measurements, admin users) the
+benchmark fetches a page and validates it into the response schema, once
+through full ORM entities and once through ``app.db.projection``. It reports
+time per page and the peak memory allocated while building it.
+
+Usage:
+    python -m benchmarks.datagen --tier 10k --database sqlite:///./bench_10k.db
+    python -m benchmarks.projection --database sqlite:///./bench_10k.db
+"""
+
+import argparse
+import tracemalloc
+
+from benchmarks.common import configure_environment, run_metadata, write_result
+from benchmarks.micro import Benchmark, run_benchmark
+
+PAGE_SIZE = 100
+
+
+def build_cases(session):
+    from app.api.responses import PaginatedResponse, response_adapter
+    from app.api.v1.routes.admin import USER_DETAIL_LIST
+    from app.api.v1.routes.measurements import MEASUREMENT_LIST
+    from app.api.v1.routes.workouts import WORKOUT_LIST
+    from app.models import BodyMeasurement, User, Workout
+    from app.schemas import UserDetailResponse
+    from app.schemas.measurement import BodyMeasurementResponse
+    from app.schemas.workout import WorkoutResponse
+
+    cases = [
+        ("workouts", Workout, Workout.workout_datetime, WORKOUT_LIST, WorkoutResponse),
+        ("measurements", BodyMeasurement, BodyMeasurement.measured_at, MEASUREMENT_LIST, BodyMeasurementResponse),
+        ("admin_users", User, User.created_at, USER_DETAIL_LIST, UserDetailResponse),
+    ]
+
+    benchmarks = []
+    for name, model, order, projection, schema in cases:
+        adapter = response_adapter(PaginatedResponse[schema])
+
+        def page_query(model=model, order=order):
+            # A fresh session per page, as a request would have
+            session.expunge_all()
+            return session.query(model).order_by(order.desc()).offset(0).limit(PAGE_SIZE)
+
+        def render(rows, adapter=adapter):
+            return adapter.dump_json(adapter.validate_python({
+                "success": True, "data": rows, "message": "ok", "page": 1,
+                "page_size": PAGE_SIZE, "total_items": PAGE_SIZE, "total_pages": 1,
+            }, from_attributes=True))
+
+        benchmarks.append(Benchmark(f"{name}.orm", lambda q=page_query, r=render: r(q().all()), name))
+        benchmarks.append(Benchmark(
+            f"{name}.projection", lambda q=page_query, r=render, p=projection: r(p.fetch(q())), name
+        ))
+    return benchmarks
+
+
+def peak_memory(bench: Benchmark) -> int:
+    bench.fn()
+    tracemalloc.start()
+    bench.fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark column projection against ORM loading")
+    parser.add_argument("--database", default="sqlite:///./bench_10k.db")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    configure_environment(args.database)
+    from app.db.session import SessionLocal
+
+    session = SessionLocal()
+    results = {}
+    print(f"{'case':<28}{'median':>12}{'pages/s':>10}{'peak KiB':>12}")
+    for bench in build_cases(session):
+        stats = run_benchmark(bench, rounds=10, round_time=0.2, warmup=0.3)
+        stats["peak_bytes"] = peak_memory(bench)
+        results[bench.name] = stats
+        print(f"{bench.name:<28}{stats['median_us'] / 1000:>10.2f}ms{stats['ops_per_second']:>10.0f}"
+              f"{stats['peak_bytes'] / 1024:>12.1f}")
+    session.close()
+
+    comparison = {}
+    for name in ("workouts", "measurements", "admin_users"):
+        orm, projected = results[f"{name}.orm"], results[f"{name}.projection"]
+        comparison[name] = {
+            "speedup": orm["median_us"] / projected["median_us"],
+            "memory_ratio": projected["peak_bytes"] / orm["peak_bytes"],
+        }
+        print(f"{name}: {comparison[name]['speedup']:.2f}x faster, "
+              f"{comparison[name]['memory_ratio']:.0%} of ORM peak memory")
+
+    path = write_result("projection", {
+        "meta": run_metadata(), "page_size": PAGE_SIZE, "benchmarks": results, "comparison": comparison,
+    }, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# ==================== Serialization Benchmark ====================
+# File: benchmarks/serialization.py
+
+"""
+Compare FastAPI's default response pipeline with the prevalidated path.
+
+Two measurements:
+- pipeline: a 100-item ``PaginatedResponse[WorkoutResponse]`` built from ORM
+  objects, rendered by FastAPI's ``serialize_response`` + ``JSONResponse``
+  versus ``render_response`` (one TypeAdapter pass, pydantic-core JSON).
+- endpoint (with ``--database``): ``GET /workouts?page_size=100`` throughput
+  through the load driver with ``FAST_JSON_RESPONSES`` off and on.
+
+Usage:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --database sqlite:///./bench_10k.db --duration 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import REPO_ROOT, configure_environment, run_metadata, write_result
+from benchmarks.micro import Benchmark, _build_workout, run_benchmark
+
+
+def pipeline_benchmarks():
+    import asyncio
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from app.api.responses import PaginatedResponse, render_response
+    from app.schemas.workout import WorkoutResponse
+
+    schema = PaginatedResponse[WorkoutResponse]
+    field = create_response_field(name="Response_list_workouts", type_=schema)
+    page = [_build_workout(i, exercises=0) for i in range(1, 101)]
+
+    def content():
+        return PaginatedResponse(
+            success=True, data=page, message="Workouts retrieved successfully",
+            page=1, page_size=100, total_items=1000, total_pages=10,
+        )
+
+    async def fastapi_default():
+        body = await serialize_response(field=field, response_content=content())
+        return JSONResponse(body).body
+
+    def prevalidated():
+        return render_response(schema, content()).body
+
+    assert json.loads(asyncio.run(fastapi_default())) == json.loads(prevalidated())
+    return [
+        Benchmark("pipeline.fastapi_default", fastapi_default),
+        Benchmark("pipeline.prevalidated", prevalidated),
+    ]
+
+
+def endpoint_throughput(database_url: str, duration: float, concurrency: int):
+    results = {}
+    for enabled in ("False", "True"):
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as handle:
+            output = handle.name
+        env = {**os.environ, "FAST_JSON_RESPONSES": enabled}
+        subprocess.run([
+            sys.executable, "-m", "benchmarks.load",
+            "--database", database_url, "--duration", str(duration), "--warmup", "2",
+            "--concurrency", str(concurrency), "--only", "list_workouts_page100",
+            "--output", output,
+        ], cwd=REPO_ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+        with open(output) as handle:
+            results["prevalidated" if enabled == "True" else "fastapi_default"] = json.load(handle)["overall"]
+        os.unlink(output)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fast JSON response path")
+    parser.add_argument("--database", default=None, help="Also measure endpoint throughput against this dataset")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    configure_environment(f"sqlite:///{os.path.join(tmpdir.name, 'serialization.db')}")
+
+    payload = {"meta": run_metadata(), "pipeline": {}}
+    for bench in pipeline_benchmarks():
+        stats = run_benchmark(bench, rounds=15, round_time=0.2, warmup=0.5)
+        payload["pipeline"][bench.name] = stats
+        print(f"{bench.name:<32}{stats['median_us']:>12.1f}us{stats['ops_per_second']:>12.0f} pages/s")
+    speedup = payload["pipeline"]["pipeline.fastapi_default"]["median_us"] / \
+        payload["pipeline"]["pipeline.prevalidated"]["median_us"]
+    payload["pipeline_speedup"] = speedup
+    print(f"pipeline speedup: {speedup:.2f}x")
+
+    if args.database:
+        payload["endpoint"] = endpoint_throughput(args.database, args.duration, args.concurrency)
+        for name, stats in payload["endpoint"].items():
+            print(f"GET /workouts?page_size=100 [{name}]: {stats['throughput_rps']:.1f} rps, p99 {stats['p99_ms']:.1f}ms")
+
+    path = write_result("serialization", payload, args.output)
+    print(f"Results written to {path}")
+    tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+# ==================== Startup Profiler ====================
+# File: benchmarks/startup.py
+
+"""
+Measure worker cold-start cost and check it against a stored budget.
+
+Reports, each from a fresh interpreter:
+- the time and number of modules it takes to ``import app.main``
+  (median of ``--runs``),
+- an ``-X importtime`` breakdown: slowest modules by cumulative time and
+  self time per top-level package,
+- time to first request: launching uvicorn until ``/health`` answers.
+
+Usage:
+    python -m benchmarks.startup                  # report and check the budget
+    python -m benchmarks.startup --save-budget    # record a new budget
+    python -m pytest benchmarks/test_startup_budget.py
+
+Exits with status 1 when import time or module count exceeds the budget.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.common import BENCHMARKS_DIR, REPO_ROOT, run_metadata, write_result
+
+BUDGET_PATH = BENCHMARKS_DIR / "baselines" / "startup.json"
+# Import time is noisy across machines and runs; module count is not
+DEFAULT_TIME_TOLERANCE = 0.5
+DEFAULT_MODULE_SLACK = 10
+
+_MEASURE_IMPORT = """
+import json, sys, time
+before = set(sys.modules)
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"import_ms": elapsed * 1000, "modules": len(set(sys.modules) - before)}))
+"""
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/startup_probe.db")
+    env["DEBUG"] = "False"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    return env
+
+
+def measure_import(runs: int = 5) -> Dict[str, float]:
+    """
+    Median import time and module count of ``app.main`` over fresh interpreters
+    """
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _MEASURE_IMPORT],
+            cwd=REPO_ROOT, env=_child_env(), capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "modules": max(s["modules"] for s in samples),
+        "runs": runs,
+    }
+
+
+def importtime_report(top: int = 25) -> Dict[str, List[Tuple[str, float]]]:
+    """
+    Parse ``python -X importtime`` for ``import app.main``
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=REPO_ROOT, env=_child_env(), capture_output=True, text=True, check=True,
+    ).stderr
+
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us) / 1000, int(cumulative_us) / 1000))
+
+    by_package: Dict[str, float] = defaultdict(float)
+    for name, self_ms, _ in modules:
+        by_package[name.split(".")[0]] += self_ms
+
+    return {
+        "slowest": sorted(((n, c) for n, _, c in modules), key=lambda x: -x[1])[:top],
+        "packages": sorted(by_package.items(), key=lambda x: -x[1])[:top],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_first_request(timeout: float = 60.0) -> Optional[float]:
+    """
+    Seconds from launching uvicorn until /health returns 200 (None on timeout)
+    """
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=_child_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+        return None
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def load_budget() -> Dict[str, float]:
+    if not BUDGET_PATH.exists():
+        return {}
+    with open(BUDGET_PATH) as f:
+        return json.load(f)
+
+
+def save_budget(measured: Dict[str, float]):
+    BUDGET_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(BUDGET_PATH, "w") as f:
+        json.dump({"import_ms": round(measured["import_ms"], 1), "modules": measured["modules"]}, f, indent=2)
+        f.write("\n")
+
+
+def check_budget(
+    measured: Dict[str, float],
+    budget: Dict[str, float],
+    time_tolerance: float = DEFAULT_TIME_TOLERANCE,
+    module_slack: int = DEFAULT_MODULE_SLACK,
+) -> List[str]:
+    """
+    Return a message for every budget that ``measured`` exceeds
+    """
+    failures = []
+    if "import_ms" in budget:
+        limit = budget["import_ms"] * (1 + time_tolerance)
+        if measured["import_ms"] > limit:
+            failures.append(
+                f"import app.main took {measured['import_ms']:.1f} ms, budget {budget['import_ms']:.1f} ms "
+                f"(+{time_tolerance:.0%} = {limit:.1f} ms)"
+            )
+    if "modules" in budget:
+        limit = budget["modules"] + module_slack
+        if measured["modules"] > limit:
+            failures.append(
+                f"import app.main loaded {measured['modules']} modules, budget {budget['modules']} "
+                f"(+{module_slack} = {limit})"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile worker startup and check the import budget")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--time-tolerance", type=float,
+                        default=float(os.getenv("STARTUP_TIME_TOLERANCE", DEFAULT_TIME_TOLERANCE)))
+    parser.add_argument("--module-slack", type=int, default=DEFAULT_MODULE_SLACK)
+    parser.add_argument("--skip-server", action="store_true", help="Don't measure time to first request")
+    parser.add_argument("--save-budget", action="store_true")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    measured = measure_import(args.runs)
+    report = importtime_report(args.top)
+    ttfr = None if args.skip_server else time_to_first_request()
+
+    print(f"import app.main: {measured['import_ms']:.1f} ms (median of {args.runs}), {measured['modules']} modules")
+    if ttfr is not None:
+        print(f"time to first request (uvicorn launch -> /health 200): {ttfr * 1000:.0f} ms")
+    print(f"\n{'slowest imports (cumulative)':<60}{'ms':>10}")
+    for name, ms in report["slowest"]:
+        print(f"{name:<60}{ms:>10.1f}")
+    print(f"\n{'self time by top-level package':<60}{'ms':>10}")
+    for name, ms in report["packages"]:
+        print(f"{name:<60}{ms:>10.1f}")
+
+    budget = load_budget()
+    failures = check_budget(measured, budget, args.time_tolerance, args.module_slack)
+    path = write_result("startup", {
+        "meta": run_metadata(), "import": measured, "time_to_first_request_s": ttfr,
+        "importtime": report, "budget": budget, "failures": failures,
+    }, args.output)
+    print(f"\nResults written to {path}")
+
+    if args.save_budget:
+        save_budget(measured)
+        print(f"Budget saved to {BUDGET_PATH}")
+        return
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Within startup budget")
+
+
+if __name__ == "__main__":
+    main()
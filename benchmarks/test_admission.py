@@ -0,0 +1,132 @@
+# ==================== Admission Control Tests ====================
+# File: benchmarks/test_admission.py
+
+"""
+Load shedding and tenant fairness of app/core/admission.py, with one slot
+per pool so every other request has to queue.
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionMiddleware, AdmissionPool, Shed
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def single_slot(name: str = "test", queue_limit: int = 8, deadline: float = 5.0,
+                tenant_share: float = 1.0) -> AdmissionPool:
+    return AdmissionPool(name, limit=1, queue_limit=queue_limit, deadline=deadline, tenant_share=tenant_share)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_waiters_are_served_round_robin_by_tenant():
+    pool = single_slot()
+    await pool.acquire("holder")
+    served = []
+
+    async def request(tenant, name):
+        await pool.acquire(tenant)
+        served.append(name)
+        pool.release(0.01)
+
+    tasks = [
+        asyncio.create_task(request(tenant, name))
+        for tenant, name in (("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1"), ("b", "b2"))
+    ]
+    await settle()
+    assert pool.queued == 5
+    pool.release(0.01)
+    await asyncio.gather(*tasks)
+    assert served == ["a1", "b1", "a2", "b2", "a3"]
+    assert pool.active == 0 and pool.queued == 0
+
+
+async def test_full_queue_and_tenant_share_are_shed():
+    pool = single_slot(queue_limit=4, tenant_share=0.5)
+    await pool.acquire("holder")
+    waiters = [asyncio.create_task(pool.acquire("a")) for _ in range(2)]
+    await settle()
+
+    with pytest.raises(Shed) as shed:
+        await pool.acquire("a")
+    assert shed.value.reason == "tenant_share"
+
+    waiters += [asyncio.create_task(pool.acquire("b")) for _ in range(2)]
+    await settle()
+    with pytest.raises(Shed) as shed:
+        await pool.acquire("c")
+    assert shed.value.reason == "queue_full"
+    assert shed.value.retry_after >= 1
+    assert pool.shed["tenant_share"] == 1 and pool.shed["queue_full"] == 1
+
+    for _ in waiters:
+        pool.release(0.01)
+    await asyncio.gather(*waiters)
+    pool.release(0.01)
+    assert pool.active == 0 and pool.queued == 0
+
+
+async def test_queued_request_times_out_at_its_deadline():
+    pool = single_slot(deadline=0.1)
+    await pool.acquire("holder")
+    with pytest.raises(Shed) as shed:
+        await pool.acquire("a")
+    assert shed.value.reason == "timeout"
+    assert pool.queued == 0
+    # The timed-out waiter must not be handed the slot later
+    pool.release(0.01)
+    assert pool.active == 0
+
+    # A wait that cannot fit in the deadline is refused without queueing
+    pool.service_time = 1.0
+    await pool.acquire("holder")
+    with pytest.raises(Shed) as shed:
+        await pool.acquire("a")
+    assert shed.value.reason == "deadline"
+
+
+async def test_middleware_answers_503_with_retry_after():
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    middleware = AdmissionMiddleware(app)
+    middleware.pools["read"] = single_slot("read", queue_limit=1)
+    responses = []
+
+    def request():
+        scope = {"type": "http", "method": "GET", "path": "/api/v1/workouts", "headers": []}
+        sent = []
+        responses.append(sent)
+
+        async def send(message):
+            sent.append(message)
+
+        return middleware(scope, None, send)
+
+    in_flight = asyncio.create_task(request())
+    queued = asyncio.create_task(request())
+    await settle()
+    await request()      # the queue is full: shed straight away
+    release.set()
+    await asyncio.gather(in_flight, queued)
+
+    statuses = [sent[0]["status"] for sent in responses]
+    assert statuses == [200, 200, 503]
+    headers = dict(responses[2][0]["headers"])
+    assert headers[b"retry-after"] == b"1"
+    assert headers[b"x-shed-reason"] == b"read:queue_full"
@@ -0,0 +1,46 @@
+# ==================== Conditional Request Regression ====================
+# File: benchmarks/test_conditional.py
+
+"""
+Writes within one second must still change the ETag (timestamps only
+have one-second resolution, see app/api/conditional.py).
+"""
+
+from benchmarks.common import APP_PRELUDE, run_scenario
+
+SCENARIO = APP_PRELUDE + """
+import time
+
+with TestClient(app) as c:
+    H = login(c, "etag@example.com")
+    new_workout = {"user_id": 1, "workout_datetime": "2024-01-01T10:00:00",
+                   "workout_type": "strength", "duration_minutes": 30}
+    # Start early in a second so every write below lands in the same one
+    while time.time() % 1 > 0.2:
+        time.sleep(0.01)
+    workout = c.post("/api/v1/workouts", json=new_workout, headers=H).json()["data"]
+    url = f"/api/v1/workouts/{workout['id']}"
+    entity_etag = c.get(url, headers=H).headers["etag"]
+    list_etag = c.get("/api/v1/workouts", headers=H).headers["etag"]
+    c.put(url, json={"duration_minutes": 45}, headers=H)
+    entity = c.get(url, headers={**H, "If-None-Match": entity_etag})
+    listing = c.get("/api/v1/workouts", headers={**H, "If-None-Match": list_etag})
+    # Delete and create in the same second: same count, same max timestamp
+    list_etag = listing.headers["etag"]
+    c.delete(url, headers=H)
+    c.post("/api/v1/workouts", json=new_workout, headers=H)
+    replaced = c.get("/api/v1/workouts", headers={**H, "If-None-Match": list_etag})
+    results = {
+        "entity": [entity.status_code, entity.json()["data"]["duration_minutes"]],
+        "list": listing.status_code,
+        "replaced": replaced.status_code,
+    }
+print(json.dumps(results))
+"""
+
+
+def test_same_second_writes_change_etag(tmp_path):
+    results = run_scenario(SCENARIO, tmp_path)
+    assert results["entity"] == [200, 45]
+    assert results["list"] == 200
+    assert results["replaced"] == 200
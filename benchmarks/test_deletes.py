@@ -0,0 +1,174 @@
+# ==================== Cascading Delete Tests ====================
+# File: benchmarks/test_deletes.py
+
+"""
+Foreign key upgrades of existing databases (app/db/foreign_keys.py) and
+batched user purges, inline and as a job (app/db/bulk_users.py).
+"""
+
+from benchmarks.common import APP_PRELUDE, run_scenario
+
+UPGRADE_SCENARIO = """
+import json, sqlite3
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateTable
+import app.models
+from app.core.config import settings
+from app.db.base import Base
+from app.db.foreign_keys import actual_foreign_keys, expected_foreign_keys, upgrade
+from app.db.session import engine
+
+# A database created before the ON DELETE actions were declared
+conn = sqlite3.connect(settings.DATABASE_URL.replace("sqlite:///", ""))
+for table in Base.metadata.sorted_tables:
+    ddl = str(CreateTable(table).compile(dialect=engine.dialect))
+    conn.execute(ddl.replace(" ON DELETE CASCADE", "").replace(" ON DELETE SET NULL", ""))
+conn.executescript('''
+    INSERT INTO tenants (id, name, type) VALUES (1, 'Gym', 'Gym');
+    INSERT INTO users (id, email, hashed_password, tenant_id, is_active, is_admin) VALUES (1, 'a@example.com', 'x', 1, 1, 0);
+    INSERT INTO workouts (id, user_id, workout_datetime, workout_type) VALUES (1, 1, '2024-01-01', 'strength'), (2, 1, '2024-01-02', 'cardio');
+    INSERT INTO strength_exercises (workout_id, exercise_name, order_index) VALUES (1, 'Squat', 0), (1, 'Bench', 1), (2, 'Row', 0);
+    INSERT INTO personal_records (user_id, exercise_name, record_type, value, unit, workout_id, achieved_at) VALUES (1, 'Squat', 'max_weight', 100, 'kg', 1, '2024-01-01');
+''')
+conn.commit()
+conn.close()
+
+tables = Base.metadata.sorted_tables
+first = upgrade(engine, tables)
+second = upgrade(engine, tables)
+with engine.begin() as connection:
+    raw = connection.connection.driver_connection
+    outdated = [t.name for t in tables if actual_foreign_keys(raw, t.name) != expected_foreign_keys(t)]
+    counts = {
+        name: connection.exec_driver_sql(f"SELECT COUNT(*) FROM {name}").scalar()
+        for name in ("users", "workouts", "strength_exercises", "personal_records")
+    }
+    connection.exec_driver_sql("DELETE FROM workouts WHERE id = 1")
+    exercises_left = connection.exec_driver_sql("SELECT exercise_name FROM strength_exercises").scalars().all()
+    record_workout = connection.exec_driver_sql("SELECT workout_id FROM personal_records").scalar()
+indexes = {index["name"] for index in inspect(engine).get_indexes("strength_exercises")}
+declared = {index.name for index in Base.metadata.tables["strength_exercises"].indexes}
+
+print(json.dumps({
+    "rebuilt": "strength_exercises" in first["rebuilt"] and "personal_records" in first["rebuilt"],
+    "violations": first["violations"],
+    "second": second["rebuilt"],
+    "outdated": outdated,
+    "counts": counts,
+    "exercises_left": exercises_left,
+    "record_workout": record_workout,
+    "indexes_missing": sorted(declared - indexes),
+}))
+"""
+
+PURGE_SETUP = APP_PRELUDE + """
+import time
+from sqlalchemy import func, select
+from app.db.bulk_users import USER_DATA
+from app.db.session import ReadSessionLocal
+from app.db.usage import exact_usage
+from app.models import StrengthExercise, TenantUsage, User, Workout
+
+c = TestClient(app)
+admin = login(c, "admin@example.com", is_admin=True)
+users = {}
+for email, workouts, goals in (("victim@example.com", 7, 3), ("other@example.com", 2, 1)):
+    H = login(c, email)
+    user_id = c.get("/api/v1/users/me", headers=H).json()["data"]["id"]
+    users[email] = user_id
+    for day in range(workouts):
+        workout = c.post("/api/v1/workouts", headers=H, json={
+            "user_id": user_id, "workout_datetime": f"2024-01-{day + 1:02d}T10:00:00", "workout_type": "strength",
+        }).json()["data"]
+        c.post(f"/api/v1/workouts/{workout['id']}/strength-exercises", headers=H, json={
+            "workout_id": workout["id"], "exercise_name": "Deadlift",
+        })
+    for index in range(goals):
+        c.post("/api/v1/goals", headers=H, json={
+            "user_id": user_id, "goal_name": f"Goal {index}", "metric_type": "weight",
+            "target_value": 80, "start_date": "2024-01-01",
+        })
+victim, other = users["victim@example.com"], users["other@example.com"]
+
+
+def owned(user_id):
+    db = ReadSessionLocal()
+    try:
+        return sum(db.scalar(select(func.count()).where(model.user_id == user_id)) for model in USER_DATA)
+    finally:
+        db.close()
+
+
+def state():
+    db = ReadSessionLocal()
+    try:
+        usage = db.get(TenantUsage, 1)
+        return {
+            "victim_exists": db.get(User, victim) is not None,
+            "victim_rows_left": owned(victim),
+            "other_workouts": db.scalar(select(func.count()).where(Workout.user_id == other)),
+            "exercises": db.scalar(select(func.count()).select_from(StrengthExercise)),
+            "usage_matches": {k: getattr(usage, k) for k in exact_usage(db, 1)} == exact_usage(db, 1),
+        }
+    finally:
+        db.close()
+
+
+victim_rows = owned(victim)
+"""
+
+INLINE_PURGE_SCENARIO = PURGE_SETUP + """
+response = c.post("/api/v1/admin/users/bulk/delete", headers=admin, json={"user_ids": [victim]})
+print(json.dumps({"status": response.status_code, "result": response.json()["data"],
+                  "victim_rows": victim_rows, **state()}))
+"""
+
+JOB_PURGE_SCENARIO = PURGE_SETUP + """
+response = c.delete(f"/api/v1/admin/users/{victim}", headers=admin)
+job = response.json()["data"]
+for _ in range(200):
+    job = c.get(f"/api/v1/admin/system/jobs/{job['id']}", headers=admin).json()["data"]
+    if job["status"] in ("succeeded", "failed"):
+        break
+    time.sleep(0.05)
+print(json.dumps({"status": response.status_code, "job": job, "victim_rows": victim_rows, **state()}))
+"""
+
+
+def test_upgrade_rebuilds_old_schema_with_rows(tmp_path):
+    results = run_scenario(UPGRADE_SCENARIO, tmp_path)
+    assert results["rebuilt"]
+    assert results["violations"] == {}
+    assert results["second"] == []
+    assert results["outdated"] == []
+    assert results["counts"] == {"users": 1, "workouts": 2, "strength_exercises": 3, "personal_records": 1}
+    # ON DELETE CASCADE and SET NULL now apply
+    assert results["exercises_left"] == ["Row"]
+    assert results["record_workout"] is None
+    assert results["indexes_missing"] == []
+
+
+def test_purge_across_batch_boundaries(tmp_path):
+    # 7 workouts and 3 goals with batches of 3: a partial and an exact last batch
+    results = run_scenario(INLINE_PURGE_SCENARIO, tmp_path, PURGE_BATCH_ROWS="3")
+    assert results["status"] == 200
+    assert results["result"]["affected"] == 1
+    assert results["result"]["purged_rows"] == results["victim_rows"]
+    assert not results["victim_exists"]
+    assert results["victim_rows_left"] == 0
+    assert results["other_workouts"] == 2
+    assert results["exercises"] == 2
+    assert results["usage_matches"]
+
+
+def test_large_delete_runs_as_job(tmp_path):
+    results = run_scenario(JOB_PURGE_SCENARIO, tmp_path, PURGE_BATCH_ROWS="3", PURGE_INLINE_MAX_ROWS="5")
+    assert results["status"] == 202
+    assert results["job"]["status"] == "succeeded", results["job"]
+    assert results["job"]["result"]["purged_rows"] == results["victim_rows"]
+    assert results["job"]["progress"]["purged_rows"] == results["victim_rows"]
+    assert not results["victim_exists"]
+    assert results["victim_rows_left"] == 0
+    assert results["other_workouts"] == 2
+    assert results["exercises"] == 2
+    assert results["usage_matches"]
@@ -0,0 +1,165 @@
+# ==================== Tenant Sharding Tests ====================
+# File: benchmarks/test_sharding.py
+
+"""
+Routing by the token's tenant_id claim, the shard LRU, and splitting a
+single-file database into shards (app/db/sharding.py).
+"""
+
+from benchmarks.common import APP_PRELUDE, run_scenario
+
+ROUTING_SCENARIO = APP_PRELUDE + """
+import os, sqlite3
+from app.core.config import settings
+
+with TestClient(app) as c:
+    listed = {}
+    for tenant_id in (1, 2):
+        H = login(c, f"user{tenant_id}@example.com", tenant_id=tenant_id)
+        user_id = c.get("/api/v1/users/me", headers=H).json()["data"]["id"]
+        for day in range(tenant_id):
+            c.post("/api/v1/workouts", headers=H, json={
+                "user_id": user_id, "workout_datetime": f"2024-01-0{day + 1}T10:00:00", "workout_type": "cardio",
+            })
+        listed[tenant_id] = len(c.get("/api/v1/workouts", headers=H).json()["data"])
+
+
+def rows(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] if table in tables else None
+    finally:
+        conn.close()
+
+
+shard_dir = settings.SHARD_DIR
+print(json.dumps({
+    "listed": listed,
+    "shard_workouts": {t: rows(os.path.join(shard_dir, f"tenant_{t}.db"), "workouts") for t in (1, 2)},
+    "shard_users": rows(os.path.join(shard_dir, "tenant_1.db"), "users"),
+    "catalog_workouts": rows(settings.DATABASE_URL.replace("sqlite:///", ""), "workouts"),
+}))
+"""
+
+LRU_SCENARIO = """
+import json, threading, time
+from app.db.init_db import init_db
+init_db()
+import app.db.sharding as sharding
+from app.core.config import settings
+
+manager = sharding.ShardManager(settings.SHARD_DIR, max_open=2)
+first = manager.get(1)
+manager.get(2)
+manager.get(1)          # 1 is now the most recently used
+manager.get(3)          # evicts 2
+order_after_evict = list(manager._shards)
+reopened = manager.get(2)   # evicts 1; the file already has its tables
+
+# Setting up a new shard must not hold up the tenants already open
+release = threading.Event()
+sync_indexes = sharding.sync_indexes
+
+
+def slow_sync_indexes(engine, tables):
+    release.wait(10)
+    return sync_indexes(engine, tables)
+
+
+sharding.sync_indexes = slow_sync_indexes
+opened = []
+threads = [threading.Thread(target=lambda: opened.append(manager.get(9))) for _ in range(2)]
+for thread in threads:
+    thread.start()
+time.sleep(0.2)
+started = time.perf_counter()
+manager.get(2)
+manager.stats()
+blocked_for = time.perf_counter() - started
+release.set()
+for thread in threads:
+    thread.join()
+sharding.sync_indexes = sync_indexes
+
+print(json.dumps({
+    "order_after_evict": order_after_evict,
+    "open": list(manager._shards),
+    "opened": manager.opened,
+    "evicted": manager.evicted,
+    "reopened_upgraded": reopened.foreign_keys is not None,
+    "first_upgraded": first.foreign_keys is not None,
+    "blocked_for": blocked_for,
+    "same_shard": len(opened) == 2 and opened[0] is opened[1],
+}))
+manager.close()
+"""
+
+SPLIT_SCENARIO = APP_PRELUDE + """
+import sqlite3
+from app.db.sharding import ShardManager, split
+from app.core.config import settings
+
+with TestClient(app) as c:
+    for tenant_id, workouts in ((1, 2), (2, 3)):
+        H = login(c, f"user{tenant_id}@example.com", tenant_id=tenant_id)
+        user_id = c.get("/api/v1/users/me", headers=H).json()["data"]["id"]
+        for day in range(workouts):
+            workout = c.post("/api/v1/workouts", headers=H, json={
+                "user_id": user_id, "workout_datetime": f"2024-01-0{day + 1}T10:00:00", "workout_type": "strength",
+            }).json()["data"]
+            c.post(f"/api/v1/workouts/{workout['id']}/strength-exercises", headers=H, json={
+                "workout_id": workout["id"], "exercise_name": "Squat",
+            })
+
+manager = ShardManager(settings.SHARD_DIR, max_open=4)
+copied = split(manager)
+again = split(manager)
+
+
+def count(tenant_id, table):
+    conn = sqlite3.connect(manager.path(tenant_id))
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+print(json.dumps({
+    "copied": {t: {k: v for k, v in counts.items() if v} for t, counts in copied.items()},
+    "again": sum(sum(counts.values()) for counts in again.values()),
+    "workouts": {t: count(t, "workouts") for t in (1, 2)},
+    "exercises": {t: count(t, "strength_exercises") for t in (1, 2)},
+}))
+manager.close()
+"""
+
+
+def test_requests_route_to_their_tenant_shard(tmp_path):
+    results = run_scenario(ROUTING_SCENARIO, tmp_path, SHARDING_ENABLED="True")
+    assert results["listed"] == {"1": 1, "2": 2}
+    assert results["shard_workouts"] == {"1": 1, "2": 2}
+    # Shards hold user data only; the catalog keeps no copy of it
+    assert results["shard_users"] is None
+    assert not results["catalog_workouts"]
+
+
+def test_shard_lru_evicts_least_recently_used(tmp_path):
+    results = run_scenario(LRU_SCENARIO, tmp_path, SHARDING_ENABLED="True")
+    assert results["order_after_evict"] == [1, 3]
+    assert results["open"] == [2, 9]
+    assert results["opened"] == 5
+    assert results["evicted"] == 3
+    assert results["first_upgraded"]
+    assert not results["reopened_upgraded"]
+    assert results["blocked_for"] < 1
+    assert results["same_shard"]
+
+
+def test_split_copies_each_tenants_rows_once(tmp_path):
+    results = run_scenario(SPLIT_SCENARIO, tmp_path)
+    assert results["copied"]["1"]["workouts"] == 2
+    assert results["copied"]["2"]["workouts"] == 3
+    assert results["again"] == 0
+    assert results["workouts"] == {"1": 2, "2": 3}
+    assert results["exercises"] == {"1": 2, "2": 3}
@@ -0,0 +1,50 @@
+# ==================== Startup Budget Gate ====================
+# File: benchmarks/test_startup_budget.py
+
+"""
+Fail when importing app.main gets slower or loads more modules than the
+budget in benchmarks/baselines/startup.json.
+
+Refresh the budget deliberately with ``python -m benchmarks.startup --save-budget``.
+"""
+
+import os
+
+import pytest
+
+from benchmarks.startup import (
+    DEFAULT_MODULE_SLACK, DEFAULT_TIME_TOLERANCE, check_budget, load_budget, measure_import
+)
+
+
+def test_import_within_budget():
+    budget = load_budget()
+    if not budget:
+        pytest.skip("No startup budget recorded")
+
+    measured = measure_import(runs=3)
+    tolerance = float(os.getenv("STARTUP_TIME_TOLERANCE", DEFAULT_TIME_TOLERANCE))
+    failures = check_budget(measured, budget, tolerance, DEFAULT_MODULE_SLACK)
+    assert not failures, "; ".join(failures)
+
+
+def test_heavy_modules_deferred():
+    """
+    Modules only needed off the hot path must not load at import time
+    """
+    import json
+    import subprocess
+    import sys
+
+    from benchmarks.common import REPO_ROOT
+
+    deferred = ["argon2", "app.core.profiling"]
+    script = (
+        "import json, sys; import app.main; "
+        f"print(json.dumps([m for m in {deferred!r} if m in sys.modules]))"
+    )
+    env = {**os.environ, "PROFILING_ENABLED": "False"}
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == []
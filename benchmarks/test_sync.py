@@ -0,0 +1,48 @@
+# ==================== Sync Feed Regression ====================
+# File: benchmarks/test_sync.py
+
+"""
+Children the database cascades with their parent still get tombstones in
+/sync/changes (see app/db/change_tracking.py).
+"""
+
+from benchmarks.common import APP_PRELUDE, run_scenario
+
+SCENARIO = APP_PRELUDE + """
+with TestClient(app) as c:
+    H = login(c, "sync@example.com")
+    workout = c.post("/api/v1/workouts", headers=H, json={
+        "user_id": 1, "workout_datetime": "2024-01-01T10:00:00", "workout_type": "mixed",
+    }).json()["data"]
+    exercise = c.post(f"/api/v1/workouts/{workout['id']}/strength-exercises", headers=H, json={
+        "workout_id": workout["id"], "exercise_name": "Back Squat", "sets": 5, "reps": 5,
+    }).json()["data"]
+    activity = c.post(f"/api/v1/workouts/{workout['id']}/cardio-activities", headers=H, json={
+        "workout_id": workout["id"], "activity_type": "run", "distance_km": 5,
+    }).json()["data"]
+    goal = c.post("/api/v1/goals", headers=H, json={
+        "user_id": 1, "goal_name": "Squat 140", "metric_type": "exercise_1rm",
+        "target_value": 140, "start_date": "2024-01-01",
+    }).json()["data"]
+    milestone = c.post(f"/api/v1/goals/{goal['id']}/milestones", headers=H, json={
+        "goal_id": goal["id"], "milestone_name": "120", "milestone_value": 120,
+    }).json()["data"]
+    cursor = c.get("/api/v1/sync/changes", headers=H).json()["data"]["cursor"]
+
+    c.delete(f"/api/v1/workouts/{workout['id']}", headers=H)
+    c.delete(f"/api/v1/goals/{goal['id']}", headers=H)
+    page = c.get("/api/v1/sync/changes", params={"since": cursor}, headers=H).json()["data"]
+
+print(json.dumps({
+    "expected": sorted([
+        ["workout", workout["id"]], ["strength_exercise", exercise["id"]],
+        ["cardio_activity", activity["id"]], ["goal", goal["id"]], ["goal_milestone", milestone["id"]],
+    ]),
+    "deleted": sorted([tombstone["entity_type"], tombstone["id"]] for tombstone in page["deleted"]),
+}))
+"""
+
+
+def test_cascaded_children_get_tombstones(tmp_path):
+    results = run_scenario(SCENARIO, tmp_path)
+    assert results["deleted"] == results["expected"]
@@ -0,0 +1,61 @@
+# ==================== Tenant Config Cache Tests ====================
+# File: benchmarks/test_tenant_config.py
+
+"""
+Cross-connection invalidation of the tenant config cache
+(app/core/tenant_config.py).
+"""
+
+from benchmarks.common import run_scenario
+
+POLL_SCENARIO = """
+import json, time
+from app.db.init_db import init_db
+init_db()
+from app.core.tenant_config import TenantConfigCache
+from app.db.session import SessionLocal
+from app.models import Tenant, TenantConfigs
+
+db = SessionLocal()
+tenant = Tenant(name="Poll Gym", type="Gym")
+db.add(tenant)
+db.flush()
+config = TenantConfigs(tenant_id=tenant.id, user_policies={"max_users": 1})
+db.add(config)
+db.commit()
+
+cache = TenantConfigCache(poll_interval=0.05)
+cache.start()
+time.sleep(3.2)     # past the window in which same-second edits force a reload
+loads = cache.loads
+
+# Commits to other tables move data_version but not the marker
+for n in range(3):
+    db.add(Tenant(name=f"Other {n}", type="Gym"))
+    db.commit()
+    time.sleep(0.2)
+unrelated_loads = cache.loads - loads
+
+# Two edits inside the same second must both be picked up
+config.user_policies = {"max_users": 2}
+db.commit()
+time.sleep(0.2)
+first = cache.policy(tenant.id, "max_users")
+config.user_policies = {"max_users": 3}
+db.commit()
+time.sleep(0.2)
+second = cache.policy(tenant.id, "max_users")
+stats = cache.stats()
+cache.stop()
+db.close()
+
+print(json.dumps({"unrelated_loads": unrelated_loads, "first": first, "second": second, "stats": stats}))
+"""
+
+
+def test_poller_reloads_only_when_configs_change(tmp_path):
+    results = run_scenario(POLL_SCENARIO, tmp_path)
+    assert results["unrelated_loads"] == 0
+    assert results["stats"]["skipped"] >= 3
+    assert results["first"] == 2
+    assert results["second"] == 3
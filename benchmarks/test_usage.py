@@ -0,0 +1,114 @@
+# ==================== Tenant Usage & Quota Tests ====================
+# File: benchmarks/test_usage.py
+
+"""
+Quota enforcement, counter bookkeeping on create/delete and the
+reconciler (app/db/usage.py).
+"""
+
+from benchmarks.common import APP_PRELUDE, run_scenario
+
+QUOTA_SCENARIO = APP_PRELUDE + """
+import sqlite3
+from app.core.config import settings
+from app.db.usage import reconcile
+
+with TestClient(app) as c:
+    admin = login(c, "admin@example.com", is_admin=True)
+    tenant_id = c.post("/api/v1/tenants", headers=admin, json={"name": "Quota Gym", "type": "Gym"}).json()["data"]["id"]
+    c.put(f"/api/v1/tenants/{tenant_id}/config", headers=admin, json={
+        "user_policies": {"max_users": 2, "max_workouts_per_month": 2},
+    })
+    registered = [
+        c.post("/api/v1/auth/register", json={
+            "email": f"member{n}@example.com", "password": "Passw0rd!", "tenant_id": tenant_id,
+        }).status_code
+        for n in range(3)
+    ]
+    H = login(c, "member0@example.com", tenant_id=tenant_id)
+    user_id = c.get("/api/v1/users/me", headers=H).json()["data"]["id"]
+    new_workout = {"user_id": user_id, "workout_datetime": "2024-01-01T10:00:00", "workout_type": "strength"}
+    created = [c.post("/api/v1/workouts", headers=H, json=new_workout) for _ in range(3)]
+    full = c.get(f"/api/v1/tenants/{tenant_id}/usage", headers=admin).json()["data"]
+    c.delete(f"/api/v1/workouts/{created[0].json()['data']['id']}", headers=H)
+    after_delete = c.get(f"/api/v1/tenants/{tenant_id}/usage", headers=admin).json()["data"]
+    recreated = c.post("/api/v1/workouts", headers=H, json=new_workout).status_code
+
+    # Counters knocked off by a write from outside the app
+    conn = sqlite3.connect(settings.DATABASE_URL.replace("sqlite:///", ""))
+    conn.execute("UPDATE tenant_usage SET users = 9, workouts_this_month = 0 WHERE tenant_id = ?", (tenant_id,))
+    conn.commit()
+    conn.close()
+    drift = reconcile([tenant_id])
+    repaired = c.get(f"/api/v1/tenants/{tenant_id}/usage", headers=admin).json()["data"]
+    drift_again = reconcile([tenant_id])
+
+print(json.dumps({
+    "registered": registered,
+    "created": [response.status_code for response in created],
+    "full": [full["users"], full["workouts_this_month"]],
+    "after_delete": after_delete["workouts_this_month"],
+    "recreated": recreated,
+    "drift": drift.get(tenant_id),
+    "repaired": [repaired["users"], repaired["workouts_this_month"]],
+    "drift_again": drift_again,
+}))
+"""
+
+# Listeners must apply to any code writing through SessionLocal, not only the app
+CLI_SCENARIO = """
+import json, sys
+from datetime import datetime
+from app.db.init_db import init_db
+init_db()
+from fastapi import HTTPException
+from app.db.session import SessionLocal
+from app.models import Tenant, TenantConfigs, TenantUsage, User, Workout
+
+db = SessionLocal()
+tenant = Tenant(name="CLI Gym", type="Gym")
+db.add(tenant)
+db.flush()
+db.add(TenantConfigs(tenant_id=tenant.id, user_policies={"max_workouts_per_month": 1}))
+db.commit()
+user = User(email="cli@example.com", hashed_password="x", tenant_id=tenant.id)
+db.add(user)
+db.commit()
+
+statuses = []
+for _ in range(2):
+    db.add(Workout(user_id=user.id, workout_datetime=datetime(2024, 1, 1), workout_type="strength"))
+    try:
+        db.commit()
+        statuses.append(200)
+    except HTTPException as exc:
+        db.rollback()
+        statuses.append(exc.status_code)
+usage = db.get(TenantUsage, tenant.id)
+print(json.dumps({
+    "app_loaded": "app.main" in sys.modules,
+    "statuses": statuses,
+    "usage": [usage.users, usage.workouts_this_month],
+}))
+db.close()
+"""
+
+
+def test_quotas_counters_and_reconcile(tmp_path):
+    results = run_scenario(QUOTA_SCENARIO, tmp_path)
+    assert results["registered"] == [200, 200, 403]
+    assert results["created"] == [200, 200, 403]
+    assert results["full"] == [2, 2]
+    # Deleting this month's workout frees its quota again
+    assert results["after_delete"] == 1
+    assert results["recreated"] == 200
+    assert results["drift"] == {"users": -7, "storage_bytes": 0, "workouts_this_month": 2}
+    assert results["repaired"] == [2, 2]
+    assert results["drift_again"] == {}
+
+
+def test_quotas_apply_outside_the_app(tmp_path):
+    results = run_scenario(CLI_SCENARIO, tmp_path)
+    assert not results["app_loaded"]
+    assert results["statuses"] == [200, 403]
+    assert results["usage"] == [1, 1]
@@ -0,0 +1,128 @@
+# ==================== Write Queue Tests ====================
+# File: benchmarks/test_writer.py
+
+"""
+Group commit, lock retries and the thread lifecycle of the SQLite writer
+(app/db/writer.py).
+"""
+
+from benchmarks.common import run_scenario
+
+WRITER_PRELUDE = """
+import json, sqlite3, threading, time
+from sqlalchemy import text
+from app.core.config import settings
+from app.db.session import engine
+from app.db.writer import SQLiteWriter
+
+with engine.begin() as connection:
+    connection.exec_driver_sql("CREATE TABLE items (name TEXT UNIQUE)")
+
+
+def insert(name):
+    return lambda session: session.execute(text("INSERT INTO items VALUES (:name)"), {"name": name}).rowcount
+
+
+def names():
+    with engine.connect() as connection:
+        return sorted(name for (name,) in connection.exec_driver_sql("SELECT name FROM items"))
+
+
+def outcome(future):
+    try:
+        return future.result(timeout=10)
+    except Exception as exc:
+        return type(exc).__name__
+"""
+
+BATCH_SCENARIO = WRITER_PRELUDE + """
+writer = SQLiteWriter()
+release = threading.Event()
+blocker = writer.submit(lambda session: release.wait(10))
+time.sleep(0.1)   # the writer is now inside the blocking unit
+futures = [writer.submit(insert("a")), writer.submit(insert("a")), writer.submit(insert("b"))]
+release.set()
+results = [outcome(future) for future in futures]
+print(json.dumps({"results": results, "names": names(), "stats": writer.snapshot()}))
+writer.stop()
+"""
+
+BUSY_SCENARIO = WRITER_PRELUDE + """
+path = settings.DATABASE_URL.replace("sqlite:///", "")
+
+
+def hold_lock(seconds):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("BEGIN IMMEDIATE")
+    locked.set()
+    time.sleep(seconds)
+    conn.execute("ROLLBACK")
+    conn.close()
+
+
+results = {}
+for name, busy_timeout, hold in (("retried", 5.0, 0.3), ("gave_up", 0.1, 0.6)):
+    writer = SQLiteWriter(busy_timeout=busy_timeout)
+    writer.run_sync(lambda session: None)   # open the writer's connection first
+    locked = threading.Event()
+    holder = threading.Thread(target=hold_lock, args=(hold,))
+    holder.start()
+    locked.wait()
+    results[name] = {"result": outcome(writer.submit(insert(name))), "stats": writer.snapshot()}
+    holder.join()
+    writer.stop()
+print(json.dumps({**results, "names": names()}))
+"""
+
+LIFECYCLE_SCENARIO = WRITER_PRELUDE + """
+writer = SQLiteWriter(idle_timeout=0.2)
+first = writer.run_sync(insert("a"))
+running = writer.snapshot()["running"]
+time.sleep(0.6)
+idle = writer.snapshot()["running"]
+second = writer.run_sync(insert("b"))
+restarted = writer.snapshot()["running"]
+writer.stop()
+stopped = writer.snapshot()["running"]
+third = writer.run_sync(insert("c"))
+writer.stop()
+
+settings.WRITE_QUEUE_ENABLED = False
+direct = SQLiteWriter()
+fourth = direct.run_sync(insert("d"))
+print(json.dumps({
+    "results": [first, second, third, fourth],
+    "running": [running, idle, restarted, stopped],
+    "direct_thread": direct.snapshot()["running"],
+    "names": names(),
+}))
+"""
+
+
+def test_failed_unit_does_not_roll_back_its_batch(tmp_path):
+    results = run_scenario(BATCH_SCENARIO, tmp_path)
+    assert results["results"] == [1, "IntegrityError", 1]
+    assert results["names"] == ["a", "b"]
+    assert results["stats"]["max_batch"] == 3
+    assert results["stats"]["failed_units"] == 1
+    assert results["stats"]["failed_batches"] == 0
+
+
+def test_begin_immediate_retries_while_locked(tmp_path):
+    results = run_scenario(BUSY_SCENARIO, tmp_path)
+    retried, gave_up = results["retried"], results["gave_up"]
+    assert retried["result"] == 1
+    assert retried["stats"]["busy_retries"] > 0
+    assert retried["stats"]["busy_wait_ms"] >= 200
+    assert gave_up["result"] == "OperationalError"
+    assert gave_up["stats"]["busy_failures"] == 1
+    assert results["names"] == ["retried"]
+
+
+def test_writer_thread_exits_when_idle_and_restarts(tmp_path):
+    results = run_scenario(LIFECYCLE_SCENARIO, tmp_path)
+    assert results["results"] == [1, 1, 1, 1]
+    assert results["running"] == [True, False, True, False]
+    # With the queue disabled, synchronous callers never start the thread
+    assert results["direct_thread"] is False
+    assert results["names"] == ["a", "b", "c", "d"]
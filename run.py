@@ -1,8 +1,10 @@
 """
 Development server runner
-For production, use: uvicorn app.main:app --host 0.0.0.0 --port 8000
+For production, use: python -m app.serve
 """
 
+import os
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -10,7 +12,9 @@ if __name__ == "__main__":
         "app.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,  # Auto-reload on code changes (dev only)
+        # Auto-reload on code changes (dev only); each reload re-pays the
+        # full import cost, so RELOAD=False when measuring startup
+        reload=os.getenv("RELOAD", "True").lower() == "true",
         log_level="info"
     )
     
\ No newline at end of file